@@ -0,0 +1,366 @@
+"""Benchmark offline do caminho de scraping e do pipeline completo
+
+Serve os portfolios gravados em benchmarks/fixtures/site num servidor HTTP
+local e mede as ferramentas de scraping, a validação e o ResearchPipeline
+inteiro com um LLM falso (respostas determinísticas) e um destino falso no
+lugar do Sheets/banco. Nenhuma API externa é chamada.
+
+Uso:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --repeat 20 --output bench.json
+    python benchmarks/bench_pipeline.py --compare bench.json   # sai com 1 se houver regressão
+    python benchmarks/bench_pipeline.py --skip-pipeline --llm-latency 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# Caches, diário e saúde dos hosts em diretório temporário; toda busca vai ao servidor local
+_state_dir = tempfile.mkdtemp(prefix="bench-pipeline-")
+os.environ.update({
+    "SCRAPER_CACHE_DIR": os.path.join(_state_dir, "http"),
+    "SCRAPER_CACHE_TTL": "0",
+    "SCRAPER_HEALTH_PATH": os.path.join(_state_dir, "health.sqlite3"),
+    "SCRAPER_NEGATIVE_TTL": "0",
+    "SCRAPER_MIN_HOST_INTERVAL": "0",
+    "PIPELINE_JOURNAL_PATH": os.path.join(_state_dir, "journal.sqlite3"),
+    "LLM_CACHE_DISABLED": "1",
+    "PIPELINE_METRICS": "1",
+})
+os.environ.setdefault("PERPLEXITY_API_KEY", "offline-benchmark")
+
+from crewai.llms.base_llm import BaseLLM  # noqa: E402
+
+import scraping.dom  # noqa: E402
+from InvestorCrew.crew import portfolio_validator_tool, web_scraping_tool  # noqa: E402
+from StartupCrew.crew import extract_portfolio, portfolio_company_extractor  # noqa: E402
+from instrumentation import get_metrics  # noqa: E402
+from pipeline.resolution import resolve_startups  # noqa: E402
+from sinks import MultiSink  # noqa: E402
+from validation import validate_startup_data  # noqa: E402
+
+CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".json": "application/json"}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serve fixtures/site; a query vira sufixo do arquivo (portfolio?page=2 -> portfolio__page=2.html)"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        rel = parts.path.strip("/")
+        names = ([f"{rel}__{parts.query.replace('&', '__')}"] if parts.query else []) + [rel]
+        for name in names:
+            for candidate in (name, f"{name}.html", os.path.join(name, "index.html")):
+                path = os.path.join(FIXTURES, "site", candidate)
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        body = f.read()
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(path)[1], "text/html"))
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+class StubLLM(BaseLLM):
+    """LLM determinístico que responde no formato ReAct do crewai
+
+    Planejamento (reasoning) recebe "READY"; agentes com ferramentas chamam a
+    ferramenta uma vez e depois respondem; as respostas finais são montadas a
+    partir do manifesto das fixtures ou das linhas JSON do extrator.
+    """
+
+    def __init__(self, base_url: str, manifest: dict, latency: float = 0.0):
+        super().__init__(model="stub/offline")
+        self.base_url = base_url
+        self.manifest = manifest
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def investors(self) -> list[dict]:
+        return [
+            {
+                "name": inv["name"],
+                "type": inv["type"],
+                "website": self.base_url + inv["site"],
+                "hq_country": inv["hq_country"],
+                "focus": inv["focus"],
+                "portfolio_url": self.base_url + inv["portfolio"],
+            }
+            for inv in self.manifest["investors"]
+        ]
+
+    def answer(self, text: str) -> str:
+        if "I am ready to execute the task" in text:
+            return "Plan: use the available tools and report their output.\n\nREADY: I am ready to execute the task."
+
+        if "Action Input:" in text and "Observation:" not in text:
+            if "Portfolio Company Extractor" in text:
+                url = re.search(r"portfolio URL: (\S+)", text).group(1)
+                return (f"Thought: I need to extract the companies.\nAction: Portfolio Company Extractor\n"
+                        f"Action Input: {json.dumps({'url': url})}")
+            if "Portfolio Validator" in text:
+                urls = ", ".join(inv["portfolio_url"] for inv in self.investors())
+                return (f"Thought: I need to validate the portfolio URLs.\nAction: Portfolio Validator\n"
+                        f"Action Input: {json.dumps({'urls': urls})}")
+
+        if "COMPANIES (JSON lines)" in text:
+            startups = []
+            for line in text.splitlines():
+                line = line.strip()
+                if line.startswith("{") and line.endswith("}"):
+                    try:
+                        startups.append(json.loads(line))
+                    except ValueError:
+                        continue
+            payload = {"startups": startups}
+        elif '"startups"' in text:
+            payload = {"startups": []}
+        else:
+            payload = {"investors": self.investors()}
+        return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(payload, ensure_ascii=False)}"
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(messages, str):
+            text = messages
+        else:
+            text = "\n".join(str(message.get("content", "")) for message in messages)
+        return self.answer(text)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 32_000
+
+
+class FakeSink:
+    """Destino em memória com a interface do SheetsCrew/DatabaseSink"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.investors = []
+        self.startups = []
+
+    def save_investors(self, investors, worksheet_name: str | None = None) -> dict:
+        self.investors.extend(investors)
+        return {"inserted": len(investors)}
+
+    def save_startups(self, startups, vc_name: str, worksheet_name: str | None = None) -> dict:
+        self.startups.extend(startups)
+        return {"inserted": len(startups)}
+
+    def flush(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def clear_caches():
+    with scraping.dom._pages_lock:
+        scraping.dom._pages.clear()
+
+
+def measure(fn, repeat: int, ops: int = 1) -> dict:
+    """Latência por chamada (p50/p95), vazão em ops/s e pico de memória (uma chamada extra)"""
+    samples = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p95 = statistics.quantiles(samples, n=20)[18] if len(samples) > 1 else samples[0]
+    return {
+        "calls": repeat,
+        "ops_per_s": round(ops * repeat / sum(samples), 2),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def validation_dataset(companies: list[dict], size: int) -> list[dict]:
+    """`size` registros variados a partir das empresas extraídas (10% repetidos)"""
+    records = []
+    for i in range(size):
+        base = companies[i % len(companies)]
+        if i % 10 == 9:
+            records.append(dict(records[i // 2]))
+            continue
+        records.append({
+            "name": f"{base['name']} {i}",
+            "website": f"https://{i}.{base['website'].split('://', 1)[-1]}" if base.get("website") else None,
+            "description": base.get("description"),
+        })
+    return records
+
+
+def run_pipeline(base_url: str, manifest: dict, llm_latency: float, sink_latency: float):
+    """Devolve uma função que roda o ResearchPipeline inteiro uma vez"""
+    import InvestorCrew.crew as investor_module
+    import StartupCrew.crew as startup_module
+    from pipeline.research import DEFAULT_THESIS, ResearchPipeline
+
+    stub = StubLLM(base_url, manifest, latency=llm_latency)
+    for module in (investor_module, startup_module):
+        module.llm = stub
+        module.json_llm = stub
+    sink = FakeSink(latency=sink_latency)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = ResearchPipeline(sink=MultiSink({"fake": sink}))
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.run(DEFAULT_THESIS, skip_unchanged=False)
+
+    return run, pipeline, sink, stub
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Seções cujo p50 piorou mais que `threshold` em relação à linha de base"""
+    regressions = []
+    print(f"\n{'seção':<32} {'p50 base':>10} {'p50 agora':>10} {'Δ':>8}")
+    for name, current in results["sections"].items():
+        before = baseline.get("sections", {}).get(name)
+        if not before or not before.get("p50_ms"):
+            continue
+        delta = current["p50_ms"] / before["p50_ms"] - 1
+        flag = " ⚠️" if delta > threshold else ""
+        print(f"{name:<32} {before['p50_ms']:>10.2f} {current['p50_ms']:>10.2f} {delta:>+7.0%}{flag}")
+        if delta > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="execuções medidas por seção")
+    parser.add_argument("--records", type=int, default=5000, help="startups no lote de validação")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="atraso (s) por chamada do LLM falso")
+    parser.add_argument("--sink-latency", type=float, default=0.0, help="atraso (s) por flush do destino falso")
+    parser.add_argument("--skip-pipeline", action="store_true", help="mede só as ferramentas e a validação")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.15, help="piora máxima aceita no p50 (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    server, base_url = start_server()
+    portfolios = [base_url + inv["portfolio"] for inv in manifest["investors"]]
+    sites = [base_url + inv["site"] for inv in manifest["investors"]]
+
+    # Empresas de todas as fixtures, para o lote de validação
+    companies = [company for url in portfolios[:-1] for company in extract_portfolio(url).companies]
+    records = validation_dataset(companies, args.records)
+
+    sections = {
+        "portfolio_company_extractor": measure(
+            lambda: [portfolio_company_extractor.func(url) for url in portfolios], args.repeat, len(portfolios)),
+        "portfolio_validator_tool": measure(
+            lambda: portfolio_validator_tool.func(", ".join(portfolios)), args.repeat, len(portfolios)),
+        "web_scraping_tool": measure(
+            lambda: web_scraping_tool.func(", ".join(sites)), args.repeat, len(sites)),
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        sections["validate_startup_data"] = measure(
+            lambda: validate_startup_data(records), args.repeat, len(records))
+    sections["resolve_startups"] = measure(
+        lambda: resolve_startups([dict(record) for record in records], "Bench"), args.repeat, len(records))
+
+    extra = {}
+    if not args.skip_pipeline:
+        run, pipeline, sink, stub = run_pipeline(base_url, manifest, args.llm_latency, args.sink_latency)
+        metrics = get_metrics()
+        mark = metrics.snapshot()
+        sections["research_pipeline"] = measure(run, args.repeat)
+        pipeline.close()
+        extra = {
+            "pipeline_startups_per_run": len(sink.startups) // (args.repeat + 1),
+            "llm_calls_per_run": stub.calls / (args.repeat + 1),
+            "pipeline_spans": metrics.since(mark)["spans"],
+        }
+    server.shutdown()
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "sections": sections,
+        **extra,
+    }
+
+    print(f"\n{'seção':<32} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'pico KB':>10}")
+    for name, stats in sections.items():
+        print(f"{name:<32} {stats['ops_per_s']:>10.1f} {stats['p50_ms']:>10.2f} "
+              f"{stats['p95_ms']:>10.2f} {stats['peak_kb']:>10.0f}")
+    if extra:
+        print(f"\n📊 Pipeline: {extra['pipeline_startups_per_run']} startups e "
+              f"{extra['llm_calls_per_run']:.0f} chamadas ao LLM por execução")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"📝 Resultados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ Regressão acima de {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
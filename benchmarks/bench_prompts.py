@@ -0,0 +1,144 @@
+"""Relatório de tokens dos prompts: antes e depois da compactação
+
+Para cada task dos crews, conta os tokens do prompt montado a partir dos
+YAML (papel, objetivo e história do agente + descrição e saída esperada da
+task) na árvore atual e numa referência do git, e marca os agentes que
+fazem chamadas extras de raciocínio ou usam memória. Depois roda as
+ferramentas nas fixtures do bench_pipeline, no modo detalhado e no
+compacto, já que a saída delas entra no prompt das tasks seguintes.
+
+Uso:
+    python benchmarks/bench_prompts.py                     # árvore atual vs HEAD
+    python benchmarks/bench_prompts.py --baseline HEAD~1
+    python benchmarks/bench_prompts.py --output prompts.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+
+import yaml
+
+from bench_pipeline import FIXTURES, ROOT, start_server
+
+import InvestorCrew.crew
+import StartupCrew.crew
+from llms.context import count_tokens
+
+CREWS = ["InvestorCrew", "StartupCrew"]
+INPUTS = {
+    "thesis": "AI/ML, robotics and edge computing startups in LATAM",
+    "portfolio_url": "https://www.example.com/portfolio",
+}
+
+
+def load_config(crew: str, name: str, ref: str | None) -> dict:
+    """agents.yaml/tasks.yaml da árvore atual (ref=None) ou de uma referência do git"""
+    rel = f"src/{crew}/config/{name}.yaml"
+    if ref is None:
+        with open(os.path.join(ROOT, rel), encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    text = subprocess.run(["git", "show", f"{ref}:{rel}"], cwd=ROOT, capture_output=True,
+                          text=True, check=True).stdout
+    return yaml.safe_load(text)
+
+
+def render(template: str) -> str:
+    for key, value in INPUTS.items():
+        template = template.replace("{" + key + "}", value)
+    return template
+
+
+def task_prompts(crew: str, ref: str | None) -> dict:
+    """Tokens do prompt de cada task e os custos extras do agente (raciocínio, memória)"""
+    agents, tasks = load_config(crew, "agents", ref), load_config(crew, "tasks", ref)
+    report = {}
+    for name, task in tasks.items():
+        agent = agents.get(task["agent"], {})
+        prompt = "\n".join(render(str(part)) for part in (
+            agent.get("role", ""), agent.get("goal", ""), agent.get("backstory", ""),
+            task.get("description", ""), task.get("expected_output", "")))
+        report[name] = {
+            "agent": task["agent"],
+            "tokens": count_tokens(prompt),
+            "reasoning_calls": agent.get("max_reasoning_attempts", 1) if agent.get("reasoning") else 0,
+            "memory": bool(agent.get("memory")),
+        }
+    return report
+
+
+def baseline_flags(crew: str, ref: str) -> dict:
+    """Raciocínio e memória passados direto ao Agent(...) no crew.py da referência (valem sobre o YAML)"""
+    source = subprocess.run(["git", "show", f"{ref}:src/{crew}/crew.py"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    flags = {}
+    for block in source.split("agents_config['")[1:]:
+        name, body = block.split("'", 1)
+        body = body.split(")\n", 1)[0]
+        agent_flags = {}
+        if "reasoning=" in body:
+            attempts = re.search(r"max_reasoning_attempts=(\d+)", body)
+            agent_flags["reasoning_calls"] = (int(attempts.group(1)) if attempts else 1) \
+                if "reasoning=True" in body else 0
+        if "memory=" in body:
+            agent_flags["memory"] = "memory=True" in body
+        flags[name] = agent_flags
+    return flags
+
+
+def tool_outputs(base_url: str, manifest: dict, compact: bool) -> dict:
+    """Tokens da saída de cada ferramenta nas fixtures, num dos modos"""
+    InvestorCrew.crew.COMPACT_PROMPTS = StartupCrew.crew.COMPACT_PROMPTS = compact
+    sites = ", ".join(base_url + inv["site"] for inv in manifest["investors"])
+    portfolios = [base_url + inv["portfolio"] for inv in manifest["investors"]]
+    return {
+        "web_scraping_tool": count_tokens(InvestorCrew.crew.web_scraping_tool.func(sites)),
+        "portfolio_validator_tool": count_tokens(
+            InvestorCrew.crew.portfolio_validator_tool.func(", ".join(portfolios))),
+        "portfolio_company_extractor": sum(
+            count_tokens(StartupCrew.crew.portfolio_company_extractor.func(url)) for url in portfolios),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="HEAD", help="referência do git com os prompts de antes")
+    parser.add_argument("--output", help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    results = {"baseline": args.baseline, "tasks": {}, "tools": {}}
+    print(f"{'task':<28} {'antes':>8} {'depois':>8} {'Δ':>7}   raciocínio  memória")
+    for crew in CREWS:
+        before, after = task_prompts(crew, args.baseline), task_prompts(crew, None)
+        flags = baseline_flags(crew, args.baseline)
+        for name, current in after.items():
+            previous = before.get(name, {"tokens": 0, "reasoning_calls": 0, "memory": False})
+            previous.update(flags.get(current["agent"], {}))
+            change = (current["tokens"] - previous["tokens"]) / previous["tokens"] if previous["tokens"] else 0.0
+            results["tasks"][f"{crew}.{name}"] = {"before": previous, "after": current}
+            print(f"{name:<28} {previous['tokens']:>8} {current['tokens']:>8} {change:>7.0%}   "
+                  f"{previous['reasoning_calls']} -> {current['reasoning_calls']}      "
+                  f"{'sim' if previous['memory'] else 'não'} -> {'sim' if current['memory'] else 'não'}")
+
+    with open(os.path.join(FIXTURES, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    server, base_url = start_server()
+    verbose, compact = tool_outputs(base_url, manifest, False), tool_outputs(base_url, manifest, True)
+    server.shutdown()
+
+    print(f"\n{'ferramenta (fixtures)':<28} {'detalh.':>8} {'compacto':>8} {'Δ':>7}")
+    for name in verbose:
+        change = (compact[name] - verbose[name]) / verbose[name] if verbose[name] else 0.0
+        results["tools"][name] = {"verbose": verbose[name], "compact": compact[name]}
+        print(f"{name:<28} {verbose[name]:>8} {compact[name]:>8} {change:>7.0%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"📝 Relatório em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
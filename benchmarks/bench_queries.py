@@ -0,0 +1,144 @@
+"""Benchmark das consultas de db/queries.py sobre um dataset sintético
+
+Uso:
+    python benchmarks/bench_queries.py                  # 1M startups em SQLite temporário
+    python benchmarks/bench_queries.py --rows 100000 --no-indexes
+    python benchmarks/bench_queries.py --url postgresql://localhost/bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from db.migrations import upgrade  # noqa: E402
+from db.models import Base, FundingRound, Investor, Startup  # noqa: E402
+from db.queries import ai_nvidia_startups, funding_rounds_by_investor, startups_by_country_sector  # noqa: E402
+from db.session import create_db_engine  # noqa: E402
+
+COUNTRIES = ["BR", "MX", "AR", "CL", "CO", "PE", "UY", "US"]
+SECTORS = ["fintech", "healthtech", "edtech", "agtech", "ai", "robotics", "saas", "logistics", "retail", "energy"]
+BATCH = 20_000
+
+
+def populate(engine, rows: int, investors: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(insert(Investor), [
+            {"name": f"Investor {i}", "website": f"https://investor{i}.vc", "type": "VC"}
+            for i in range(investors)
+        ])
+        for start in range(0, rows, BATCH):
+            conn.execute(insert(Startup), [
+                {
+                    "name": f"Startup {i}",
+                    "website": f"https://startup{i}.com",
+                    "country": rng.choice(COUNTRIES),
+                    "sector": rng.choice(SECTORS),
+                    "founded_year": rng.randint(2005, 2024),
+                    "ai_or_accelerated_computing": rng.random() < 0.2,
+                    "nvidia_stack_alignment": rng.random() < 0.1,
+                }
+                for i in range(start, min(start + BATCH, rows))
+            ])
+        base = date(2015, 1, 1)
+        for start in range(0, rows, BATCH):
+            conn.execute(insert(FundingRound), [
+                {
+                    "startup_id": i + 1,
+                    "investor_id": rng.randint(1, investors),
+                    "round_date": base + timedelta(days=rng.randint(0, 3650)),
+                    "round_type": rng.choice(["seed", "series a", "series b"]),
+                }
+                for i in range(start, min(start + BATCH, rows))
+            ])
+
+
+def drop_secondary_indexes(engine):
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def timed(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def walk(query, pages: int, cursor_arg: str):
+    """Percorre até `pages` páginas seguindo o cursor"""
+    def run():
+        cursor = None
+        for _ in range(pages):
+            page = query(**{cursor_arg: cursor})
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--investors", type=int, default=500)
+    parser.add_argument("--url", help="banco alvo (padrão: SQLite temporário)")
+    parser.add_argument("--pages", type=int, default=20, help="páginas percorridas por consulta")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-indexes", action="store_true", help="remove os índices secundários (baseline)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_db_engine(url)
+    Base.metadata.drop_all(engine)
+    upgrade(engine)
+
+    start = time.perf_counter()
+    populate(engine, args.rows, args.investors, args.seed)
+    print(f"📦 {args.rows} startups geradas em {time.perf_counter() - start:.1f}s ({url})")
+
+    if args.no_indexes:
+        drop_secondary_indexes(engine)
+        print("⚠️ Índices secundários removidos")
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+    session = sessionmaker(bind=engine)()
+    limit = args.page_size
+    queries = {
+        "startups_by_country_sector": walk(
+            lambda after_id: startups_by_country_sector(session, "BR", "ai", after_id=after_id, limit=limit),
+            args.pages, "after_id"),
+        "ai_nvidia_startups": walk(
+            lambda after_id: ai_nvidia_startups(session, after_id=after_id, limit=limit),
+            args.pages, "after_id"),
+        "funding_rounds_by_investor": walk(
+            lambda after: funding_rounds_by_investor(session, 7, date(2018, 1, 1), date(2020, 12, 31),
+                                                     after=after, limit=limit),
+            args.pages, "after"),
+    }
+
+    print(f"\n{'consulta':<30} {'p50 ms':>10} {'max ms':>10}   ({args.pages} páginas de {limit})")
+    for name, run in queries.items():
+        samples = timed(run, args.repeat)
+        session.expunge_all()
+        print(f"{name:<30} {statistics.median(samples):>10.1f} {max(samples):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
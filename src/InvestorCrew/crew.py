@@ -1,57 +1,41 @@
-import os
-import requests
-from bs4 import BeautifulSoup
-from crewai import LLM, Agent, Crew, Process, Task
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.tools import tool
 from typing import List, Optional
 from pydantic import BaseModel
-from urllib.parse import urljoin
 import re
 
+from instrumentation import timed
+from llms.context import COMPACT_PROMPTS
+from llms.factory import build_llm
+from llms.router import ROLE_JSON, ROLE_RESEARCH
+from scraping.dom import get_page
+from scraping.aio import get_engine, split_urls
+from scraping.keywords import PORTFOLIO_MATCHER
+
 # Definindo as ferramentas diretamente no arquivo
-@tool("Web Scraper")
-def web_scraping_tool(url: str) -> str:
-    """Access websites and extract content, navigation menus, and links"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract navigation menu
-        nav_elements = soup.find_all(['nav', 'header', 'menu'])
-        nav_links = []
-        for nav in nav_elements:
-            links = nav.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                text = link.get_text(strip=True)
-                if href and text:
-                    full_url = urljoin(url, href)
-                    nav_links.append(f"{text}: {full_url}")
-        
-        # Look for specific portfolio-related terms
-        portfolio_keywords = [
-            'portfolio', 'portfólio', 'portafolio', 'companies', 'empresas', 
-            'investments', 'inversiones', 'startups', 'portfolio companies',
-            'our companies', 'nossas empresas', 'nuestras empresas'
-        ]
-        
-        portfolio_links = []
-        all_links = soup.find_all('a', href=True)
-        for link in all_links:
-            href = link.get('href')
-            text = link.get_text(strip=True).lower()
-            if any(keyword in text for keyword in portfolio_keywords):
-                full_url = urljoin(url, href)
-                portfolio_links.append(f"{link.get_text(strip=True)}: {full_url}")
-        
-        result = f"""
+def analyze_website(url, response):
+    """Navigation and portfolio-related links of a fetched website"""
+    response.raise_for_status()
+    
+    page = get_page(url, response.content)
+    
+    # Extract navigation menu
+    nav_links = [f"{text}: {full_url}" for text, full_url in page.nav_links]
+    
+    # Look for specific portfolio-related terms
+    portfolio_links = []
+    for link_text, full_url in page.links:
+        if PORTFOLIO_MATCHER.search(link_text):
+            portfolio_links.append(f"{link_text}: {full_url}")
+    
+    if COMPACT_PROMPTS:
+        # Only what the agent needs to pick candidates; nav links as a fallback
+        links = portfolio_links or nav_links[:10]
+        label = "PORTFOLIO LINKS" if portfolio_links else "NO PORTFOLIO LINKS, NAVIGATION"
+        return f"{url} ({page.title or 'No title'}) {label}:\n" + ("\n".join(links) or "none")
+    
+    return f"""
 WEBSITE ANALYSIS FOR: {url}
 
 NAVIGATION MENU LINKS:
@@ -60,48 +44,43 @@ NAVIGATION MENU LINKS:
 PORTFOLIO-RELATED LINKS FOUND:
 {chr(10).join(portfolio_links) if portfolio_links else "No portfolio-related links found"}
 
-PAGE TITLE: {soup.title.get_text(strip=True) if soup.title else "No title"}
+PAGE TITLE: {page.title or "No title"}
 """
-        return result
-        
-    except Exception as e:
-        return f"Error accessing {url}: {str(e)}"
 
-@tool("Portfolio Validator")
-def portfolio_validator_tool(url: str) -> str:
-    """Validate if a portfolio URL actually contains portfolio companies"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Count potential company listings
-        company_elements = soup.find_all(['div', 'section', 'article'], 
-                                       class_=re.compile(r'(company|portfolio|startup|investment)', re.I))
-        
-        # Look for lists of companies
-        lists = soup.find_all(['ul', 'ol'])
-        company_lists = [len(ul.find_all('li')) for ul in lists if len(ul.find_all('li')) > 2]
-        
-        # Check for company names/logos
-        images = soup.find_all('img')
-        logo_count = sum(1 for img in images if any(term in img.get('alt', '').lower() or 
-                                                  term in img.get('src', '').lower() 
-                                                  for term in ['logo', 'company', 'startup']))
-        
-        # Analyze results
-        has_companies = (
-            len(company_elements) > 0 or 
-            len(company_lists) > 0 or 
-            logo_count > 3
-        )
-        
-        result = f"""
+COMPANY_ELEMENT_RE = re.compile(r'(company|portfolio|startup|investment)', re.I)
+
+def validate_portfolio(url, response):
+    """Portfolio validation report for a fetched page"""
+    response.raise_for_status()
+    
+    page = get_page(url, response.content)
+    soup = page.soup
+    
+    # Count potential company listings
+    company_elements = soup.find_all(['div', 'section', 'article'], class_=COMPANY_ELEMENT_RE)
+    
+    # Look for lists of companies
+    company_lists = [li_count for _, li_count in page.lists if li_count > 2]
+    
+    # Check for company names/logos
+    images = soup.find_all('img')
+    logo_count = sum(1 for img in images if any(term in img.get('alt', '').lower() or 
+                                              term in img.get('src', '').lower() 
+                                              for term in ['logo', 'company', 'startup']))
+    
+    # Analyze results
+    has_companies = (
+        len(company_elements) > 0 or 
+        len(company_lists) > 0 or 
+        logo_count > 3
+    )
+    
+    if COMPACT_PROMPTS:
+        status = "✅ VALID" if has_companies else "❌ INVALID"
+        return (f"{url}: {status} ({len(company_elements)} company elements, "
+                f"{len(company_lists)} lists, {logo_count} logos)")
+    
+    return f"""
 PORTFOLIO VALIDATION FOR: {url}
 
 STATUS: {'✅ VALID - Contains portfolio companies' if has_companies else '❌ INVALID - No portfolio companies found'}
@@ -112,10 +91,36 @@ ANALYSIS:
 - Company logos/images found: {logo_count}
 - Response status: {response.status_code}
 """
-        return result
-        
-    except Exception as e:
-        return f"Error validating {url}: {str(e)}"
+
+def run_batch(urls, analyze, error_prefix):
+    """Fetch all URLs concurrently and join one report per URL (in input order)"""
+    url_list = split_urls(urls)
+    if not url_list:
+        return "No URL provided"
+    
+    reports = []
+    for url, response in zip(url_list, get_engine().fetch_many(url_list)):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            reports.append(analyze(url, response))
+        except Exception as e:
+            reports.append(f"{error_prefix} {url}: {str(e)}")
+    return "\n".join(reports)
+
+@tool("Web Scraper")
+@timed("tool.web_scraper")
+def web_scraping_tool(urls: str) -> str:
+    """Access websites and extract content, navigation menus, and links.
+    Accepts one URL or several URLs separated by commas, which are fetched in parallel."""
+    return run_batch(urls, analyze_website, "Error accessing")
+
+@tool("Portfolio Validator")
+@timed("tool.portfolio_validator")
+def portfolio_validator_tool(urls: str) -> str:
+    """Validate if a portfolio URL actually contains portfolio companies.
+    Accepts one URL or several URLs separated by commas, which are validated in parallel."""
+    return run_batch(urls, validate_portfolio, "Error validating")
 
 class Investor(BaseModel):
     name: str
@@ -128,11 +133,10 @@ class Investor(BaseModel):
 class InvestorList(BaseModel):
     investors: List[Investor]
     
-llm = LLM(
-    model="perplexity/sonar",
-    base_url="https://api.perplexity.ai/",
-    api_key=os.getenv("PERPLEXITY_API_KEY")
-)
+# Provedores roteados por papel, com cache de respostas compartilhado (ver llms/factory.py):
+# pesquisa prefere o perplexity/sonar; a conversão para JSON vai para o provedor mais rápido
+llm = build_llm(role=ROLE_RESEARCH)
+json_llm = build_llm(role=ROLE_JSON)
 
 @CrewBase
 class InvestorCrew():
@@ -145,9 +149,6 @@ class InvestorCrew():
             config=self.agents_config['investor_research_agent'],
             verbose=True,
             allow_delegation=False,
-            reasoning=True,
-            max_reasoning_attempts=2,
-            memory=True,
             llm=llm
         )
 
@@ -157,9 +158,6 @@ class InvestorCrew():
             config=self.agents_config['investor_validation_agent'],
             verbose=True,
             allow_delegation=False,
-            reasoning=True,
-            max_reasoning_attempts=3,
-            memory=True,
             llm=llm,
             tools=[web_scraping_tool, portfolio_validator_tool]
         )
@@ -170,8 +168,7 @@ class InvestorCrew():
             config=self.agents_config['text2json_agent'],
             verbose=True,
             allow_delegation=False,
-            memory=True,
-            llm=llm
+            llm=json_llm
         )
 
     @task
@@ -1,68 +1,293 @@
 import os
+import threading
+
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+from validation import normalize_domain, normalize_name
+
+from .writer import BufferedSheetWriter, sheets_retry
+
+INVESTOR_HEADER = ["name", "type", "website", "hq_country", "focus", "portfolio_url"]
+STARTUP_HEADER = ["startup_name", "website", "description", "sector", "stage", "vc_name"]
+
+# Colunas que identificam uma linha única em cada aba (ver config/tasks.yaml)
+INVESTOR_KEY = ("name", "website")
+# Uma linha por startup (nome + domínio, como a resolução de entidades): vc_name traz
+# todos os investidores dela, separados por "; "
+STARTUP_KEY = ("startup_name", "website")
+# Como cada coluna da chave é comparada (as demais: sem espaços nas pontas e sem caixa)
+KEY_NORMALIZERS = {"name": normalize_name, "startup_name": normalize_name, "website": normalize_domain}
+
+
+def _cell(value) -> str:
+    """Normaliza um valor como o Sheets devolve (string, sem None)"""
+    return "" if value is None else str(value)
+
+
+def _plain(value: str) -> str:
+    return value.strip().lower()
+
+
+def _row_key(row: list, positions: list[tuple[int, object]]) -> tuple:
+    """Chave da linha a partir de (posição, normalização) de cada coluna da chave"""
+    return tuple(normalize(_cell(row[p])) if p < len(row) else "" for p, normalize in positions)
+
+
+def _same_row(existing: list, row: list) -> bool:
+    """Compara só as colunas que escrevemos (a aba pode ter colunas extras)"""
+    padded = [_cell(v) for v in existing[:len(row)]]
+    padded += [""] * (len(row) - len(padded))
+    return padded == row
+
 class SheetsCrew:
-    def __init__(self, spreadsheet_id: str, worksheet_name: str = "Funding Round", credentials_path: str | None = None):
-        base_dir = os.path.dirname(__file__)
-        cred_path = credentials_path or os.path.join(base_dir, "config", "credentials.json")
-
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive",
-            "https://www.googleapis.com/auth/spreadsheets"
-        ]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
-        self.client = gspread.authorize(creds)
+    def __init__(self, spreadsheet_id: str, worksheet_name: str = "Funding Round", credentials_path: str | None = None,
+                 flush_rows: int = 500, flush_interval: float = 30.0, spreadsheet=None):
+        # Uma planilha já aberta (ex.: a falsa dos testes) dispensa as credenciais
+        if spreadsheet is None:
+            base_dir = os.path.dirname(__file__)
+            cred_path = credentials_path or os.path.join(base_dir, "config", "credentials.json")
+
+            scope = [
+                "https://spreadsheets.google.com/feeds",
+                "https://www.googleapis.com/auth/drive",
+                "https://www.googleapis.com/auth/spreadsheets"
+            ]
+            creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
+            self.client = gspread.authorize(creds)
+            spreadsheet = self.client.open_by_key(spreadsheet_id)
+
+        # Linhas pendentes por aba; gravadas em lote por flush()
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._writers: dict[str, BufferedSheetWriter] = {}
+        # Handles e cabeçalhos das abas, abertos uma vez por sessão
+        self._worksheets: dict[str, gspread.Worksheet] = {}
+        self._headers: dict[str, list[str]] = {}
+        # Índice chave -> (linha, valores) das abas com deduplicação
+        self._indexes: dict[str, dict[tuple, tuple[int, list]]] = {}
+        self._key_positions: dict[str, list[tuple[int, object]]] = {}
+        self._row_counts: dict[str, int] = {}
+        # Índices e buffers são alterados pelo pipeline e pelo timer de flush dos writers;
+        # a ordem dos locks é sempre este e depois o do writer
+        self._lock = threading.RLock()
+
+        # Garante a aba padrão
+        self.spreadsheet = spreadsheet
+        self.worksheet_name = worksheet_name
+        self.sheet = self._worksheet(worksheet_name)
 
-        # Abre a planilha por ID e garante a aba
-        self.spreadsheet = self.client.open_by_key(spreadsheet_id)
+    def _worksheet(self, worksheet_name: str, header: list[str] | None = None, refresh: bool = False,
+                   key: tuple[str, ...] | None = None):
+        """Retorna a aba do cache, abrindo/criando (com cabeçalho) só na primeira vez"""
+        if not refresh and worksheet_name in self._worksheets:
+            return self._worksheets[worksheet_name]
+
+        values = []
         try:
-            self.sheet = self.spreadsheet.worksheet(worksheet_name)
+            ws = self.spreadsheet.worksheet(worksheet_name)
+            # Abas com chave carregam tudo de uma vez para montar o índice
+            if key:
+                values = ws.get_all_values()
+                current_header = values[0] if values else []
+            else:
+                current_header = ws.row_values(1)
         except gspread.WorksheetNotFound:
-            self.sheet = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=26)
+            ws = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=26)
+            current_header = []
+
+        if header and not current_header:
+            sheets_retry(ws.append_row)(header, value_input_option="USER_ENTERED")
+            current_header = list(header)
+        elif header and current_header[:len(header)] != header:
+            # As linhas são gravadas na ordem de `header`: com outras colunas iriam para o lugar errado
+            raise ValueError(
+                f"Cabeçalho da aba '{worksheet_name}' difere do esperado: {current_header} (esperado: {header})"
+            )
+
+        self._worksheets[worksheet_name] = ws
+        self._headers[worksheet_name] = current_header
+        if key:
+            self._build_index(worksheet_name, current_header, header or [], key, values)
+        return ws
+
+    def _build_index(self, worksheet_name: str, current_header: list[str], header: list[str],
+                     key: tuple[str, ...], values: list[list]):
+        positions = [
+            (current_header.index(col) if col in current_header else header.index(col),
+             KEY_NORMALIZERS.get(col, _plain))
+            for col in key
+        ]
+        # Atualizado no lugar: quem já tem uma referência ao índice continua vendo o atual
+        index = self._indexes.setdefault(worksheet_name, {})
+        index.clear()
+        for row_number, row in enumerate(values[1:], start=2):
+            row_key = _row_key(row, positions)
+            if any(row_key):
+                index.setdefault(row_key, (row_number, row))
+        self._key_positions[worksheet_name] = positions
+        self._row_counts[worksheet_name] = len(values) if values else (1 if current_header else 0)
+        writer = self._writers.get(worksheet_name)
+        if writer is not None:
+            writer.next_row = self._row_counts[worksheet_name] + 1
+
+    def invalidate(self, worksheet_name: str | None = None):
+        """Descarta o cache de uma aba (ou de todas) para forçar nova leitura
+
+        O writer da aba grava o que tem pendente e é descartado junto: o
+        próximo save abre outro, com a aba e o índice relidos.
+        """
+        with self._lock:
+            names = list(self._worksheets) if worksheet_name is None else [worksheet_name]
+            for name in names:
+                writer = self._writers.get(name)
+                if writer is not None:
+                    writer.close()
+                    del self._writers[name]
+                self._worksheets.pop(name, None)
+                self._headers.pop(name, None)
+                self._indexes.pop(name, None)
+                self._key_positions.pop(name, None)
+                self._row_counts.pop(name, None)
+
+    def _writer(self, worksheet_name: str, header: list[str] | None = None,
+                key: tuple[str, ...] | None = None) -> BufferedSheetWriter:
+        writer = self._writers.get(worksheet_name)
+        if writer is None:
+            writer = BufferedSheetWriter(
+                self._worksheet(worksheet_name, header, key=key),
+                max_rows=self.flush_rows,
+                max_interval=self.flush_interval,
+                reopen=lambda: self._reopen(worksheet_name, header, key),
+                on_due=lambda: self._flush_due(worksheet_name),
+            )
+            self._writers[worksheet_name] = writer
+            if key:
+                writer.next_row = self._row_counts[worksheet_name] + 1
+        return writer
+
+    def _reopen(self, worksheet_name: str, header: list[str] | None, key: tuple[str, ...] | None):
+        """Relê a aba após um erro de gravação sem perder as linhas ainda no buffer
+
+        Chamado pelo writer no meio do flush: as atualizações pendentes passam
+        para a linha onde a chave está agora (ou viram linhas novas, se ela
+        sumiu), e as linhas novas voltam ao índice nas posições que terão depois
+        das linhas atuais da aba, com o next_row do writer contando com elas.
+        """
+        with self._lock:
+            writer = self._writers[worksheet_name]
+            pending_updates = writer.buffered_updates
+            ws = self._worksheet(worksheet_name, header, refresh=True, key=key)
+            if key:
+                index = self._indexes[worksheet_name]
+                positions = self._key_positions[worksheet_name]
+                updates, lost = {}, []
+                for row in pending_updates.values():
+                    row_key = _row_key(row, positions)
+                    existing = index.get(row_key)
+                    if existing is None:
+                        lost.append(row)
+                    else:
+                        index[row_key] = (existing[0], row)
+                        updates[existing[0]] = row
+                writer.requeue(updates, lost)
+                pending = writer.buffered_rows
+                first = self._row_counts[worksheet_name] + 1
+                for offset, row in enumerate(pending):
+                    row_key = _row_key(row, positions)
+                    if any(row_key):
+                        index[row_key] = (first + offset, row)
+                writer.next_row = first + len(pending)
+            return ws
+
+    def _flush_due(self, worksheet_name: str):
+        with self._lock:
+            writer = self._writers.get(worksheet_name)
+            if writer is not None:
+                writer.flush_due()
+
+    def _upsert(self, worksheet_name: str, header: list[str], key: tuple[str, ...], rows: list[list]) -> dict:
+        """Insere linhas novas, atualiza as alteradas e ignora as idênticas"""
+        with self._lock:
+            writer = self._writer(worksheet_name, header, key)
+            index = self._indexes[worksheet_name]
+            positions = self._key_positions[worksheet_name]
+            website_slot = key.index("website") if "website" in key else None
+            summary = {"inserted": 0, "updated": 0, "skipped": 0}
+
+            for row in rows:
+                row = [_cell(v) for v in row]
+                row_key = _row_key(row, positions)
+                existing = index.get(row_key)
+                if existing is None and website_slot is not None and row_key[website_slot]:
+                    # Linha gravada antes sem site: passa a ter o site em vez de duplicar
+                    existing = index.pop(row_key[:website_slot] + ("",) + row_key[website_slot + 1:], None)
+                # O índice é atualizado antes do writer: um flush dentro dele pode reabrir
+                # a aba e renumerar as linhas pendentes, inclusive esta
+                if existing is None:
+                    index[row_key] = (writer.next_row, row)
+                    writer.add(row)
+                    summary["inserted"] += 1
+                elif not _same_row(existing[1], row):
+                    index[row_key] = (existing[0], row)
+                    writer.update(existing[0], row)
+                    summary["updated"] += 1
+                else:
+                    summary["skipped"] += 1
+            return summary
+
+    def flush(self):
+        """Grava todas as linhas pendentes (uma chamada append_rows por aba)"""
+        with self._lock:
+            for writer in self._writers.values():
+                writer.flush()
+
+    def close(self):
+        """Grava o que estiver pendente e para os timers de flush"""
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def append_row(self, row: list):
-        self.sheet.append_row(row, value_input_option="USER_ENTERED")
+        with self._lock:
+            self._writer(self.worksheet_name).add(row)
 
     def append_rows(self, rows: list[list]):
-        for row in rows:
-            self.append_row(row)
+        with self._lock:
+            self._writer(self.worksheet_name).extend(rows)
 
     def save_investors(self, investors, worksheet_name: str = "Investors"):
-        try:
-            ws = self.spreadsheet.worksheet(worksheet_name)
-        except gspread.WorksheetNotFound:
-            ws = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=26)
-            # Adiciona cabeçalho para investidores
-            ws.append_row(["name", "type", "website", "hq_country", "focus", "portfolio_url"])
-        
+        """Grava investidores sem duplicar name+website; devolve o resumo da gravação"""
+        rows = []
         for inv in investors:
-            row = [
+            rows.append([
                 inv.get("name", ""),
                 inv.get("type", ""),
                 inv.get("website", ""),
                 inv.get("hq_country", ""),
                 inv.get("focus", ""),
                 inv.get("portfolio_url", "")
-            ]
-            ws.append_row(row, value_input_option="USER_ENTERED")
+            ])
+        # Cabeçalho para investidores é criado junto com a aba
+        return self._upsert(worksheet_name, INVESTOR_HEADER, INVESTOR_KEY, rows)
 
     def save_startups(self, startups, vc_name: str, worksheet_name: str = "Startups"):
-        try:
-            ws = self.spreadsheet.worksheet(worksheet_name)
-        except gspread.WorksheetNotFound:
-            ws = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=26)
-            # Adiciona cabeçalho para startups: startup_name, website, description, sector, stage, vc_name
-            ws.append_row(["startup_name", "website", "description", "sector", "stage", "vc_name"])
-        
+        """Grava startups sem duplicar nome + domínio do site; devolve o resumo da gravação"""
+        rows = []
         for st in startups:
-            row = [
+            rows.append([
                 st.get("name", ""),                    # startup_name
                 st.get("website", ""),                 # website
                 st.get("description", ""),             # description
                 st.get("sector", ""),                  # sector
                 st.get("stage", st.get("funding", "")), # stage (pode vir como "funding")
-                vc_name                                # vc_name
-            ]
-            ws.append_row(row, value_input_option="USER_ENTERED")
\ No newline at end of file
+                "; ".join(st.get("investors") or [vc_name])  # vc_name (todos os investidores)
+            ])
+        # Cabeçalho para startups: startup_name, website, description, sector, stage, vc_name
+        return self._upsert(worksheet_name, STARTUP_HEADER, STARTUP_KEY, rows)
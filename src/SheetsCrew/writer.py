@@ -0,0 +1,185 @@
+import threading
+import time
+
+import gspread
+from gspread.utils import rowcol_to_a1
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+# Códigos HTTP que indicam quota estourada ou falha temporária da API do Sheets
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """True para erros de quota/servidor da API do Google Sheets"""
+    if not isinstance(exc, gspread.exceptions.APIError):
+        return False
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) in RETRYABLE_STATUS
+
+
+sheets_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential(multiplier=1, min=2, max=60),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+
+
+class BufferedSheetWriter:
+    """Acumula linhas de uma aba e grava tudo com um único append_rows/batch_update
+
+    O buffer é gravado ao chegar a max_rows ou, por um timer, max_interval
+    segundos depois da primeira linha pendente, mesmo sem novas gravações.
+    """
+
+    def __init__(self, worksheet, max_rows: int = 500, max_interval: float = 30.0,
+                 value_input_option: str = "USER_ENTERED", reopen=None, on_due=None):
+        self.worksheet = worksheet
+        # Callback que reabre a aba quando o handle em cache fica inválido
+        self.reopen = reopen
+        # Chamado pelo timer quando o buffer vence (padrão: flush_due)
+        self.on_due = on_due or self.flush_due
+        self.max_rows = max_rows
+        self.max_interval = max_interval
+        self.value_input_option = value_input_option
+        self._rows: list[list] = []
+        # Atualizações pendentes por número de linha (1-based)
+        self._updates: dict[int, list] = {}
+        self._first_buffered_at: float | None = None
+        # Próxima linha livre da aba; só é conhecida quando o índice foi carregado
+        self.next_row: int | None = None
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + len(self._updates)
+
+    @property
+    def buffered_rows(self) -> list[list]:
+        """Linhas novas ainda no buffer, na ordem em que serão anexadas"""
+        return list(self._rows)
+
+    @property
+    def buffered_updates(self) -> dict[int, list]:
+        """Atualizações ainda no buffer, por número de linha"""
+        return dict(self._updates)
+
+    def requeue(self, updates: dict[int, list], rows: list[list]):
+        """Troca as atualizações pendentes e acrescenta linhas novas ao buffer
+
+        Usado pelo reopen, que já roda dentro do flush (com o lock tomado).
+        """
+        self._updates = dict(updates)
+        self._rows.extend(rows)
+
+    def add(self, row: list):
+        self.extend([row])
+
+    def extend(self, rows: list[list]):
+        with self._lock:
+            if not rows:
+                return
+            self._touch()
+            self._rows.extend(rows)
+            if self.next_row is not None:
+                self.next_row += len(rows)
+            if self._should_flush():
+                self._flush_locked()
+
+    def update(self, row_number: int, row: list):
+        """Enfileira a substituição de uma linha existente"""
+        with self._lock:
+            self._touch()
+            first_pending = self.next_row - len(self._rows) if self.next_row is not None else None
+            if first_pending is not None and row_number >= first_pending:
+                # Linha ainda está no buffer de inserção: troca antes de enviar
+                self._rows[row_number - first_pending] = row
+            else:
+                self._updates[row_number] = row
+            if self._should_flush():
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def flush_due(self):
+        """Grava o buffer pendente (chamado pelo timer de max_interval)"""
+        with self._lock:
+            self._timer = None
+            if self.pending:
+                self._flush_locked()
+
+    def close(self):
+        """Grava o que estiver pendente e cancela o timer"""
+        with self._lock:
+            self._flush_locked()
+
+    def _touch(self):
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+            if self._timer is None and self.max_interval > 0:
+                self._timer = threading.Timer(self.max_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        try:
+            self.on_due()
+        except Exception as e:
+            print(f"❌ Erro ao gravar linhas pendentes da aba {getattr(self.worksheet, 'title', '')}: {e}")
+
+    def _should_flush(self) -> bool:
+        if self.pending >= self.max_rows:
+            return True
+        return (self._first_buffered_at is not None
+                and time.monotonic() - self._first_buffered_at >= self.max_interval)
+
+    def _flush_locked(self):
+        if self._updates:
+            try:
+                self._batch_update(self._updates)
+            except (gspread.WorksheetNotFound, gspread.exceptions.APIError) as e:
+                if _is_retryable(e):
+                    raise
+                if self.reopen is None:
+                    # Sem como reabrir, o mesmo lote falharia em todo flush seguinte
+                    self._updates = {}
+                    raise
+                # Linhas podem ter mudado de lugar: o reopen renumera as atualizações pendentes
+                self.worksheet = self.reopen()
+                updates, self._updates = self._updates, {}
+                if updates:
+                    self._batch_update(updates)
+            self._updates = {}
+        if self._rows:
+            try:
+                self._append_rows(self._rows)
+            except (gspread.WorksheetNotFound, gspread.exceptions.APIError) as e:
+                if self.reopen is None or _is_retryable(e):
+                    raise
+                # Aba removida ou alterada desde que foi aberta: reabre e tenta de novo
+                # (o reopen recebe as linhas pendentes pelo buffered_rows e ajusta next_row)
+                self.worksheet = self.reopen()
+                self._append_rows(self._rows)
+            self._rows = []
+        self._first_buffered_at = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @sheets_retry
+    def _append_rows(self, rows: list[list]):
+        self.worksheet.append_rows(rows, value_input_option=self.value_input_option, table_range="A1")
+
+    @sheets_retry
+    def _batch_update(self, updates: dict[int, list]):
+        data = [
+            {
+                "range": f"{rowcol_to_a1(row_number, 1)}:{rowcol_to_a1(row_number, max(len(row), 1))}",
+                "values": [row],
+            }
+            for row_number, row in sorted(updates.items())
+        ]
+        self.worksheet.batch_update(data, value_input_option=self.value_input_option)
@@ -1,95 +1,219 @@
-import os
-import requests
-from bs4 import BeautifulSoup
-from crewai import LLM, Agent, Crew, Process, Task
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.tools import tool
+from dataclasses import dataclass, field
 from typing import List, Optional
 from pydantic import BaseModel
 from urllib.parse import urljoin, urlparse
+import json
 import re
 
+from instrumentation import timed
+from llms.context import COMPACT_PROMPTS
+from llms.factory import build_llm
+from llms.router import ROLE_JSON, ROLE_RESEARCH
+from scraping.crawler import PortfolioCrawler
+from scraping.keywords import FUNDING_MATCHER, TECH_MATCHER
+
 # Ferramentas para scraping de startups
-@tool("Portfolio Company Extractor")
-def portfolio_company_extractor(url: str) -> str:
-    """Extract detailed startup information from portfolio pages"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Look for company cards, sections, or lists
-        companies = []
-        
-        # Strategy 1: Look for common portfolio structures
-        portfolio_sections = soup.find_all(['div', 'section'], 
-                                         class_=re.compile(r'(portfolio|company|startup|investment)', re.I))
-        
-        # Strategy 2: Look for lists of companies
-        company_lists = soup.find_all(['ul', 'ol'])
-        for ul in company_lists:
-            items = ul.find_all('li')
-            if len(items) > 3:  # Likely a company list
-                for item in items:
-                    company_info = extract_company_info(item, url)
-                    if company_info:
-                        companies.append(company_info)
-        
-        # Strategy 3: Look for company cards/grids
-        card_patterns = [
-            'card', 'company', 'startup', 'portfolio-item', 'investment',
-            'empresa', 'portafolio', 'investimento'
-        ]
-        
-        for pattern in card_patterns:
-            cards = soup.find_all(['div', 'article'], class_=re.compile(pattern, re.I))
-            for card in cards:
-                company_info = extract_company_info(card, url)
-                if company_info:
-                    companies.append(company_info)
-        
-        # Strategy 4: Look for text patterns that suggest companies
-        text_content = soup.get_text()
-        company_patterns = find_company_patterns(text_content)
-        companies.extend(company_patterns)
+@dataclass
+class PortfolioExtraction:
+    """Companies found on a portfolio page plus the page analysis"""
+    url: str
+    status_code: int
+    title: Optional[str]
+    companies: List[dict] = field(default_factory=list)
+    # The first `structured_count` companies came from lists/cards; the rest from text patterns
+    structured_count: int = 0
+    sections_found: int = 0
+    lists_found: int = 0
+    pages_crawled: int = 1
+
+def extract_page_companies(page):
+    """Companies on one parsed page: (from lists/cards, from text patterns, sections, lists)"""
+    soup = page.soup
+    
+    # Look for company cards, sections, or lists
+    companies = []
+    
+    # Single walk over the tree: portfolio sections (strategy 1) and
+    # company cards bucketed per card pattern (strategy 3)
+    portfolio_sections, cards_by_pattern = classify_nodes(soup)
+    
+    # A node can match several strategies; extract it only once
+    extracted = {}
+    def extract_once(element):
+        key = id(element)
+        if key not in extracted:
+            extracted[key] = extract_company_info(element, page.url)
+        return extracted[key]
+    
+    # Strategy 2: Look for lists of companies
+    company_lists = [ul for ul, li_count in page.lists if li_count > 3]  # Likely a company list
+    for ul in company_lists:
+        for item in ul.find_all('li'):
+            company_info = extract_once(item)
+            if company_info:
+                companies.append(company_info)
+    
+    # Strategy 3: Look for company cards/grids (same order as one scan per pattern)
+    for cards in cards_by_pattern:
+        for card in cards:
+            company_info = extract_once(card)
+            if company_info:
+                companies.append(company_info)
+    
+    # Strategy 4: Look for text patterns that suggest companies
+    company_patterns = find_company_patterns(page.text)
+    
+    return companies, company_patterns, len(portfolio_sections), len(company_lists)
+
+JSON_NAME_KEYS = ('name', 'title', 'company', 'company_name')
+JSON_WEBSITE_KEYS = ('website', 'url', 'link', 'homepage', 'site')
+JSON_DESCRIPTION_KEYS = ('description', 'summary', 'excerpt', 'tagline', 'about')
+
+def json_text(value):
+    """Plain text of a JSON field (WordPress-style {"rendered": "..."} included)"""
+    if isinstance(value, dict):
+        value = value.get('rendered')
+    if not isinstance(value, str):
+        return None
+    return re.sub(r'<[^>]+>', ' ', value).strip() or None
+
+def companies_from_json(payload, base_url):
+    """Company-like records (a name plus a website or description) anywhere in a JSON payload"""
+    companies = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
         
-        # Remove duplicates
-        unique_companies = []
-        seen_names = set()
-        for company in companies:
-            name = company.get('name', '').strip().lower()
-            if name and name not in seen_names and len(name) > 2:
-                seen_names.add(name)
-                unique_companies.append(company)
+        name = next((json_text(node.get(key)) for key in JSON_NAME_KEYS if json_text(node.get(key))), None)
+        website = next((json_text(node.get(key)) for key in JSON_WEBSITE_KEYS if json_text(node.get(key))), None)
+        description = next((json_text(node.get(key)) for key in JSON_DESCRIPTION_KEYS if json_text(node.get(key))), None)
+        if name and 2 < len(name) < 100 and (website or description):
+            company = {'name': name, 'website': urljoin(base_url, website) if website else None}
+            if description and len(description) > 10:
+                company['description'] = description[:500]
+            text = ' '.join(filter(None, (name, description)))
+            found_tech = TECH_MATCHER.find_all(text)
+            if found_tech:
+                company['tech'] = found_tech[:3]
+            found_funding = FUNDING_MATCHER.find_all(text)
+            if found_funding:
+                company['funding_stage'] = found_funding[0]
+            companies.append(company)
+            continue
         
-        result = f"""
-PORTFOLIO EXTRACTION FOR: {url}
+        stack.extend(reversed(list(node.values())))
+    return companies
 
-COMPANIES FOUND: {len(unique_companies)}
+def extract_portfolio(url: str, crawler: Optional[PortfolioCrawler] = None) -> PortfolioExtraction:
+    """Crawl a portfolio (pagination, sector filters, load-more endpoints) and extract its companies
 
-DETAILED COMPANIES:
-{format_companies_output(unique_companies)}
+    Raises if the first page cannot be fetched; later pages are best effort.
+    """
+    crawl = (crawler or PortfolioCrawler()).crawl(url)
+    
+    structured, patterns = [], []
+    sections_found = lists_found = 0
+    for page in crawl.pages:
+        page_companies, page_patterns, sections, lists = extract_page_companies(page)
+        structured.extend(page_companies)
+        patterns.extend(page_patterns)
+        sections_found += sections
+        lists_found += lists
+    for endpoint, payload in crawl.json_payloads:
+        structured.extend(companies_from_json(payload, endpoint))
+    
+    # Remove duplicates across pages (structured results first, text patterns last)
+    companies = structured + patterns
+    unique_companies = []
+    seen_names = set()
+    structured_count = 0
+    for i, company in enumerate(companies):
+        name = company.get('name', '').strip().lower()
+        if name and name not in seen_names and len(name) > 2:
+            seen_names.add(name)
+            unique_companies.append(company)
+            if i < len(structured):
+                structured_count += 1
+    
+    first_page = next((page for page in crawl.pages if page.url == url), None)
+    return PortfolioExtraction(
+        url=url,
+        status_code=crawl.status_code,
+        title=first_page.title if first_page else None,
+        companies=unique_companies,
+        structured_count=structured_count,
+        sections_found=sections_found,
+        lists_found=lists_found,
+        pages_crawled=crawl.fetched,
+    )
 
-PAGE ANALYSIS:
-- Total portfolio sections found: {len(portfolio_sections)}
-- Company lists found: {len([ul for ul in company_lists if len(ul.find_all('li')) > 3])}
-- Response status: {response.status_code}
-- Page title: {soup.title.get_text(strip=True) if soup.title else 'No title'}
+@tool("Portfolio Company Extractor")
+@timed("tool.portfolio_company_extractor")
+def portfolio_company_extractor(url: str) -> str:
+    """Extract detailed startup information from portfolio pages"""
+    try:
+        extraction = extract_portfolio(url)
+        
+        # Every company, one JSON object per line (no truncation, no re-parsing of prose)
+        page_info = "" if COMPACT_PROMPTS else (
+            f"PAGE: status {extraction.status_code}, {extraction.pages_crawled} pages crawled, "
+            f"{extraction.sections_found} portfolio sections, {extraction.lists_found} company lists, "
+            f"title: {extraction.title or 'No title'}\n")
+        result = f"""PORTFOLIO EXTRACTION FOR: {url}
+COMPANIES FOUND: {len(extraction.companies)}
+{page_info}COMPANIES (JSON lines):
+{format_companies_jsonl(extraction.companies) or 'No companies found'}
 """
         return result
         
     except Exception as e:
         return f"Error extracting companies from {url}: {str(e)}"
 
+# The extractor output is already the structured answer of scrape_portfolio:
+# hand it to format_startups_json verbatim instead of having the agent restate it
+portfolio_company_extractor.result_as_answer = True
+
+SECTION_CLASS_RE = re.compile(r'(portfolio|company|startup|investment)', re.I)
+
+CARD_PATTERNS = [
+    'card', 'company', 'startup', 'portfolio-item', 'investment',
+    'empresa', 'portafolio', 'investimento'
+]
+CARD_PATTERN_RES = [re.compile(pattern, re.I) for pattern in CARD_PATTERNS]
+# Pre-filter so nodes without any card-like class skip the per-pattern checks
+ANY_CARD_RE = re.compile('|'.join(CARD_PATTERNS), re.I)
+
+def classify_nodes(soup):
+    """Visit every tag once and classify it against the section and card patterns"""
+    portfolio_sections = []
+    cards_by_pattern = [[] for _ in CARD_PATTERNS]
+    
+    for node in soup.find_all(True):
+        if node.name not in ('div', 'section', 'article'):
+            continue
+        classes = node.get('class')
+        if not classes:
+            continue
+        class_str = ' '.join(classes) if isinstance(classes, list) else classes
+        
+        if node.name != 'article' and SECTION_CLASS_RE.search(class_str):
+            portfolio_sections.append(node)
+        
+        if node.name != 'section' and ANY_CARD_RE.search(class_str):
+            for i, pattern_re in enumerate(CARD_PATTERN_RES):
+                if pattern_re.search(class_str):
+                    cards_by_pattern[i].append(node)
+    
+    return portfolio_sections, cards_by_pattern
+
 def extract_company_info(element, base_url):
     """Extract company information from a DOM element"""
     try:
@@ -137,19 +261,14 @@ def extract_company_info(element, base_url):
             if desc and len(desc) > 10:
                 company['description'] = desc[:500]  # Limit description
         
-        # Look for sector/tech keywords
-        text = element.get_text().lower()
-        tech_keywords = ['ai', 'artificial intelligence', 'machine learning', 'ml', 'deep learning', 
-                        'computer vision', 'nlp', 'robotics', 'automation', 'saas', 'fintech',
-                        'healthtech', 'edtech', 'blockchain', 'iot', 'cloud']
-        
-        found_tech = [keyword for keyword in tech_keywords if keyword in text]
+        # Look for sector/tech keywords (whole words only, one pass over the text)
+        text = element.get_text()
+        found_tech = TECH_MATCHER.find_all(text)
         if found_tech:
             company['tech'] = found_tech[:3]  # Limit to top 3
         
         # Look for funding stage
-        funding_keywords = ['seed', 'series a', 'series b', 'series c', 'pre-seed', 'ipo']
-        found_funding = [keyword for keyword in funding_keywords if keyword in text]
+        found_funding = FUNDING_MATCHER.find_all(text)
         if found_funding:
             company['funding_stage'] = found_funding[0]
         
@@ -158,13 +277,14 @@ def extract_company_info(element, base_url):
     except Exception:
         return None
 
+# Look for patterns like "Company Name - Description"
+COMPANY_PATTERN_RE = re.compile(r'([A-Z][a-zA-Z\s]{2,30})\s*[-–]\s*([^.]{10,100})')
+
 def find_company_patterns(text):
     """Find company names in text using patterns"""
     companies = []
     
-    # Look for patterns like "Company Name - Description"
-    pattern = r'([A-Z][a-zA-Z\s]{2,30})\s*[-–]\s*([^.]{10,100})'
-    matches = re.findall(pattern, text)
+    matches = COMPANY_PATTERN_RE.findall(text)
     
     for match in matches[:20]:  # Limit to 20 matches
         name, desc = match
@@ -180,29 +300,30 @@ def find_company_patterns(text):
     
     return companies
 
-def format_companies_output(companies):
-    """Format companies for output"""
-    if not companies:
-        return "No companies found"
-    
-    output = []
-    for i, company in enumerate(companies[:20], 1):  # Limit to 20 companies
-        output.append(f"{i}. {company.get('name', 'Unknown')}")
-        if company.get('website'):
-            output.append(f"   Website: {company['website']}")
-        if company.get('description'):
-            output.append(f"   Description: {company['description'][:100]}...")
-        if company.get('tech'):
-            output.append(f"   Tech: {', '.join(company['tech'])}")
-        output.append("")
-    
-    return "\n".join(output)
+# Extractor keys -> StartupCandidate fields
+PAYLOAD_FIELDS = {
+    'name': 'name',
+    'website': 'website',
+    'description': 'description',
+    'tech': 'tech',
+    'funding_stage': 'funding',
+}
+
+def company_payload(company):
+    """Compact dict with the StartupCandidate field names, without empty fields"""
+    return {field_name: company[key] for key, field_name in PAYLOAD_FIELDS.items() if company.get(key)}
+
+def format_companies_jsonl(companies):
+    """Format companies as JSON lines (one compact object per company)"""
+    return "\n".join(
+        json.dumps(company_payload(company), ensure_ascii=False, separators=(',', ':'))
+        for company in companies
+    )
 
-llm = LLM(
-    model="perplexity/sonar",
-    base_url="https://api.perplexity.ai/",
-    api_key=os.getenv("PERPLEXITY_API_KEY")
-)
+# Provedores roteados por papel, com cache de respostas compartilhado (ver llms/factory.py):
+# pesquisa prefere o perplexity/sonar; a conversão para JSON vai para o provedor mais rápido
+llm = build_llm(role=ROLE_RESEARCH)
+json_llm = build_llm(role=ROLE_JSON)
 
 class LeadershipPerson(BaseModel):
     role: str
@@ -234,9 +355,6 @@ class StartupCrew():
             config=self.agents_config['portfolio_scraping_agent'],
             verbose=True,
             allow_delegation=False,
-            reasoning=True,
-            max_reasoning_attempts=2,
-            memory=True,
             llm=llm,
             tools=[portfolio_company_extractor]
         )
@@ -247,8 +365,7 @@ class StartupCrew():
             config=self.agents_config['text2json_agent'],
             verbose=True,
             allow_delegation=False,
-            memory=True,
-            llm=llm
+            llm=json_llm
         )
         
     @task
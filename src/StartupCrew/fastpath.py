@@ -0,0 +1,74 @@
+import os
+
+from StartupCrew.crew import PortfolioExtraction, StartupCandidate, StartupList, extract_portfolio
+from validation import normalize_domain, rejection_reason
+
+# Desliga o atalho e manda todo portfolio para o StartupCrew (LLM)
+FAST_PATH_DISABLED = os.getenv("STARTUP_FAST_PATH_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Critérios de confiança na extração heurística
+FAST_PATH_MIN_COMPANIES = int(os.getenv("STARTUP_FAST_PATH_MIN_COMPANIES", "3"))
+# Fração mínima de empresas vindas de listas/cards (padrões de texto são ruidosos)
+FAST_PATH_MIN_STRUCTURED_RATIO = 0.8
+# Fração mínima com site externo (itens de menu apontam para o próprio domínio do VC)
+FAST_PATH_MIN_WEBSITE_RATIO = 0.6
+# Fração mínima que passaria na validação anti-alucinação
+FAST_PATH_MIN_VALID_RATIO = 0.8
+
+
+def external_website(company: dict, portfolio_host: str) -> str | None:
+    """Site da empresa, descartando links para o próprio domínio do portfolio"""
+    website = company.get("website")
+    domain = normalize_domain(website)
+    return website if domain and domain != portfolio_host else None
+
+
+def is_confident(extraction: PortfolioExtraction) -> bool:
+    """A extração heurística é boa o bastante para dispensar o LLM?"""
+    companies = extraction.companies[:extraction.structured_count]
+    if len(companies) < FAST_PATH_MIN_COMPANIES:
+        return False
+    if extraction.structured_count < FAST_PATH_MIN_STRUCTURED_RATIO * len(extraction.companies):
+        return False
+
+    host = normalize_domain(extraction.url)
+    with_website = sum(1 for company in companies if external_website(company, host))
+    if with_website < FAST_PATH_MIN_WEBSITE_RATIO * len(companies):
+        return False
+
+    valid = sum(1 for company in companies if rejection_reason(company) is None)
+    return valid >= FAST_PATH_MIN_VALID_RATIO * len(companies)
+
+
+def build_startup_list(extraction: PortfolioExtraction) -> StartupList | None:
+    """StartupList montada direto da extração, ou None se ela não for confiável"""
+    if not is_confident(extraction):
+        return None
+
+    host = normalize_domain(extraction.url)
+    return StartupList(startups=[
+        StartupCandidate(
+            name=company["name"],
+            website=external_website(company, host),
+            description=company.get("description"),
+            tech=company.get("tech"),
+            funding=company.get("funding_stage"),
+        )
+        for company in extraction.companies[:extraction.structured_count]
+    ])
+
+
+def fast_path_startups(portfolio_url: str) -> list[dict] | None:
+    """Startups do portfolio sem passar pelo LLM; None quando o StartupCrew é necessário"""
+    if FAST_PATH_DISABLED:
+        return None
+    try:
+        extraction = extract_portfolio(portfolio_url)
+    except Exception as e:
+        print(f"⚠️ Extração heurística falhou para {portfolio_url}: {e}")
+        return None
+
+    startup_list = build_startup_list(extraction)
+    if startup_list is None:
+        return None
+    return startup_list.model_dump()["startups"]
@@ -0,0 +1,33 @@
+"""Atualiza o schema de um banco existente para o de models.py
+
+Uso: python -m db.migrations  (a partir de src/, usando DATABASE_URL)
+"""
+from sqlalchemy import inspect
+
+from .models import Base
+
+
+def upgrade(engine) -> list[str]:
+    """Cria tabelas e índices que faltam; é idempotente. Devolve o que foi criado"""
+    existing_tables = set(inspect(engine).get_table_names())
+    created = [table.name for table in Base.metadata.sorted_tables if table.name not in existing_tables]
+    Base.metadata.create_all(engine)
+
+    # create_all não adiciona índices novos em tabelas que já existiam
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if table.name in created:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+if __name__ == "__main__":
+    from .session import create_db_engine
+
+    changes = upgrade(create_db_engine())
+    print(f"✅ Schema atualizado: {', '.join(changes) if changes else 'nada a fazer'}")
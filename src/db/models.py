@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey, Date, Numeric, TIMESTAMP, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey, Date, Numeric, TIMESTAMP, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from datetime import datetime
 
@@ -30,7 +30,18 @@ class Startup(Base):
     nvidia_stack_alignment = Column(Boolean)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
-    __table_args__ = (UniqueConstraint("name", "website"),)
+    __table_args__ = (
+        UniqueConstraint("name", "website"),
+        # "startups por país/setor", paginadas por id
+        Index("ix_startups_country_sector_id", "country", "sector", "id"),
+        Index("ix_startups_sector_id", "sector", "id"),
+        # "startups de IA alinhadas ao stack NVIDIA": índice parcial só com essas linhas
+        Index(
+            "ix_startups_ai_nvidia_id", "id",
+            postgresql_where=ai_or_accelerated_computing.is_(True) & nvidia_stack_alignment.is_(True),
+            sqlite_where=ai_or_accelerated_computing.is_(True) & nvidia_stack_alignment.is_(True),
+        ),
+    )
 
     funding_rounds = relationship("FundingRound", back_populates="startup")
     leadership = relationship("Leadership", back_populates="startup")
@@ -44,7 +55,11 @@ class FundingRound(Base):
     round_date = Column(Date)
     round_type = Column(Text)
 
-    __table_args__ = (UniqueConstraint("startup_id", "investor_id", "round_date"),)
+    __table_args__ = (
+        UniqueConstraint("startup_id", "investor_id", "round_date"),
+        # "rodadas por investidor e período", paginadas por (data, id)
+        Index("ix_funding_rounds_investor_date_id", "investor_id", "round_date", "id"),
+    )
 
     startup = relationship("Startup", back_populates="funding_rounds")
     investor = relationship("Investor", back_populates="funding_rounds")
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import and_, or_, select
+
+from .models import FundingRound, Startup
+
+DEFAULT_PAGE_SIZE = 100
+
+
+@dataclass
+class Page:
+    """Página de resultados; next_cursor é None na última página"""
+    items: list = field(default_factory=list)
+    next_cursor: object = None
+
+
+def _page(items: list, limit: int, cursor_of) -> Page:
+    # Busca limit + 1 linhas para saber se existe próxima página sem um COUNT
+    has_more = len(items) > limit
+    items = items[:limit]
+    return Page(items, cursor_of(items[-1]) if has_more else None)
+
+
+def startups_by_country_sector(session, country: str | None = None, sector: str | None = None,
+                               after_id: int | None = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+    """Startups filtradas por país e/ou setor, em ordem de id (usa ix_startups_*_id)"""
+    stmt = select(Startup)
+    if country is not None:
+        stmt = stmt.where(Startup.country == country)
+    if sector is not None:
+        stmt = stmt.where(Startup.sector == sector)
+    if after_id is not None:
+        stmt = stmt.where(Startup.id > after_id)
+    stmt = stmt.order_by(Startup.id).limit(limit + 1)
+    return _page(list(session.scalars(stmt)), limit, lambda st: st.id)
+
+
+def ai_nvidia_startups(session, after_id: int | None = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+    """Startups de IA/computação acelerada alinhadas ao stack NVIDIA (índice parcial)"""
+    # Mesmo predicado do índice parcial, para o planner conseguir usá-lo
+    stmt = select(Startup).where(
+        Startup.ai_or_accelerated_computing.is_(True) & Startup.nvidia_stack_alignment.is_(True)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Startup.id > after_id)
+    stmt = stmt.order_by(Startup.id).limit(limit + 1)
+    return _page(list(session.scalars(stmt)), limit, lambda st: st.id)
+
+
+def funding_rounds_by_investor(session, investor_id: int, start: date, end: date,
+                               after: tuple[date, int] | None = None,
+                               limit: int = DEFAULT_PAGE_SIZE) -> Page:
+    """Rodadas de um investidor com round_date em [start, end], em ordem de (data, id)
+
+    O cursor é a tupla (round_date, id) da última rodada da página anterior.
+    Rodadas sem data não entram em consultas por período.
+    """
+    stmt = select(FundingRound).where(
+        FundingRound.investor_id == investor_id,
+        FundingRound.round_date >= start,
+        FundingRound.round_date <= end,
+    )
+    if after is not None:
+        after_date, after_id = after
+        stmt = stmt.where(or_(
+            FundingRound.round_date > after_date,
+            and_(FundingRound.round_date == after_date, FundingRound.id > after_id),
+        ))
+    stmt = stmt.order_by(FundingRound.round_date, FundingRound.id).limit(limit + 1)
+    return _page(list(session.scalars(stmt)), limit, lambda fr: (fr.round_date, fr.id))
@@ -0,0 +1,122 @@
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import FundingRound, Investor, Leadership, Startup
+
+# Linhas por INSERT ... ON CONFLICT (fica abaixo do limite de parâmetros do SQLite)
+BATCH_SIZE = 500
+
+
+def _insert(session, model):
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise ValueError(f"Upsert não suportado para o banco '{dialect}'")
+
+
+class Repository:
+    """Upserts em lote de um modelo usando sua constraint única"""
+
+    model = None
+    conflict_columns: tuple[str, ...] = ()
+    update_columns: tuple[str, ...] = ()
+
+    def __init__(self, session):
+        self.session = session
+
+    def key(self, row: dict) -> tuple:
+        return tuple(row.get(col) for col in self.conflict_columns)
+
+    def bulk_upsert(self, rows: list[dict]) -> dict[tuple, int]:
+        """INSERT ... ON CONFLICT DO UPDATE em lotes; devolve chave -> id"""
+        # A mesma chave duas vezes no mesmo INSERT quebra o ON CONFLICT: a última vence
+        unique_rows = list({self.key(row): row for row in rows}.values())
+        ids = {}
+        key_columns = [getattr(self.model, col) for col in self.conflict_columns]
+
+        for start in range(0, len(unique_rows), BATCH_SIZE):
+            batch = unique_rows[start:start + BATCH_SIZE]
+            stmt = _insert(self.session, self.model).values(batch)
+            update_columns = [col for col in self.update_columns if col in batch[0]]
+            if update_columns:
+                # Valor ausente (None) no lote não apaga o que já está gravado
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(self.conflict_columns),
+                    set_={col: func.coalesce(stmt.excluded[col], getattr(self.model, col))
+                          for col in update_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(self.conflict_columns))
+            self.session.execute(stmt)
+
+            # RETURNING não devolve linhas ignoradas pelo DO NOTHING; busca os ids pela chave
+            keys = [self.key(row) for row in batch]
+            result = self.session.execute(
+                select(self.model.id, *key_columns).where(tuple_(*key_columns).in_(keys))
+            )
+            for row in result:
+                ids[tuple(row[1:])] = row[0]
+        return ids
+
+
+class InvestorRepository(Repository):
+    model = Investor
+    conflict_columns = ("name", "website")
+    update_columns = ("type", "focus", "portfolio_url")
+
+    def ids_by_name(self, names: list[str]) -> dict[str, int]:
+        result = self.session.execute(
+            select(Investor.name, Investor.id).where(Investor.name.in_(names)).order_by(Investor.id)
+        )
+        ids = {}
+        for name, investor_id in result:
+            ids.setdefault(name, investor_id)
+        return ids
+
+
+class StartupRepository(Repository):
+    model = Startup
+    conflict_columns = ("name", "website")
+    update_columns = ("sector", "country", "founded_year", "ai_or_accelerated_computing", "nvidia_stack_alignment")
+
+
+class FundingRoundRepository(Repository):
+    model = FundingRound
+    conflict_columns = ("startup_id", "investor_id", "round_date")
+    update_columns = ("amount", "round_type")
+
+    def bulk_upsert(self, rows: list[dict]) -> dict[tuple, int]:
+        # Rodadas sem data: NULL não conflita na constraint única, então
+        # deduplica pelo par startup/investidor antes de inserir
+        undated = [row for row in rows if row.get("round_date") is None]
+        dated = [row for row in rows if row.get("round_date") is not None]
+        ids = super().bulk_upsert(dated) if dated else {}
+
+        if undated:
+            pairs = list({(row["startup_id"], row["investor_id"]): row for row in undated}.items())
+            existing = {}
+            for start in range(0, len(pairs), BATCH_SIZE):
+                keys = [pair for pair, _ in pairs[start:start + BATCH_SIZE]]
+                result = self.session.execute(
+                    select(FundingRound.id, FundingRound.startup_id, FundingRound.investor_id)
+                    .where(FundingRound.round_date.is_(None))
+                    .where(tuple_(FundingRound.startup_id, FundingRound.investor_id).in_(keys))
+                )
+                existing.update({(s_id, i_id): fr_id for fr_id, s_id, i_id in result})
+
+            new_rounds = [FundingRound(**row) for pair, row in pairs if pair not in existing]
+            self.session.add_all(new_rounds)
+            self.session.flush()
+            for pair, fr_id in existing.items():
+                ids[pair + (None,)] = fr_id
+            for fr in new_rounds:
+                ids[(fr.startup_id, fr.investor_id, None)] = fr.id
+        return ids
+
+
+class LeadershipRepository(Repository):
+    model = Leadership
+    conflict_columns = ("startup_id", "name", "role")
+    update_columns = ("linkedin",)
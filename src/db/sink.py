@@ -0,0 +1,110 @@
+import re
+
+from validation import normalize_domain
+
+from .repository import FundingRoundRepository, InvestorRepository, LeadershipRepository, StartupRepository
+from .session import get_session_factory, session_scope
+
+# Termos de setor/descrição/tecnologias que marcam IA ou computação acelerada
+AI_RE = re.compile(
+    r"\b(ai|ia|a\.i\.|artificial intelligence|intelig[eê]ncia artificial|machine learning|deep learning|"
+    r"aprendizado de m[aá]quina|aprendizaje autom[aá]tico|computer vision|vis[aã]o computacional|"
+    r"visi[oó]n por computadora|llms?|genai|generative|generativa|nlp|neural|gpus?|hpc|"
+    r"accelerated computing|computa[cç][aã]o acelerada)\b"
+)
+# Termos do stack NVIDIA (produtos e programas)
+NVIDIA_RE = re.compile(r"\b(nvidia|cuda|gpus?|tensorrt|jetson|omniverse|dgx|inception)\b")
+
+
+def _get(item, field, default=None):
+    value = item.get(field) if isinstance(item, dict) else getattr(item, field, None)
+    return default if value is None else value
+
+
+def _tech_flags(startup) -> tuple[bool | None, bool | None]:
+    """(IA/computação acelerada, alinhada ao stack NVIDIA) a partir do texto da startup
+
+    Sem nenhum texto devolve None, e o upsert mantém o que já estava gravado.
+    """
+    tech = _get(startup, "tech") or []
+    parts = [_get(startup, "sector"), _get(startup, "description"),
+             *(tech if isinstance(tech, list) else [tech])]
+    text = " ".join(str(part) for part in parts if part).lower()
+    if not text:
+        return None, None
+    nvidia = bool(NVIDIA_RE.search(text))
+    return nvidia or bool(AI_RE.search(text)), nvidia
+
+
+class DatabaseSink:
+    """Destino do pipeline que grava no banco (mesma interface do SheetsCrew)"""
+
+    def __init__(self, url: str | None = None):
+        self.session_factory = get_session_factory(url)
+
+    def save_investors(self, investors, worksheet_name: str | None = None) -> dict:
+        rows = [
+            {
+                "name": _get(inv, "name", ""),
+                "type": _get(inv, "type"),
+                "website": normalize_domain(_get(inv, "website", "")),
+                "focus": _get(inv, "focus"),
+                "portfolio_url": _get(inv, "portfolio_url"),
+            }
+            for inv in investors
+        ]
+        with session_scope(self.session_factory) as session:
+            ids = InvestorRepository(session).bulk_upsert(rows)
+        return {"upserted": len(ids)}
+
+    def save_startups(self, startups, vc_name: str, worksheet_name: str | None = None) -> dict:
+        rows = []
+        for st in startups:
+            # Consultadas por queries.ai_nvidia_startups (índice parcial)
+            ai, nvidia = _tech_flags(st)
+            rows.append({
+                "name": _get(st, "name", ""),
+                # A chave única é (nome, domínio), como no Sheets e na resolução de entidades
+                "website": normalize_domain(_get(st, "website", "")),
+                "sector": _get(st, "sector"),
+                "country": _get(st, "country"),
+                "founded_year": _get(st, "year"),
+                "ai_or_accelerated_computing": ai,
+                "nvidia_stack_alignment": nvidia,
+            })
+        with session_scope(self.session_factory) as session:
+            startup_repo = StartupRepository(session)
+            startup_ids = startup_repo.bulk_upsert(rows)
+
+            # Relação startup <-> investidor vira uma rodada de investimento
+            names = {vc_name} | {name for st in startups for name in (_get(st, "investors") or [])}
+            investor_ids = InvestorRepository(session).ids_by_name(sorted(names))
+            rounds, people = [], []
+            for st, row in zip(startups, rows):
+                startup_id = startup_ids.get(startup_repo.key(row))
+                if startup_id is None:
+                    continue
+                for name in dict.fromkeys([vc_name, *(_get(st, "investors") or [])]):
+                    if name in investor_ids:
+                        rounds.append({
+                            "startup_id": startup_id,
+                            "investor_id": investor_ids[name],
+                            "round_date": None,
+                            "round_type": _get(st, "stage") or _get(st, "funding"),
+                        })
+                for person in _get(st, "leadership") or []:
+                    people.append({
+                        "startup_id": startup_id,
+                        "name": _get(person, "name"),
+                        "role": _get(person, "role"),
+                        "linkedin": _get(person, "linkedin"),
+                    })
+
+            FundingRoundRepository(session).bulk_upsert(rounds)
+            if people:
+                LeadershipRepository(session).bulk_upsert(people)
+        return {"upserted": len(startup_ids), "funding_rounds": len(rounds)}
+
+    def flush(self):
+        # Cada chamada já grava numa transação própria
+        pass
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+# Diretório dos relatórios JSON por execução (vazio: sem relatório)
+REPORT_DIR = os.getenv("PIPELINE_REPORT_DIR", "")
+# Porta do endpoint Prometheus /metrics (requer prometheus_client; vazio: desligado)
+METRICS_PORT = os.getenv("PIPELINE_METRICS_PORT", "")
+# PIPELINE_METRICS=1 mede mesmo sem relatório nem Prometheus (resumo só no terminal)
+METRICS_ENABLED = bool(REPORT_DIR or METRICS_PORT) or os.getenv("PIPELINE_METRICS", "").lower() in ("1", "true", "yes")
+
+# Preço (USD) por 1K tokens, para estimar o custo de LLM
+LLM_PROMPT_PRICE_PER_1K = float(os.getenv("LLM_PROMPT_PRICE_PER_1K", "0.001"))
+LLM_COMPLETION_PRICE_PER_1K = float(os.getenv("LLM_COMPLETION_PRICE_PER_1K", "0.001"))
+
+# Contexto vazio reaproveitado quando a medição está desligada
+_NULL_SPAN = nullcontext()
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    errors: int = 0
+
+
+class Metrics:
+    """Tempos (spans) e contadores do pipeline, agregados por nome
+
+    Com enabled=False, span() devolve um contexto vazio compartilhado e
+    incr()/record_usage() retornam na hora, então a instrumentação espalhada
+    pelo código não custa praticamente nada.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, prometheus_port: str = METRICS_PORT):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._spans: dict[str, SpanStats] = {}
+        self._counters: dict[str, float] = {}
+        self._prometheus = None
+        if enabled and prometheus_port:
+            self._start_prometheus(int(prometheus_port))
+
+    def _start_prometheus(self, port: int):
+        try:
+            from prometheus_client import Counter, Histogram, start_http_server
+        except ImportError:
+            print("⚠️ prometheus_client não instalado; métricas Prometheus desligadas")
+            return
+        self._prometheus = {
+            "seconds": Histogram("pipeline_span_seconds", "Duração das etapas do pipeline", ["span"]),
+            "errors": Counter("pipeline_span_errors", "Etapas que terminaram com erro", ["span"]),
+            "counters": Counter("pipeline_events", "Contadores do pipeline (tokens, custo, cache)", ["name"]),
+        }
+        start_http_server(port)
+        print(f"📈 Métricas Prometheus em http://localhost:{port}/metrics")
+
+    def span(self, name: str):
+        """Context manager que mede o bloco e conta erros"""
+        return self._span(name) if self.enabled else _NULL_SPAN
+
+    @contextmanager
+    def _span(self, name: str):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, error)
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._spans.setdefault(name, SpanStats())
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.errors += int(error)
+        if self._prometheus:
+            self._prometheus["seconds"].labels(name).observe(seconds)
+            if error:
+                self._prometheus["errors"].labels(name).inc()
+
+    def incr(self, name: str, value: float = 1):
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        if self._prometheus:
+            self._prometheus["counters"].labels(name).inc(value)
+
+    def record_usage(self, usage, prefix: str = "llm"):
+        """Soma tokens e custo estimado de um UsageMetrics do crewai (ou dict equivalente)"""
+        if not self.enabled or usage is None:
+            return
+        if not isinstance(usage, dict):
+            usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+        prompt = usage.get("prompt_tokens") or 0
+        completion = usage.get("completion_tokens") or 0
+        self.incr(f"{prefix}.prompt_tokens", prompt)
+        self.incr(f"{prefix}.completion_tokens", completion)
+        self.incr(f"{prefix}.requests", usage.get("successful_requests") or 0)
+        self.incr(f"{prefix}.cost_usd", prompt / 1000 * LLM_PROMPT_PRICE_PER_1K
+                  + completion / 1000 * LLM_COMPLETION_PRICE_PER_1K)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "spans": {name: asdict(stats) for name, stats in self._spans.items()},
+                "counters": dict(self._counters),
+            }
+
+    def since(self, mark: dict) -> dict:
+        """Diferença desde um snapshot (o max é o do processo inteiro)"""
+        current = self.snapshot()
+        spans = {}
+        for name, stats in current["spans"].items():
+            before = mark["spans"].get(name, {})
+            count = stats["count"] - before.get("count", 0)
+            if count:
+                total = stats["total"] - before.get("total", 0.0)
+                spans[name] = {
+                    "count": count,
+                    "total_s": round(total, 4),
+                    "mean_ms": round(total / count * 1000, 2),
+                    "max_ms": round(stats["max"] * 1000, 2),
+                    "errors": stats["errors"] - before.get("errors", 0),
+                }
+        counters = {
+            name: round(value - mark["counters"].get(name, 0), 6)
+            for name, value in current["counters"].items()
+            if value != mark["counters"].get(name, 0)
+        }
+        return {"spans": spans, "counters": counters}
+
+
+def format_spans(spans: dict, limit: int = 10) -> str:
+    """Etapas que mais tomaram tempo, uma por linha"""
+    top = sorted(spans.items(), key=lambda item: -item[1]["total_s"])[:limit]
+    return "\n".join(
+        f"  ⏱️ {name}: {stats['total_s']:.2f}s em {stats['count']}x (média {stats['mean_ms']:.0f}ms"
+        + (f", {stats['errors']} erros" if stats["errors"] else "") + ")"
+        for name, stats in top
+    )
+
+
+def write_report(report: dict, directory: str = REPORT_DIR) -> str | None:
+    """Grava o relatório JSON da execução; devolve o caminho"""
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"run-{report.get('run_id', 'x')}-{int(time.time())}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    return path
+
+
+def timed(name: str):
+    """Decorator que mede cada chamada da função como um span"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            with metrics.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Retorna o Metrics do processo, criado na primeira chamada"""
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
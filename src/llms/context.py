@@ -0,0 +1,86 @@
+import os
+
+# PROMPT_COMPACT=0 volta às saídas detalhadas das ferramentas (útil para depurar os agentes)
+COMPACT_PROMPTS = os.getenv("PROMPT_COMPACT", "1").lower() not in ("0", "false", "no")
+# Tokens máximos do prompt de uma chamada; acima disso as mensagens maiores são cortadas (0 desliga)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "24000"))
+# Tokens mantidos, no mínimo, de cada mensagem cortada (começo e fim)
+MIN_KEPT_TOKENS = 200
+TRIM_MARKER = "\n[... {} tokens omitidos para caber no orçamento do prompt ...]\n"
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Sem tiktoken (ou sem o arquivo do encoding offline): estimativa por caracteres
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens do texto (tiktoken cl100k quando disponível; senão ~4 caracteres por token)"""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+
+def _cut_middle(text: str, keep: int) -> str:
+    """Reduz o texto a ~keep tokens (começo e fim, aviso incluso) com um aviso no meio"""
+    encoding = _get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= keep:
+            return text
+        kept = max(0, keep - count_tokens(TRIM_MARKER.format(len(tokens))))
+        head, tail = kept // 2, kept - kept // 2
+        return (encoding.decode(tokens[:head]) + TRIM_MARKER.format(len(tokens) - kept)
+                + encoding.decode(tokens[len(tokens) - tail:]))
+    if len(text) // 4 <= keep:
+        return text
+    chars = max(0, keep - count_tokens(TRIM_MARKER.format(len(text) // 4))) * 4
+    head, tail = chars // 2, chars - chars // 2
+    return text[:head] + TRIM_MARKER.format((len(text) - chars) // 4) + text[len(text) - tail:]
+
+
+def fit_prompt(messages, budget: int = PROMPT_TOKEN_BUDGET):
+    """Ajusta o prompt de uma chamada ao orçamento: (mensagens, tokens antes, tokens depois)
+
+    Cabendo no orçamento, as mensagens voltam como vieram. Senão, as maiores
+    (normalmente saídas de ferramentas) perdem o meio até o total caber; as
+    mensagens de sistema não são cortadas. As originais não são alteradas.
+    """
+    if isinstance(messages, str):
+        before = count_tokens(messages)
+        if budget <= 0 or before <= budget:
+            return messages, before, before
+        fitted = _cut_middle(messages, max(MIN_KEPT_TOKENS, budget))
+        return fitted, before, count_tokens(fitted)
+
+    sizes = [count_tokens(str(message.get("content") or "")) for message in messages]
+    before = sum(sizes)
+    if budget <= 0 or before <= budget:
+        return messages, before, before
+
+    fitted = list(messages)
+    excess = before - budget
+    trimmable = [i for i, message in enumerate(messages)
+                 if message.get("role") != "system" and isinstance(message.get("content"), str)]
+    for i in sorted(trimmable, key=lambda i: -sizes[i]):
+        if excess <= 0:
+            break
+        keep = max(MIN_KEPT_TOKENS, sizes[i] - excess)
+        if keep >= sizes[i]:
+            continue
+        content = _cut_middle(messages[i]["content"], keep)
+        size = count_tokens(content)
+        fitted[i] = {**messages[i], "content": content}
+        excess -= sizes[i] - size
+        sizes[i] = size
+    return fitted, before, sum(sizes)
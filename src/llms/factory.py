@@ -0,0 +1,190 @@
+import os
+import threading
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+
+from instrumentation import get_metrics
+
+from .cache import LLMResponseCache, cache_key
+from .context import PROMPT_TOKEN_BUDGET, fit_prompt
+from .router import RoutedLLM, call_with_usage, route
+
+DEFAULT_MODEL = "perplexity/sonar"
+DEFAULT_BASE_URL = "https://api.perplexity.ai/"
+
+# LLM_CACHE_DISABLED=1 desliga o cache (útil para depurar prompts)
+CACHE_ENABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+# LLM_ROUTER_DISABLED=1 volta a usar só o perplexity/sonar em todos os agentes
+ROUTER_ENABLED = os.getenv("LLM_ROUTER_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+class CachedLLM(BaseLLM):
+    """Envolve um LLM do crewai e reaproveita respostas de chamadas idênticas"""
+
+    def __init__(self, llm: BaseLLM, cache: LLMResponseCache):
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None))
+        self.llm = llm
+        self.cache = cache
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        # O agente define as stop words no LLM que ele enxerga; repassa para o real
+        self.llm.stop = self.stop
+        key = cache_key(self.model, messages, tools=tools, stop=self.stop, temperature=self.temperature)
+
+        metrics = get_metrics()
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.incr("llm.cache_hit")
+            return cached
+
+        with metrics.span("llm.call"):
+            response = self.llm.call(messages, tools=tools, callbacks=callbacks,
+                                     available_functions=available_functions, **kwargs)
+        # Só texto é cacheado; resultados de function calling seguem direto
+        if isinstance(response, str) and response:
+            self.cache.set(key, response, model=self.model)
+        return response
+
+    def get_token_usage_summary(self):
+        # Acertos do cache não gastam tokens; o resto foi contado pelo LLM real
+        return self.llm.get_token_usage_summary()
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def __getattr__(self, name):
+        # Atributos específicos do LLM real (base_url, api_key, ...)
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+
+class MeteredLLM(BaseLLM):
+    """Um LLM do crewai por thread, com os tokens de cada chamada registrados nas métricas
+
+    O total acumulado da instância é compartilhado por todos os crews e runs
+    que usam o mesmo LLM; medir a diferença em cada chamada evita contar de novo.
+    """
+
+    def __init__(self, model: str, **kwargs):
+        super().__init__(model=model, temperature=kwargs.get("temperature"))
+        self.llm_kwargs = kwargs
+        self.thread_llms: dict[int, BaseLLM] = {}
+        self.llms_lock = threading.Lock()
+
+    def thread_llm(self) -> BaseLLM:
+        key = threading.get_ident()
+        with self.llms_lock:
+            if key not in self.thread_llms:
+                self.thread_llms[key] = LLM(model=self.model, **self.llm_kwargs)
+            return self.thread_llms[key]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        llm = self.thread_llm()
+        llm.stop = self.stop
+        response, _ = call_with_usage(llm, messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions, **kwargs)
+        return response
+
+    def get_token_usage_summary(self):
+        with self.llms_lock:
+            llms = list(self.thread_llms.values())
+        usage = UsageMetrics()
+        for llm in llms:
+            usage.add_usage_metrics(llm.get_token_usage_summary())
+        return usage
+
+    def supports_function_calling(self) -> bool:
+        return self.thread_llm().supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.thread_llm().supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.thread_llm().get_context_window_size()
+
+
+class BudgetedLLM(BaseLLM):
+    """Mede o prompt de cada chamada por task e corta o que passar de PROMPT_TOKEN_BUDGET
+
+    A compactação dos YAML e das ferramentas reduz o prompt de antemão; aqui
+    o tamanho real é conferido em toda chamada, já com o histórico do agente.
+    """
+
+    def __init__(self, llm: BaseLLM, budget: int = PROMPT_TOKEN_BUDGET):
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None))
+        self.llm = llm
+        self.budget = budget
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        self.llm.stop = self.stop
+        task = getattr(kwargs.get("from_task"), "name", None) or "sem_task"
+        messages, before, after = fit_prompt(messages, self.budget)
+
+        metrics = get_metrics()
+        metrics.incr(f"llm.prompt.{task}.calls")
+        metrics.incr(f"llm.prompt.{task}.tokens", after)
+        if after < before:
+            metrics.incr(f"llm.prompt.{task}.trimmed_tokens", before - after)
+            print(f"✂️ Prompt de '{task}' com {before} tokens cortado para {after} (orçamento {self.budget})")
+        return self.llm.call(messages, tools=tools, callbacks=callbacks,
+                             available_functions=available_functions, **kwargs)
+
+    def get_token_usage_summary(self):
+        return self.llm.get_token_usage_summary()
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def __getattr__(self, name):
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMResponseCache:
+    """Cache compartilhado por todos os crews do processo"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def build_llm(model: str = DEFAULT_MODEL, base_url: str | None = DEFAULT_BASE_URL,
+              api_key: str | None = None, cached: bool = CACHE_ENABLED, role: str | None = None, **kwargs):
+    """Cria o LLM usado pelos agentes, com cache de respostas e orçamento de prompt por padrão
+
+    Com role (ex.: "research", "json"), as chamadas passam pelo roteador de
+    provedores (ver llms/router.py) em vez de irem sempre para `model`.
+    """
+    if role is not None and ROUTER_ENABLED:
+        llm = RoutedLLM(role, route(role))
+    else:
+        llm = MeteredLLM(
+            model=model,
+            base_url=base_url,
+            api_key=api_key or os.getenv("PERPLEXITY_API_KEY"),
+            **kwargs
+        )
+    if cached:
+        llm = CachedLLM(llm, get_cache())
+    return BudgetedLLM(llm) if PROMPT_TOKEN_BUDGET > 0 else llm
@@ -0,0 +1,347 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+
+from instrumentation import get_metrics
+
+# Papéis dos agentes: pesquisa (raciocínio, busca na web) e conversão barata de texto em JSON
+ROLE_RESEARCH = "research"
+ROLE_JSON = "json"
+
+# Suavização da média móvel exponencial da latência
+LATENCY_ALPHA = 0.3
+# Tokens de resposta assumidos ao reservar o orçamento de uma chamada
+COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1000"))
+# Espera máxima (s) por orçamento livre antes de desistir
+MAX_BUDGET_WAIT = float(os.getenv("LLM_MAX_BUDGET_WAIT", "120"))
+# Pausa do provedor após 429 (sem Retry-After) e após 5xx/timeouts
+RATE_LIMIT_COOLDOWN = float(os.getenv("LLM_RATE_LIMIT_COOLDOWN", "30"))
+ERROR_COOLDOWN = float(os.getenv("LLM_ERROR_COOLDOWN", "10"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Exceções do litellm que valem failover mesmo sem status_code
+RETRYABLE_ERRORS = {"RateLimitError", "Timeout", "APIConnectionError", "ServiceUnavailableError",
+                    "InternalServerError", "BadGatewayError"}
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    name: str
+    model: str
+    base_url: str | None
+    api_key_env: str
+    # Limites por minuto (requisições e tokens)
+    rpm: int
+    tpm: int
+
+
+DEFAULT_PROVIDERS = {
+    "perplexity": ProviderConfig("perplexity", "perplexity/sonar", "https://api.perplexity.ai/",
+                                 "PERPLEXITY_API_KEY", rpm=50, tpm=100_000),
+    "openai": ProviderConfig("openai", "openai/gpt-4o-mini", None, "OPENAI_API_KEY", rpm=500, tpm=200_000),
+    "groq": ProviderConfig("groq", "groq/llama-3.3-70b-versatile", None, "GROQ_API_KEY", rpm=30, tpm=12_000),
+}
+
+# Provedores aceitos por papel, em ordem de preferência (desempate quando a latência é igual)
+DEFAULT_ROUTES = {
+    ROLE_RESEARCH: ["perplexity", "openai", "groq"],
+    ROLE_JSON: ["groq", "openai", "perplexity"],
+}
+
+
+def provider_config(name: str) -> ProviderConfig:
+    """Config do provedor com sobrescritas do ambiente (LLM_<NOME>_MODEL, _BASE_URL, _RPM, _TPM)"""
+    default = DEFAULT_PROVIDERS.get(name) or ProviderConfig(name, name, None, f"{name.upper()}_API_KEY", 60, 100_000)
+    prefix = f"LLM_{name.upper()}_"
+    return ProviderConfig(
+        name=name,
+        model=os.getenv(prefix + "MODEL", default.model),
+        base_url=os.getenv(prefix + "BASE_URL", default.base_url),
+        api_key_env=default.api_key_env,
+        rpm=int(os.getenv(prefix + "RPM", str(default.rpm))),
+        tpm=int(os.getenv(prefix + "TPM", str(default.tpm))),
+    )
+
+
+def route(role: str) -> list[str]:
+    """Provedores do papel (LLM_ROUTE_RESEARCH=perplexity,openai sobrescreve o padrão)"""
+    configured = os.getenv(f"LLM_ROUTE_{role.upper()}")
+    if configured:
+        return [name.strip() for name in configured.split(",") if name.strip()]
+    return DEFAULT_ROUTES.get(role, DEFAULT_ROUTES[ROLE_RESEARCH])
+
+
+def estimate_tokens(messages) -> int:
+    """Estimativa grosseira (~4 caracteres por token)"""
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(message.get("content", ""))) for message in messages) // 4
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return status in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERRORS
+
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")
+
+
+def call_with_usage(llm: BaseLLM, *args, **kwargs):
+    """Chama o llm e registra nas métricas os tokens que ele contou nesta chamada
+
+    O total do crewai é acumulado na instância, então a diferença só é a da
+    chamada se a instância não atende outra ao mesmo tempo (uma por thread).
+    Devolve (resposta, tokens da chamada ou None se o LLM não informou).
+    """
+    before = llm.get_token_usage_summary()
+    response = llm.call(*args, **kwargs)
+    after = llm.get_token_usage_summary()
+    usage = {field: (getattr(after, field, 0) or 0) - (getattr(before, field, 0) or 0) for field in USAGE_FIELDS}
+    get_metrics().record_usage(usage)
+    return response, usage["total_tokens"] or None
+
+
+def retry_after(error: Exception) -> float | None:
+    """Retry-After (s) da resposta HTTP por trás do erro, se houver"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBudget:
+    """Janela deslizante de 60 s com limites de requisições e de tokens"""
+
+    def __init__(self, rpm: int, tpm: int, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        # [instante, tokens] por chamada (mutável para trocar a estimativa pelo uso real)
+        self._events: deque[list] = deque()
+        self._tokens = 0
+
+    def _trim(self, now: float):
+        while self._events and self._events[0][0] <= now - self.window:
+            self._tokens -= self._events.popleft()[1]
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """0 se a chamada cabe agora; senão, quanto falta para caber"""
+        self._trim(now)
+        tokens = min(tokens, self.tpm)
+        if len(self._events) < self.rpm and self._tokens + tokens <= self.tpm:
+            return 0.0
+        freed = 0
+        for i, (timestamp, used) in enumerate(self._events):
+            freed += used
+            if len(self._events) - (i + 1) < self.rpm and self._tokens - freed + tokens <= self.tpm:
+                return timestamp + self.window - now
+        return self.window
+
+    def consume(self, tokens: int, now: float) -> list:
+        event = [now, tokens]
+        self._events.append(event)
+        self._tokens += tokens
+        return event
+
+    def adjust(self, event: list, actual: int):
+        """Troca a reserva estimada de uma chamada pelo uso real"""
+        if any(item is event for item in self._events):
+            self._tokens += actual - event[1]
+            event[1] = actual
+
+
+class Provider:
+    """Um provedor com seu orçamento, latência média e pausa após erros
+
+    O estado é do processo inteiro; os LLMs do crewai que falam com o
+    provedor são criados por cada RoutedLLM (build_llm), já que o agente
+    ajusta as stop words no LLM que usa.
+    """
+
+    def __init__(self, config: ProviderConfig):
+        self.config = config
+        self.budget = TokenBudget(config.rpm, config.tpm)
+        self.latency: float | None = None
+        self.cooldown_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def available(self) -> bool:
+        return bool(os.getenv(self.config.api_key_env))
+
+    def build_llm(self) -> BaseLLM:
+        return LLM(model=self.config.model, base_url=self.config.base_url,
+                   api_key=os.getenv(self.config.api_key_env))
+
+
+class LLMRouter:
+    """Escolhe o provedor de cada chamada: o mais rápido com orçamento, com failover em 429/5xx
+
+    Os orçamentos e as latências são compartilhados por todos os agentes do
+    processo, já que os limites de taxa são por chave de API.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: dict[str, Provider] = {}
+
+    def provider(self, name: str) -> Provider:
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = Provider(provider_config(name))
+            return self._providers[name]
+
+    def acquire(self, names: list[str], tokens: int, exclude: set[str]) -> tuple[Provider | None, list | None, float | None]:
+        """Reserva orçamento no melhor provedor livre: (provedor, reserva, 0)
+
+        Sem provedor livre devolve (None, None, espera até algum liberar); a
+        espera é None quando nenhum provedor restante pode atender (todos
+        falharam nesta chamada ou estão sem chave).
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [self._providers[name] for name in names if name not in exclude]
+        candidates = [provider for provider in candidates if provider.available]
+        if not candidates:
+            return None, None, None
+
+        # Medidos primeiro, do mais rápido ao mais lento; os ainda sem medição ficam na ordem
+        # de preferência do papel (o preferido é o primeiro a ser medido e não perde a vez
+        # para um provedor que nunca foi chamado)
+        ranked = sorted(enumerate(candidates),
+                        key=lambda item: (item[1].latency is None, item[1].latency or 0.0, item[0]))
+        wait = None
+        with self._lock:
+            for _, provider in ranked:
+                pending = max(provider.cooldown_until - now, provider.budget.wait_time(tokens, now))
+                if pending <= 0:
+                    return provider, provider.budget.consume(tokens, now), 0.0
+                wait = pending if wait is None else min(wait, pending)
+        return None, None, wait
+
+    def record_success(self, provider: Provider, seconds: float, reservation: list, actual: int):
+        with self._lock:
+            provider.latency = seconds if provider.latency is None else (
+                LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * provider.latency)
+            provider.budget.adjust(reservation, actual)
+
+    def record_failure(self, provider: Provider, error: Exception):
+        status = getattr(error, "status_code", None)
+        if status == 429 or type(error).__name__ == "RateLimitError":
+            cooldown = retry_after(error) or RATE_LIMIT_COOLDOWN
+        else:
+            cooldown = ERROR_COOLDOWN
+        with self._lock:
+            provider.cooldown_until = max(provider.cooldown_until, time.monotonic() + cooldown)
+        print(f"⚠️ {provider.name} falhou ({type(error).__name__}); pausado por {cooldown:.0f}s")
+
+
+_router: LLMRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> LLMRouter:
+    """Roteador compartilhado por todos os crews do processo"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter()
+        return _router
+
+
+class RoutedLLM(BaseLLM):
+    """LLM do crewai que distribui as chamadas de um papel entre vários provedores
+
+    Cada instância tem seus próprios LLMs por provedor e por thread: as stop
+    words do agente não vazam para outros papéis, e o uso de tokens de cada
+    chamada é medido no LLM que a atendeu e registrado nas métricas na hora.
+    """
+
+    def __init__(self, role: str, providers: list[str], router: LLMRouter | None = None):
+        super().__init__(model=f"router/{role}")
+        self.role = role
+        self.router = router or get_router()
+        self.providers = providers
+        # (thread, provedor) -> LLM: cada instância atende uma chamada por vez
+        self.provider_llms: dict[tuple[int, str], BaseLLM] = {}
+        self.llms_lock = threading.Lock()
+        for name in providers:
+            self.router.provider(name)
+
+    def provider_llm(self, provider: Provider) -> BaseLLM:
+        key = (threading.get_ident(), provider.name)
+        with self.llms_lock:
+            if key not in self.provider_llms:
+                self.provider_llms[key] = provider.build_llm()
+            return self.provider_llms[key]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        reserved = estimate_tokens(messages) + COMPLETION_TOKENS_ESTIMATE
+        tried: set[str] = set()
+        last_error: Exception | None = None
+        waited = 0.0
+
+        while True:
+            provider, reservation, wait = self.router.acquire(self.providers, reserved, tried)
+            if provider is None:
+                if wait is None or waited >= MAX_BUDGET_WAIT:
+                    if last_error is not None:
+                        raise last_error
+                    raise RuntimeError(f"Nenhum provedor de LLM disponível para '{self.role}' "
+                                       f"(configurados: {', '.join(self.providers)})")
+                wait = min(wait, MAX_BUDGET_WAIT - waited)
+                get_metrics().incr("llm.router.budget_wait_s", wait)
+                time.sleep(wait)
+                waited += wait
+                continue
+
+            llm = self.provider_llm(provider)
+            llm.stop = self.stop
+            start = time.perf_counter()
+            try:
+                response, used = call_with_usage(llm, messages, tools=tools, callbacks=callbacks,
+                                                 available_functions=available_functions, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self.router.record_failure(provider, e)
+                get_metrics().incr(f"llm.router.{provider.name}.failover")
+                tried.add(provider.name)
+                last_error = e
+                continue
+
+            actual = used or estimate_tokens(messages) + (len(response) // 4 if isinstance(response, str) else 0)
+            self.router.record_success(provider, time.perf_counter() - start, reservation, actual)
+            get_metrics().incr(f"llm.router.{provider.name}.calls")
+            return response
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        """Uso acumulado dos LLMs de provedor que atenderam as chamadas deste papel"""
+        usage = UsageMetrics()
+        with self.llms_lock:
+            llms = list(self.provider_llms.values())
+        for llm in llms:
+            usage.add_usage_metrics(llm.get_token_usage_summary())
+        return usage
+
+    def supports_function_calling(self) -> bool:
+        return self.provider_llm(self.router.provider(self.providers[0])).supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return all(self.provider_llm(self.router.provider(name)).supports_stop_words() for name in self.providers)
+
+    def get_context_window_size(self) -> int:
+        # A menor janela entre os provedores, para o mesmo prompt caber em qualquer um
+        return min(self.provider_llm(self.router.provider(name)).get_context_window_size()
+                   for name in self.providers)
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+JOURNAL_PATH = os.getenv(
+    "PIPELINE_JOURNAL_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "nvidia-inception", "journal.sqlite3"),
+)
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class RunJournal:
+    """Diário durável das execuções do pipeline (SQLite)
+
+    Guarda a lista de investidores de cada execução, o estado/saída de cada
+    portfolio e a última extração bem-sucedida por URL com o hash da página.
+    Uma extração sem startups nunca é reaproveitada: pode ter sido uma falha
+    do scraping ou do LLM, então o portfolio volta a ser processado.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                thesis TEXT NOT NULL,
+                status TEXT NOT NULL,
+                investors TEXT,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS runs_thesis_status ON runs (thesis, status);
+
+            CREATE TABLE IF NOT EXISTS portfolios (
+                run_id INTEGER NOT NULL REFERENCES runs (id),
+                portfolio_url TEXT NOT NULL,
+                investor_name TEXT,
+                status TEXT NOT NULL,
+                startups TEXT,
+                content_hash TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, portfolio_url)
+            );
+
+            CREATE TABLE IF NOT EXISTS extractions (
+                portfolio_url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                startups TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self, thesis: str, resume: bool = False) -> tuple[int, list | None]:
+        """Abre uma execução; com resume, reaproveita a última inacabada da mesma tese
+
+        Devolve (run_id, investidores já registrados ou None).
+        """
+        with self._lock:
+            if resume:
+                row = self._conn.execute(
+                    "SELECT id, investors FROM runs WHERE thesis = ? AND status = ? ORDER BY id DESC LIMIT 1",
+                    (thesis, STATUS_RUNNING),
+                ).fetchone()
+                if row is not None:
+                    return row[0], json.loads(row[1]) if row[1] else None
+
+            cursor = self._conn.execute(
+                "INSERT INTO runs (thesis, status, started_at) VALUES (?, ?, ?)",
+                (thesis, STATUS_RUNNING, time.time()),
+            )
+            self._conn.commit()
+            return cursor.lastrowid, None
+
+    def record_investors(self, run_id: int, investors: list):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET investors = ? WHERE id = ?",
+                (json.dumps(investors, default=str), run_id),
+            )
+            self._conn.commit()
+
+    def last_investors(self, thesis: str) -> list | None:
+        """Investidores da última execução concluída da tese"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT investors FROM runs WHERE thesis = ? AND status = ? AND investors IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1",
+                (thesis, STATUS_DONE),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed_portfolios(self, run_id: int) -> dict[str, list]:
+        """Portfolios já concluídos nesta execução: URL -> startups"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT portfolio_url, startups FROM portfolios WHERE run_id = ? AND status = ?",
+                (run_id, STATUS_DONE),
+            ).fetchall()
+        completed = {url: json.loads(startups) for url, startups in rows}
+        # Diários antigos podiam marcar como concluídos portfolios sem nenhuma startup
+        return {url: startups for url, startups in completed.items() if startups}
+
+    def record_portfolio(self, run_id: int, portfolio_url: str, investor_name: str, status: str,
+                         startups: list | None = None, content_hash: str | None = None):
+        now = time.time()
+        payload = json.dumps(startups or [], default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO portfolios "
+                "(run_id, portfolio_url, investor_name, status, startups, content_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, portfolio_url, investor_name, status, payload, content_hash, now),
+            )
+            if status == STATUS_DONE and content_hash and startups:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extractions (portfolio_url, content_hash, startups, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (portfolio_url, content_hash, payload, now),
+                )
+            self._conn.commit()
+
+    def last_extraction(self, portfolio_url: str) -> tuple[str, list] | None:
+        """(hash da página, startups) da última extração bem-sucedida da URL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, startups FROM extractions WHERE portfolio_url = ?",
+                (portfolio_url,),
+            ).fetchone()
+        if row is None:
+            return None
+        startups = json.loads(row[1])
+        return (row[0], startups) if startups else None
+
+    def finish_run(self, run_id: int, status: str = STATUS_DONE):
+        """Encerra a execução; só as que ficam em STATUS_RUNNING são retomadas"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE id = ?",
+                (status, time.time(), run_id),
+            )
+            self._conn.commit()
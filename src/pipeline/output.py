@@ -0,0 +1,32 @@
+import json
+
+def safe_parse_output(output):
+    """Converte a saída do CrewOutput/TaskOutput em dict Python válido"""
+    print(f"🔍 Debug - Tipo do output: {type(output)}")
+    
+    if hasattr(output, "pydantic") and output.pydantic:
+        print(f"🔍 Debug - Usando pydantic")
+        return output.pydantic.dict() if hasattr(output.pydantic, "dict") else output.pydantic
+
+    if hasattr(output, "json_dict"):
+        print(f"🔍 Debug - Usando json_dict")
+        if isinstance(output.json_dict, str):
+            try:
+                return json.loads(output.json_dict)
+            except json.JSONDecodeError:
+                return {}
+        if isinstance(output.json_dict, dict):
+            return output.json_dict
+
+    if isinstance(output, str):
+        print(f"🔍 Debug - Parsing string")
+        try:
+            return json.loads(output)
+        except:
+            return {}
+    if isinstance(output, dict):
+        print(f"🔍 Debug - Usando dict direto")
+        return output
+
+    print(f"🔍 Debug - Retornando dict vazio")
+    return {}
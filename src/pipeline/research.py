@@ -0,0 +1,497 @@
+import os
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from InvestorCrew.crew import InvestorCrew
+from SheetsCrew.crew import SheetsCrew
+from instrumentation import format_spans, get_metrics, write_report
+from StartupCrew.crew import StartupCrew
+from StartupCrew.fastpath import fast_path_startups
+from pipeline.journal import STATUS_DONE, STATUS_FAILED, RunJournal
+from pipeline.output import safe_parse_output
+from pipeline.resolution import EntityResolver
+from pipeline.stream import Stage, StreamPipeline
+from scraping.crawler import PortfolioCrawler
+from sinks import MultiSink, format_summary
+from validation import normalize_domain, validate_startup_data
+
+DEFAULT_THESIS = "LATAM AI / accelerated-compute VCs, CVCs, Angels and their startup portfolios"
+
+# ID e aba da planilha
+SHEET_ID = "1auRAUym5fJDgM16p2T5eCby4wflZatwLMK3NXAOGdCo"
+SHEET_TAB = "Funding Round"
+
+# Destinos dos dados: "sheets", "db" ou ambos (ex.: PIPELINE_SINKS=sheets,db)
+PIPELINE_SINKS = {name.strip() for name in os.getenv("PIPELINE_SINKS", "sheets").split(",") if name.strip()}
+
+# Número máximo de StartupCrews rodando em paralelo (um por investidor)
+STARTUP_CREW_MAX_WORKERS = int(os.getenv("STARTUP_CREW_MAX_WORKERS", "4"))
+# Concorrência dos outros estágios do fluxo de portfolios e tamanho das filas entre eles
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "8"))
+PIPELINE_VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "2"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+# Lotes validados que podem esperar por um portfolio anterior antes de ele ser pulado
+PIPELINE_REORDER_WINDOW = int(os.getenv("PIPELINE_REORDER_WINDOW", "8"))
+
+class ResearchPipeline:
+    def __init__(self, max_workers: int = STARTUP_CREW_MAX_WORKERS, sink: MultiSink | None = None):
+        print("🔧 Inicializando crews...")
+        self.max_workers = max(1, max_workers)
+        # Cada thread do pool usa sua própria instância de StartupCrew
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup-crew")
+        # O InvestorCrew é um só; execuções concorrentes se revezam nele
+        self._investor_lock = threading.Lock()
+
+        try:
+            self.investor_crew = InvestorCrew().crew()
+            print("✅ InvestorCrew inicializado")
+        except Exception as e:
+            print(f"❌ Erro ao inicializar InvestorCrew: {e}")
+            raise
+
+        try:
+            self.startup_crew = StartupCrew().crew()
+            self._local.startup_crew = self.startup_crew
+            print("✅ StartupCrew inicializado")
+        except Exception as e:
+            print(f"❌ Erro ao inicializar StartupCrew: {e}")
+            raise
+
+        # Um destino pronto (ex.: o falso dos benchmarks) substitui os de PIPELINE_SINKS
+        if sink is not None:
+            self.sink = sink
+        else:
+            sinks = {}
+            if "sheets" in PIPELINE_SINKS:
+                try:
+                    self.sheets = SheetsCrew(spreadsheet_id=SHEET_ID, worksheet_name=SHEET_TAB)
+                    sinks["sheets"] = self.sheets
+                    print("✅ SheetsCrew inicializado")
+                except Exception as e:
+                    print(f"❌ Erro ao inicializar SheetsCrew: {e}")
+                    raise
+
+            if "db" in PIPELINE_SINKS:
+                try:
+                    from db.sink import DatabaseSink
+                    sinks["db"] = DatabaseSink()
+                    print("✅ Banco de dados inicializado")
+                except Exception as e:
+                    print(f"❌ Erro ao inicializar banco de dados: {e}")
+                    raise
+
+            self.sink = MultiSink(sinks)
+
+        # Checkpoint das execuções para retomar e pular portfolios sem mudança
+        self.journal = RunJournal()
+            
+        print("✅ Todos os crews inicializados!")
+
+    def _get_startup_crew(self):
+        """Retorna o StartupCrew da thread atual, criando um se necessário"""
+        crew = getattr(self._local, "startup_crew", None)
+        if crew is None:
+            crew = StartupCrew().crew()
+            self._local.startup_crew = crew
+        return crew
+
+    def _page_hash(self, url):
+        """Hash do portfolio inteiro: todas as páginas que o crawler percorre a partir da URL
+
+        Cada página passa por um GET condicional (304 reaproveita o cache), e
+        a extração logo em seguida encontra as mesmas páginas no cache.
+        """
+        try:
+            with get_metrics().span("pipeline.page_hash"):
+                crawl = PortfolioCrawler(revalidate=True).crawl(url)
+            return crawl.content_hash
+        except Exception as e:
+            print(f"⚠️ Não foi possível verificar mudanças em {url}: {e}")
+        return None
+
+    def _check_unchanged(self, inv_name, inv_portfolio, skip_unchanged=True):
+        """Hash atual da página e, se ela não mudou, a última extração (senão None)"""
+        content_hash = self._page_hash(inv_portfolio)
+        if skip_unchanged and content_hash:
+            last = self.journal.last_extraction(inv_portfolio)
+            if last and last[0] == content_hash:
+                print(f"♻️ Portfolio de {inv_name} sem mudanças, reaproveitando a última extração")
+                return content_hash, last[1]
+        return content_hash, None
+
+    def _extract_startups(self, inv_name, inv_portfolio):
+        """Extrai as startups brutas de um portfolio"""
+        # Portfolio bem estruturado: monta as startups direto da extração, sem LLM
+        with get_metrics().span("pipeline.fast_path"):
+            startups = fast_path_startups(inv_portfolio)
+        if startups is not None:
+            print(f"⚡ {len(startups)} startups de {inv_name} extraídas sem LLM")
+            return startups
+
+        print(f"⏳ Executando StartupCrew para {inv_name}...")
+        # Os tokens de cada chamada já são registrados pelo LLM (ver llms/factory.py)
+        with get_metrics().span("crew.startup.kickoff"):
+            startups_output = self._get_startup_crew().kickoff(inputs={"portfolio_url": inv_portfolio})
+        startups_data = safe_parse_output(startups_output)
+        startups = startups_data.get("startups", [])
+        # O formatador não sabe de quem é o portfolio: o investidor vem daqui, como no caminho rápido
+        for startup in startups:
+            if isinstance(startup, dict):
+                startup["investors"] = [inv_name]
+        return startups
+
+    def close(self):
+        """Encerra o pool de StartupCrews e grava o que estiver pendente"""
+        self._executor.shutdown(wait=True)
+        self.sink.close()
+
+    def run(self, thesis: str, resume: bool = False, skip_unchanged: bool = True,
+            reuse_investors: bool = False):
+        """Executa o pipeline para uma tese
+
+        resume: retoma a última execução inacabada da tese
+        skip_unchanged: reaproveita extrações de portfolios cuja página não mudou
+        reuse_investors: usa os investidores da última execução concluída em vez de
+            rodar o InvestorCrew de novo (refresh incremental agendado)
+        """
+        print(f"🚀 Rodando pipeline para tese: {thesis}")
+        metrics = get_metrics()
+        mark = metrics.snapshot()
+        started_at = time.time()
+
+        run_id, investors = self.journal.start_run(thesis, resume=resume)
+        # Execução interrompida (sem investidores, erro) fica como falha e não como "running":
+        # senão a próxima chamada com resume=True a retomaria
+        status = STATUS_FAILED
+        try:
+            if self._run(run_id, thesis, investors, resume, skip_unchanged, reuse_investors, mark, started_at):
+                status = STATUS_DONE
+        finally:
+            self.journal.finish_run(run_id, status)
+
+    def _run(self, run_id: int, thesis: str, investors: list | None, resume: bool, skip_unchanged: bool,
+             reuse_investors: bool, mark: dict, started_at: float) -> bool:
+        """Corpo de run(); devolve True se a execução chegou ao fim"""
+        metrics = get_metrics()
+        if investors is None and reuse_investors:
+            investors = self.journal.last_investors(thesis)
+            if investors is not None:
+                self.journal.record_investors(run_id, investors)
+        
+        try:
+            if investors is not None:
+                print(f"♻️ Retomando execução #{run_id}: {len(investors)} investidores já encontrados")
+            else:
+                print("⏳ Executando InvestorCrew...")
+                inputs = {"thesis": thesis}
+
+                with self._investor_lock, metrics.span("crew.investor.kickoff"):
+                    investors_output = self.investor_crew.kickoff(inputs=inputs)
+                print(f"✅ InvestorCrew concluído!")
+
+                investors_data = safe_parse_output(investors_output)
+                investors = investors_data.get("investors", [])
+                self.journal.record_investors(run_id, investors)
+            print(f"📊 Encontrados {len(investors)} investidores")
+
+            # Debug - mostrar investidores encontrados
+            for inv in investors:
+                inv_name = inv.get("name") if isinstance(inv, dict) else getattr(inv, "name", None)
+                inv_portfolio = inv.get("portfolio_url") if isinstance(inv, dict) else getattr(inv, "portfolio_url", None)
+                print(f"  📋 {inv_name}: {inv_portfolio}")
+
+            # Salva investidores na aba "Investors"
+            if investors:
+                print("💾 Salvando investidores...")
+                summary = self.sink.save_investors(investors, worksheet_name="Investors")
+                self.sink.flush()
+                print(f"✅ Investidores salvos! ({format_summary(summary)})")
+            else:
+                print("⚠️ Nenhum investidor encontrado!")
+                return False
+
+        except Exception as e:
+            print(f"❌ Erro no InvestorCrew: {e}")
+            traceback.print_exc()
+            return False
+
+        # Portfolios já concluídos nesta execução (só ao retomar)
+        completed = self.journal.completed_portfolios(run_id) if resume else {}
+
+        # Fluxo por portfolio: busca -> extração -> validação -> deduplicação -> destino,
+        # com filas limitadas entre os estágios; as startups vão para o destino assim que
+        # o primeiro portfolio é validado
+        print(f"\n🔄 Iniciando busca nos portfolios ({self.max_workers} extrações em paralelo)...")
+        portfolios = PortfolioStream(self, run_id, investors, skip_unchanged, started_at)
+        StreamPipeline(portfolios.stages(), on_error=portfolios.on_error).run(
+            portfolios.jobs(investors, completed))
+
+        # Grava em lote as startups ainda pendentes no buffer
+        try:
+            self.sink.flush()
+        except Exception as e:
+            print(f"❌ Erro ao gravar startups pendentes: {e}")
+            traceback.print_exc()
+
+        stats = portfolios.stats
+        startups = portfolios.resolver.entities
+        print(f"\n🎉 Pipeline concluído!")
+        print(f"📊 Total de investidores processados: {len(investors)}")
+        print(f"📊 Extrações bem-sucedidas: {stats['successful']}")
+        print(f"📊 Extrações falharam: {stats['failed']}")
+        print(f"📊 Total de startups válidas encontradas: {len(startups)}")
+        shared = sum(1 for startup in startups if len(startup.get("investors") or []) > 1)
+        if shared:
+            print(f"📊 Startups em mais de um portfolio: {shared}")
+        if portfolios.first_result_s is not None:
+            print(f"📊 Primeiras startups gravadas em {portfolios.first_result_s:.1f}s")
+        if "sheets" in self.sink.sinks:
+            print(f"💾 Dados salvos no Google Sheets: {SHEET_ID}")
+        if "db" in self.sink.sinks:
+            print(f"💾 Dados salvos no banco de dados")
+        
+        # Resumo das startups encontradas por VC
+        if startups:
+            print(f"\n📋 Resumo por VC:")
+            vc_summary = {}
+            for startup in startups:
+                for vc_name in startup.get("investors") or [startup.get("vc_name", "Desconhecido")]:
+                    if vc_name not in vc_summary:
+                        vc_summary[vc_name] = 0
+                    vc_summary[vc_name] += 1
+            
+            for vc, count in vc_summary.items():
+                print(f"  📌 {vc}: {count} startups")
+
+        if metrics.enabled:
+            usage = metrics.since(mark)
+            print(f"\n⏱️ Onde o tempo foi gasto:")
+            print(format_spans(usage["spans"]))
+            counters = usage["counters"]
+            if counters.get("llm.prompt_tokens") or counters.get("llm.completion_tokens"):
+                print(f"  🪙 Tokens: {counters.get('llm.prompt_tokens', 0):.0f} prompt + "
+                      f"{counters.get('llm.completion_tokens', 0):.0f} completion "
+                      f"(~US$ {counters.get('llm.cost_usd', 0):.4f})")
+            report_path = write_report({
+                "run_id": run_id,
+                "thesis": thesis,
+                "started_at": started_at,
+                "finished_at": time.time(),
+                "duration_s": round(time.time() - started_at, 3),
+                "first_result_s": portfolios.first_result_s,
+                "investors": len(investors),
+                "successful_extractions": stats["successful"],
+                "failed_extractions": stats["failed"],
+                "valid_startups": len(startups),
+                **usage,
+            })
+            if report_path:
+                print(f"📝 Relatório da execução: {report_path}")
+        return True
+
+
+@dataclass
+class PortfolioJob:
+    """Um portfolio em trânsito pelos estágios do fluxo"""
+    position: int
+    investor: str
+    url: str
+    # Startups brutas: preenchidas pela extração ou reaproveitadas do diário
+    startups: list | None = None
+    content_hash: str | None = None
+    # Já registrado no diário desta execução (retomada)
+    recorded: bool = False
+
+
+class PortfolioStream:
+    """Estágios do fluxo de portfolios de uma execução do ResearchPipeline
+
+    As filas limitam os portfolios em trânsito, mas o EntityResolver guarda
+    um registro por startup distinta até o fim da execução (é com ele que a
+    mesma startup de outro portfolio é reconhecida), então essa parte da
+    memória cresce com o total de startups. A deduplicação resolve os
+    portfolios na ordem da lista de investidores, para o registro canônico de
+    cada startup não depender de qual extração acabou primeiro, mas segura no
+    máximo PIPELINE_REORDER_WINDOW lotes à espera de um anterior: com a
+    janela cheia, o portfolio atrasado perde a vez e é resolvido quando chegar.
+    """
+
+    def __init__(self, pipeline: "ResearchPipeline", run_id: int, investors: list,
+                 skip_unchanged: bool, started_at: float):
+        self.pipeline = pipeline
+        self.run_id = run_id
+        self.total = len(investors)
+        self.skip_unchanged = skip_unchanged
+        self.started_at = started_at
+        # Uma resolução de entidades por execução: junta a mesma startup vista em vários
+        # portfolios (os sites dos investidores não identificam startups)
+        self.resolver = EntityResolver(ignored_domains={
+            normalize_domain(inv.get("website") if isinstance(inv, dict) else getattr(inv, "website", None))
+            for inv in investors
+        })
+        self.stats = Counter(successful=0, failed=0)
+        self.first_result_s: float | None = None
+        self._lock = threading.Lock()
+        # Lotes validados por posição, à espera dos anteriores (None: posição sem lote)
+        self._ready: dict[int, tuple | None] = {}
+        self._next_position = 1
+        self.reorder_window = PIPELINE_REORDER_WINDOW
+
+    def stages(self) -> list[Stage]:
+        return [
+            Stage("fetch", self.fetch, workers=PIPELINE_FETCH_WORKERS, maxsize=PIPELINE_QUEUE_SIZE),
+            Stage("extract", self.extract, workers=self.pipeline.max_workers, maxsize=PIPELINE_QUEUE_SIZE),
+            Stage("validate", self.validate, workers=PIPELINE_VALIDATE_WORKERS, maxsize=PIPELINE_QUEUE_SIZE),
+            # O índice de deduplicação e os destinos não são thread-safe: um worker cada
+            Stage("dedup", self.dedup, workers=1, maxsize=PIPELINE_QUEUE_SIZE, finish=self.drain_remaining),
+            Stage("sink", self.save, workers=1, maxsize=PIPELINE_QUEUE_SIZE),
+        ]
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _skip(self, position: int):
+        """Libera a vez de um portfolio que não vai chegar à deduplicação"""
+        with self._lock:
+            if position >= self._next_position:
+                self._ready.setdefault(position, None)
+
+    def jobs(self, investors: list, completed: dict):
+        """Fonte do fluxo: um job por investidor com portfolio válido"""
+        for i, inv in enumerate(investors, 1):
+            inv_name = inv.get("name") if isinstance(inv, dict) else getattr(inv, "name", None)
+            inv_portfolio = inv.get("portfolio_url") if isinstance(inv, dict) else getattr(inv, "portfolio_url", None)
+            if inv_portfolio in completed:
+                yield PortfolioJob(i, inv_name, inv_portfolio, startups=completed[inv_portfolio], recorded=True)
+            elif inv_portfolio and inv_portfolio.lower() not in ['null', 'none', '']:
+                yield PortfolioJob(i, inv_name, inv_portfolio)
+            else:
+                print(f"⚠️ Sem URL de portfolio válida para {inv_name}")
+                self._count("failed")
+                self._skip(i)
+
+    def fetch(self, job: PortfolioJob):
+        print(f"\n📈 [{job.position}/{self.total}] Processando: {job.investor}")
+        print(f"🔗 Portfolio URL: {job.url}")
+        if job.startups is not None:
+            print(f"♻️ Portfolio já processado nesta execução, reaproveitando")
+        else:
+            job.content_hash, job.startups = self.pipeline._check_unchanged(
+                job.investor, job.url, self.skip_unchanged)
+        yield job
+
+    def extract(self, job: PortfolioJob):
+        if job.startups is None:
+            # O pool de StartupCrews é compartilhado entre execuções concorrentes
+            job.startups = self.pipeline._executor.submit(
+                self.pipeline._extract_startups, job.investor, job.url).result()
+        if not job.recorded:
+            # Extração vazia fica como falha: a retomada e a próxima execução tentam de novo
+            status = STATUS_DONE if job.startups else STATUS_FAILED
+            self.pipeline.journal.record_portfolio(self.run_id, job.url, job.investor, status,
+                                                   job.startups, job.content_hash)
+            job.recorded = True
+        print(f"📊 Encontradas {len(job.startups)} startups brutas de {job.investor}")
+        yield job
+
+    def validate(self, job: PortfolioJob):
+        # VALIDAÇÃO ANTI-ALUCINAÇÃO MELHORADA
+        if not job.startups:
+            print(f"⚠️ Nenhuma startup encontrada para {job.investor}")
+            self._count("failed")
+            self._skip(job.position)
+            return
+        metrics = get_metrics()
+        with metrics.span("pipeline.validate"):
+            validation = validate_startup_data(job.startups)
+        metrics.incr("pipeline.validation.accepted", len(validation.accepted))
+        metrics.incr("pipeline.validation.rejected", len(validation.rejected))
+        reasons = validation.reasons()
+        if reasons:
+            print(f"🧹 {len(validation.rejected)} startups de {job.investor} rejeitadas na validação ("
+                  + ", ".join(f"{reason}: {count}" for reason, count in reasons.items()) + ")")
+        if not validation.accepted:
+            print(f"⚠️ Nenhuma startup válida após validação para {job.investor}")
+            self._count("failed")
+            self._skip(job.position)
+            return
+        yield job.position, job.investor, validation.accepted
+
+    def dedup(self, item):
+        position, investor, startups = item
+        with self._lock:
+            late = position < self._next_position
+            if not late:
+                self._ready[position] = (investor, startups)
+        if late:
+            # Já perdeu a vez (a janela encheu enquanto ele era extraído)
+            yield from self._resolve(investor, startups)
+        yield from self._drain()
+
+    def drain_remaining(self):
+        """Fim da entrada: resolve o que ainda esperava, pulando posições que não vieram"""
+        yield from self._drain(final=True)
+
+    def _drain(self, final: bool = False):
+        """Resolve os lotes prontos na ordem das posições"""
+        while True:
+            with self._lock:
+                if self._next_position not in self._ready:
+                    held = sum(1 for entry in self._ready.values() if entry is not None)
+                    if not self._ready or (not final and held <= self.reorder_window):
+                        return
+                    # Fim da entrada ou janela cheia: pula as posições que ainda não vieram
+                    self._next_position = min(self._ready)
+                entry = self._ready.pop(self._next_position)
+                self._next_position += 1
+            if entry is not None:
+                yield from self._resolve(*entry)
+
+    def _resolve(self, investor: str, startups: list):
+        # Startup já vista em outro portfolio: só soma o investidor ao registro existente
+        with get_metrics().span("pipeline.resolve"):
+            resolution = self.resolver.resolve(startups, investor)
+        get_metrics().incr("pipeline.resolution.duplicates", resolution.duplicates)
+        if resolution.duplicates:
+            print(f"🔗 {resolution.duplicates} startups de {investor} já vistas em outros portfolios")
+        for startup in resolution.new:
+            startup["vc_name"] = investor
+        self._count("successful")
+
+        # Grava as novas e regrava as já vistas que ganharam investidor ou dados
+        if resolution.changed:
+            yield investor, resolution.changed
+
+    def save(self, item):
+        investor, startups = item
+        print(f"💾 Salvando {len(startups)} startups de {investor}...")
+        summary = self.pipeline.sink.save_startups(startups, vc_name=investor, worksheet_name="Startups")
+        if self.first_result_s is None:
+            # Primeiro resultado vai direto para o destino, sem esperar o buffer encher
+            self.pipeline.sink.flush()
+            self.first_result_s = time.time() - self.started_at
+        print(f"✅ Startups de {investor} salvas! ({format_summary(summary)})")
+        return ()
+
+    def on_error(self, stage: str, item, error: Exception):
+        job = item if isinstance(item, PortfolioJob) else None
+        if job is not None:
+            investor = job.investor
+        elif stage == "dedup":
+            investor = item[1] if item else "portfolios pendentes"
+        else:
+            investor = item[0]
+        print(f"❌ Erro ao processar {investor} ({stage}): {error}")
+        print(f"🔍 Debug - Detalhes do erro: {str(error)}")
+        if job is not None:
+            if not job.recorded:
+                self.pipeline.journal.record_portfolio(self.run_id, job.url, job.investor, STATUS_FAILED)
+            self._skip(job.position)
+        if stage != "sink":
+            self._count("failed")
@@ -0,0 +1,213 @@
+import os
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from validation import normalize_domain, normalize_name
+
+# Similaridade mínima entre nomes (sem sufixos societários) para considerar a mesma startup
+NAME_THRESHOLD = float(os.getenv("RESOLUTION_NAME_THRESHOLD", "0.92"))
+# Com o mesmo domínio basta uma semelhança menor (ex.: "Loft" e "Loft Imóveis")
+DOMAIN_NAME_THRESHOLD = float(os.getenv("RESOLUTION_DOMAIN_NAME_THRESHOLD", "0.5"))
+# Nomes curtos demais para comparação aproximada: só casam se forem iguais
+MIN_FUZZY_LENGTH = 6
+# Tamanho dos blocos de prefixo/sufixo do nome
+BLOCK_LENGTH = 4
+
+# Sufixos societários e palavras que não distinguem empresas
+NAME_STOPWORDS = {"the", "inc", "llc", "ltd", "ltda", "sa", "s", "a", "sas", "sapi", "de", "cv", "me",
+                  "eireli", "corp", "co", "company", "group", "grupo", "holding", "hq"}
+
+# Hosts compartilhados por muitas empresas: o domínio não identifica a startup
+SHARED_HOSTS = {"linkedin.com", "facebook.com", "instagram.com", "twitter.com", "x.com", "medium.com",
+                "crunchbase.com", "angel.co", "wellfound.com", "github.com", "youtube.com",
+                "linktr.ee", "bit.ly", "notion.site", "wixsite.com", "google.com"}
+
+# Campos completados a partir das duplicatas quando o registro canônico não os tem
+MERGE_FIELDS = ("website", "description", "sector", "stage", "funding", "tech", "year", "country",
+                "leadership")
+
+SECOND_LEVEL_RE = re.compile(r"^(com|net|org|gov|edu|co|ac)$")
+DIGITS_RE = re.compile(r"\d+")
+
+
+def company_name(name: str | None) -> str:
+    """Nome normalizado sem sufixos societários, sem espaços ('Nu Bank S.A.' -> 'nubank')"""
+    tokens = [token for token in normalize_name(name or "").split() if token not in NAME_STOPWORDS]
+    return "".join(tokens) or normalize_name(name or "").replace(" ", "")
+
+
+def domain_stem(domain: str) -> str:
+    """Rótulo que identifica o domínio ('app.nubank.com.br' -> 'nubank')"""
+    labels = domain.split(".")
+    if len(labels) >= 3 and (len(labels[-1]) == 2 and SECOND_LEVEL_RE.match(labels[-2])):
+        labels = labels[:-2]
+    elif len(labels) >= 2:
+        labels = labels[:-1]
+    return labels[-1] if labels else ""
+
+
+def name_similarity(a: str, b: str, threshold: float) -> float:
+    """Semelhança entre dois nomes de company_name(), ou 0 se ficar abaixo do limiar"""
+    if a == b:
+        return 1.0
+    if len(a) < MIN_FUZZY_LENGTH or len(b) < MIN_FUZZY_LENGTH:
+        return 0.0
+    # Números diferentes indicam empresas diferentes ("Loja 1" e "Loja 2")
+    if DIGITS_RE.findall(a) != DIGITS_RE.findall(b):
+        return 0.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    # Limites superiores baratos antes do ratio completo
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    ratio = matcher.ratio()
+    return ratio if ratio >= threshold else 0.0
+
+
+@dataclass
+class Entity:
+    """Uma startup resolvida: o registro canônico e as chaves usadas para encontrá-la"""
+    record: dict
+    name: str
+    domain: str
+    position: int
+    keys: set[str] = field(default_factory=set)
+
+
+@dataclass
+class ResolutionResult:
+    # Startups vistas pela primeira vez nesta execução
+    new: list[dict] = field(default_factory=list)
+    # Registros já vistos que ganharam investidor ou campos (precisam ser regravados)
+    merged: list[dict] = field(default_factory=list)
+    # Quantos registros do lote foram absorvidos por uma startup existente
+    duplicates: int = 0
+
+    @property
+    def changed(self) -> list[dict]:
+        return self.new + self.merged
+
+
+class EntityResolver:
+    """Junta a mesma startup vista em portfolios de investidores diferentes
+
+    Cada registro é comparado só com as startups que dividem com ele uma chave
+    de bloco (domínio, começo ou fim do nome), então o custo cresce com o
+    tamanho dos blocos e não com o quadrado do total. O primeiro registro de
+    cada startup vira o canônico: os seguintes somam seus investidores à lista
+    "investors" (como as FundingRound ligam startups e investidores) e
+    completam os campos vazios. Uma instância deve durar uma execução inteira.
+    """
+
+    def __init__(self, ignored_domains: set[str] | None = None):
+        self._entities: list[Entity] = []
+        self._blocks: dict[str, list[int]] = {}
+        # (nome, domínio) já vistos: repetições exatas não passam pela comparação aproximada
+        self._exact: dict[tuple[str, str], int] = {}
+        # Domínios que não identificam startups (ex.: os sites dos próprios investidores)
+        self.ignored_domains = SHARED_HOSTS | {domain for domain in (ignored_domains or ()) if domain}
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    @property
+    def entities(self) -> list[dict]:
+        return [entity.record for entity in self._entities]
+
+    def _domain(self, startup: dict) -> str:
+        domain = normalize_domain(startup.get("website"))
+        return "" if domain in self.ignored_domains else domain
+
+    @staticmethod
+    def _block_keys(name: str, domain: str) -> set[str]:
+        keys = {f"d:{domain}"} if domain else set()
+        if name:
+            # Nomes só casam com os mesmos números, então eles entram na chave e afinam os blocos
+            digits = "/".join(DIGITS_RE.findall(name))
+            keys.add(f"p:{name[:BLOCK_LENGTH]}#{digits}")
+            keys.add(f"s:{name[-BLOCK_LENGTH:]}#{digits}")
+        return keys
+
+    def _score(self, entity: Entity, name: str, domain: str) -> float:
+        """Semelhança com uma startup existente (0 quando não são a mesma)"""
+        self.comparisons += 1
+        if entity.domain and domain:
+            if entity.domain == domain:
+                if name and entity.name and (name in entity.name or entity.name in name):
+                    return 1.0
+                return name_similarity(entity.name, name, DOMAIN_NAME_THRESHOLD)
+            # Sites diferentes só são a mesma empresa com o mesmo rótulo (nubank.com e nubank.com.br)
+            if domain_stem(entity.domain) != domain_stem(domain):
+                return 0.0
+        return name_similarity(entity.name, name, NAME_THRESHOLD)
+
+    def _match(self, name: str, domain: str, keys: set[str]) -> Entity | None:
+        exact = self._exact.get((name, domain))
+        if exact is not None:
+            return self._entities[exact]
+        candidates = {index for key in keys for index in self._blocks.get(key, ())}
+        best, best_score = None, 0.0
+        for index in sorted(candidates):
+            score = self._score(self._entities[index], name, domain)
+            if score > best_score:
+                best, best_score = self._entities[index], score
+        return best
+
+    def _index(self, entity: Entity, name: str, domain: str, keys: set[str]):
+        self._exact.setdefault((name, domain), entity.position)
+        for key in keys - entity.keys:
+            self._blocks.setdefault(key, []).append(entity.position)
+        entity.keys |= keys
+
+    @staticmethod
+    def _merge(record: dict, startup: dict, investor: str | None) -> bool:
+        """Soma investidores e completa campos vazios do canônico; True se algo mudou"""
+        changed = False
+        investors = record.setdefault("investors", [])
+        for name in [*(startup.get("investors") or []), investor]:
+            if name and name not in investors:
+                investors.append(name)
+                changed = True
+        for key in MERGE_FIELDS:
+            if not record.get(key) and startup.get(key):
+                record[key] = startup[key]
+                changed = True
+        return changed
+
+    def resolve(self, startups: list[dict], investor: str | None = None) -> ResolutionResult:
+        """Resolve um lote (normalmente o portfolio de um investidor)"""
+        result = ResolutionResult()
+        # Registros já incluídos no resultado (novos ou mesclados), para não repetir
+        changed_ids = set()
+        for startup in startups:
+            name = company_name(startup.get("name"))
+            domain = self._domain(startup)
+            keys = self._block_keys(name, domain)
+            entity = self._match(name, domain, keys)
+
+            if entity is None:
+                startup["investors"] = list(dict.fromkeys(
+                    item for item in [*(startup.get("investors") or []), investor] if item))
+                entity = Entity(startup, name, domain, position=len(self._entities))
+                self._entities.append(entity)
+                self._index(entity, name, domain, keys)
+                changed_ids.add(id(startup))
+                result.new.append(startup)
+                continue
+
+            result.duplicates += 1
+            if not entity.domain and domain:
+                entity.domain = domain
+            self._index(entity, name, domain, keys)
+            if self._merge(entity.record, startup, investor) and id(entity.record) not in changed_ids:
+                changed_ids.add(id(entity.record))
+                result.merged.append(entity.record)
+        return result
+
+
+def resolve_startups(startups: list[dict], investor: str | None = None) -> list[dict]:
+    """Lista de startups sem duplicatas, cada uma com a lista de investidores somada"""
+    resolver = EntityResolver()
+    resolver.resolve(startups, investor)
+    return resolver.entities
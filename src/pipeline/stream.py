@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from instrumentation import get_metrics
+
+# Fim do fluxo: cada worker recebe um e, ao sair, o último avisa o estágio seguinte
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """Um estágio do fluxo: handler(item) gera zero ou mais itens para o próximo estágio
+
+    workers define a concorrência do estágio e maxsize o tamanho da fila de
+    entrada dele; com a fila cheia, quem produz espera (backpressure).
+    finish(), se houver, roda uma vez quando a entrada acaba e pode gerar os
+    últimos itens (ex.: os que o estágio ainda segurava).
+    """
+    name: str
+    handler: Callable[[object], Iterable | None]
+    workers: int = 1
+    maxsize: int = 0
+    finish: Callable[[], Iterable | None] | None = None
+
+    def __post_init__(self):
+        self.workers = max(1, self.workers)
+        if self.maxsize <= 0:
+            self.maxsize = 2 * self.workers
+
+
+class StreamPipeline:
+    """Estágios ligados por filas limitadas, cada um com suas threads
+
+    Os itens passam adiante assim que ficam prontos, então o último estágio
+    começa a trabalhar com o primeiro item e a memória fica limitada ao que
+    cabe nas filas. Um erro num item chama on_error(estágio, item, erro) e o
+    fluxo segue com os demais.
+    """
+
+    def __init__(self, stages: list[Stage], on_error: Callable[[str, object, Exception], None] | None = None):
+        if not stages:
+            raise ValueError("O fluxo precisa de pelo menos um estágio")
+        self.stages = stages
+        self.on_error = on_error or self._print_error
+
+    @staticmethod
+    def _print_error(stage: str, item, error: Exception):
+        print(f"❌ Erro no estágio {stage}: {error}")
+        traceback.print_exception(error)
+
+    def run(self, items: Iterable):
+        """Alimenta o primeiro estágio com os itens e espera o fluxo terminar"""
+        queues = [queue.Queue(maxsize=stage.maxsize) for stage in self.stages]
+        threads = []
+        for position, stage in enumerate(self.stages):
+            output = queues[position + 1] if position + 1 < len(queues) else None
+            next_workers = self.stages[position + 1].workers if output is not None else 0
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[position], output, next_workers, remaining, lock),
+                    name=f"stage-{stage.name}-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+    def _work(self, stage: Stage, source: queue.Queue, output: queue.Queue | None,
+              next_workers: int, remaining: list, lock: threading.Lock):
+        metrics = get_metrics()
+        try:
+            while True:
+                item = source.get()
+                if item is _DONE:
+                    return
+                busy, start = 0.0, time.perf_counter()
+                try:
+                    for result in stage.handler(item) or ():
+                        if output is not None:
+                            # Tempo parado esperando vaga na fila seguinte não conta como trabalho
+                            busy += time.perf_counter() - start
+                            output.put(result)
+                            start = time.perf_counter()
+                    metrics.observe(f"stream.{stage.name}", busy + time.perf_counter() - start)
+                except Exception as e:
+                    metrics.observe(f"stream.{stage.name}", busy + time.perf_counter() - start, error=True)
+                    try:
+                        self.on_error(stage.name, item, e)
+                    except Exception:
+                        traceback.print_exc()
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and stage.finish is not None:
+                try:
+                    for result in stage.finish() or ():
+                        if output is not None:
+                            output.put(result)
+                except Exception as e:
+                    try:
+                        self.on_error(stage.name, None, e)
+                    except Exception:
+                        traceback.print_exc()
+            if last and output is not None:
+                for _ in range(next_workers):
+                    output.put(_DONE)
+
@@ -0,0 +1,71 @@
+import os
+import traceback
+from dotenv import load_dotenv
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Expressão cron (minuto hora dia mês dia-da-semana); padrão: todo dia às 03:00
+PIPELINE_CRON = os.getenv("PIPELINE_CRON", "0 3 * * *")
+# Teses separadas por ";" (padrão: a tese de main.py)
+PIPELINE_THESES = os.getenv("PIPELINE_THESES", "")
+# Atraso aleatório (s) aplicado a cada disparo, para os jobs não baterem nos sites ao mesmo tempo
+PIPELINE_JITTER = int(os.getenv("PIPELINE_JITTER", "600"))
+# Roda o InvestorCrew de novo a cada N refreshes (nos demais reaproveita os investidores)
+INVESTOR_REFRESH_EVERY = int(os.getenv("INVESTOR_REFRESH_EVERY", "7"))
+
+
+def cron_trigger(expression: str, jitter: int) -> CronTrigger:
+    minute, hour, day, month, day_of_week = expression.split()
+    return CronTrigger(minute=minute, hour=hour, day=day, month=month,
+                       day_of_week=day_of_week, jitter=jitter or None)
+
+
+def refresh_job(pipeline, thesis: str, runs: dict):
+    """Refresh incremental: só re-extrai portfolios cuja página mudou"""
+    count = runs.get(thesis, 0)
+    runs[thesis] = count + 1
+    reuse_investors = INVESTOR_REFRESH_EVERY > 0 and count % INVESTOR_REFRESH_EVERY != 0
+    try:
+        pipeline.run(thesis, resume=True, skip_unchanged=True, reuse_investors=reuse_investors)
+    except Exception as e:
+        print(f"❌ Erro no refresh agendado de '{thesis}': {e}")
+        traceback.print_exc()
+
+
+def main():
+    from pipeline.research import DEFAULT_THESIS, ResearchPipeline
+
+    theses = [t.strip() for t in PIPELINE_THESES.split(";") if t.strip()] or [DEFAULT_THESIS]
+
+    # Uma instância só: crews, pool de StartupCrews e FetchClient compartilhados pelos jobs
+    pipeline = ResearchPipeline()
+    runs = {}
+
+    scheduler = BlockingScheduler()
+    for i, thesis in enumerate(theses):
+        scheduler.add_job(
+            refresh_job,
+            cron_trigger(PIPELINE_CRON, PIPELINE_JITTER),
+            args=[pipeline, thesis, runs],
+            id=f"refresh-{i}",
+            name=f"Refresh: {thesis}",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=3600,
+        )
+        print(f"🗓️ Agendado '{thesis}' com cron '{PIPELINE_CRON}' (jitter {PIPELINE_JITTER}s)")
+
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        print("🛑 Scheduler encerrado")
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
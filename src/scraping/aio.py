@@ -0,0 +1,184 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import httpx
+
+from instrumentation import get_metrics
+from scraping.health import HostHealth, HostInTrial, get_health
+from scraping.http import DEFAULT_HEADERS, MIN_HOST_INTERVAL, FetchResponse, ResponseCache, health_gate
+
+# Limite global de requisições simultâneas do motor assíncrono
+ASYNC_MAX_CONNECTIONS = int(os.getenv("SCRAPER_ASYNC_MAX_CONNECTIONS", "20"))
+ASYNC_PER_HOST_LIMIT = int(os.getenv("SCRAPER_ASYNC_PER_HOST_LIMIT", "4"))
+CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SCRAPER_READ_TIMEOUT", "10"))
+
+URL_SEPARATOR_RE = re.compile(r"[\s,;]+")
+
+
+def split_urls(urls: str) -> list[str]:
+    """URLs separadas por vírgula, ponto e vírgula ou espaço, sem repetições"""
+    return list(dict.fromkeys(url for url in URL_SEPARATOR_RE.split(urls or "") if url))
+
+
+class AsyncFetchEngine:
+    """Motor de busca assíncrono (httpx) para buscar várias URLs de uma vez
+
+    Roda num event loop próprio, numa thread de fundo, para poder ser usado
+    pelas ferramentas síncronas do crewai. Compartilha o cache em disco do
+    FetchClient e o circuito do HostHealth (acessados em threads, para o
+    loop só esperar a rede), e aplica um limite global e outro por host,
+    além do espaçamento mínimo entre requisições ao mesmo host.
+    """
+
+    def __init__(self, cache: ResponseCache | None = None,
+                 max_connections: int = ASYNC_MAX_CONNECTIONS,
+                 per_host_limit: int = ASYNC_PER_HOST_LIMIT,
+                 connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 min_host_interval: float = MIN_HOST_INTERVAL,
+                 health: HostHealth | None = None):
+        self.cache = cache or ResponseCache()
+        self.health = health or get_health()
+        self.max_connections = max(1, max_connections)
+        self.per_host_limit = max(1, per_host_limit)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.min_host_interval = min_host_interval
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        # Criados dentro do loop (só são acessados pela thread do loop)
+        self._client: httpx.AsyncClient | None = None
+        self._global_slots: asyncio.Semaphore | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._next_request_at: dict[str, float] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="async-fetch", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _setup(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+            self._global_slots = asyncio.Semaphore(self.max_connections)
+            self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+
+    async def _wait_turn(self, host: str):
+        """Espaça as requisições a um mesmo host em pelo menos min_host_interval"""
+        if self.min_host_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        turn = max(now, self._next_request_at.get(host, now))
+        self._next_request_at[host] = turn + self.min_host_interval
+        if turn > now:
+            await asyncio.sleep(turn - now)
+
+    async def fetch(self, url: str, revalidate: bool = False, timeout: float | None = None) -> FetchResponse:
+        """GET com cache e revalidação condicional, com a mesma semântica de FetchClient.get"""
+        self._setup()
+        # Cache em disco e HostHealth (SQLite) bloqueiam: rodam fora do event loop
+        cached = await asyncio.to_thread(self.cache.get, url)
+        if cached and not revalidate and self.cache.is_fresh(cached[0]):
+            meta, body = cached
+            get_metrics().incr("http.cache_hit")
+            return FetchResponse(url, meta["status_code"], body, meta.get("headers", {}), from_cache=True)
+
+        try:
+            gated = await asyncio.to_thread(health_gate, self.health, url, cached, False)
+        except HostInTrial:
+            # Só espera a requisição de teste do host quando há uma em andamento
+            gated = await asyncio.to_thread(health_gate, self.health, url, cached)
+        if gated is not None:
+            get_metrics().incr("http.health_skip")
+            return gated
+
+        headers = {}
+        if cached:
+            meta = cached[0]
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        host = urlparse(url).netloc.lower()
+        request_timeout = httpx.Timeout(timeout, connect=self.connect_timeout) if timeout else None
+        try:
+            async with self._global_slots, self._host_slots[host]:
+                await self._wait_turn(host)
+                start = time.perf_counter()
+                if request_timeout:
+                    response = await self._client.get(url, headers=headers, timeout=request_timeout)
+                else:
+                    response = await self._client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            get_metrics().observe("http.fetch_async", time.perf_counter() - start, error=True)
+            await asyncio.to_thread(self.health.record, url, error=f"{type(e).__name__}: {e}")
+            raise
+        get_metrics().observe("http.fetch_async", time.perf_counter() - start)
+        await asyncio.to_thread(self.health.record, url, response.status_code)
+
+        if response.status_code == 304 and cached:
+            meta, body = cached
+            await asyncio.to_thread(self.cache.touch, url, meta)
+            return FetchResponse(url, meta["status_code"], body, meta.get("headers", {}), from_cache=True)
+
+        result = FetchResponse(url, response.status_code, response.content, dict(response.headers))
+        if response.status_code == 200:
+            await asyncio.to_thread(self.cache.put, url, response.status_code, result.headers, result.content)
+        return result
+
+    def fetch_many(self, urls: list[str], revalidate: bool = False,
+                   timeout: float | None = None) -> list[FetchResponse | Exception]:
+        """Busca todas as URLs em paralelo; cada item é a resposta ou a exceção daquela URL"""
+        if not urls:
+            return []
+
+        async def gather():
+            return await asyncio.gather(*(self.fetch(url, revalidate, timeout) for url in urls),
+                                        return_exceptions=True)
+
+        return asyncio.run_coroutine_threadsafe(gather(), self._ensure_loop()).result()
+
+    def close(self):
+        """Fecha as conexões e encerra o event loop"""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+
+_engine: AsyncFetchEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AsyncFetchEngine:
+    """Retorna o AsyncFetchEngine do processo, criado na primeira chamada"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncFetchEngine()
+        return _engine
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urljoin, urlparse
+
+from scraping.dom import ParsedPage, get_page
+from scraping.http import FetchClient, get_client
+
+# Profundidade (saltos a partir da página inicial) e orçamento de páginas por portfolio
+CRAWL_MAX_DEPTH = int(os.getenv("PORTFOLIO_CRAWL_MAX_DEPTH", "2"))
+CRAWL_MAX_PAGES = int(os.getenv("PORTFOLIO_CRAWL_MAX_PAGES", "10"))
+CRAWL_MAX_WORKERS = int(os.getenv("PORTFOLIO_CRAWL_MAX_WORKERS", "4"))
+
+# Parâmetros de query que indicam paginação ou filtro por setor
+PAGINATION_PARAMS = {"page", "p", "pg", "paged", "pagina", "página", "offset", "start"}
+FILTER_PARAMS = {"sector", "sectors", "setor", "category", "categoria", "vertical", "industry",
+                 "tag", "filter", "type", "fund", "status"}
+# /page/2, /pagina/3
+PAGE_PATH_RE = re.compile(r"/(page|pagina|página)/\d+/?$", re.I)
+# Texto de links/botões de "próxima página" e "carregar mais"
+NEXT_TEXT_RE = re.compile(
+    r"^(next|next page|older|more|load more|show more|view more|ver mais|carregar mais|mostrar mais|"
+    r"próxima|proxima|seguinte|siguiente|ver más|cargar más|mostrar más|\d{1,3}|›|»|>)$",
+    re.I,
+)
+# Atributos onde botões de "load more" guardam o endpoint
+LOAD_MORE_ATTRS = ("data-url", "data-href", "data-next", "data-next-url", "data-endpoint",
+                   "data-load-more", "data-api", "data-source")
+JSON_URL_RE = re.compile(r"(\.json($|\?)|/wp-json/|/api/|[?&](format|output)=json)", re.I)
+# Chaves de respostas JSON que costumam trazer HTML pronto (ex.: admin-ajax do WordPress)
+HTML_KEYS = ("html", "content", "markup", "items_html", "data")
+
+
+def host_of(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+@dataclass
+class CrawlResult:
+    """Páginas HTML e respostas JSON coletadas a partir de um portfolio"""
+    url: str
+    status_code: int
+    pages: list[ParsedPage] = field(default_factory=list)
+    # (URL, objeto decodificado) de endpoints JSON sem HTML embutido
+    json_payloads: list[tuple[str, object]] = field(default_factory=list)
+    fetched: int = 0
+
+    @property
+    def content_hash(self) -> str:
+        """Hash de todas as páginas e respostas JSON coletadas, independente da ordem de busca"""
+        parts = sorted(
+            [f"{page.url} {page.content_hash}" for page in self.pages]
+            + [f"{url} {json.dumps(payload, sort_keys=True, default=str)}" for url, payload in self.json_payloads]
+        )
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class PortfolioCrawler:
+    """Percorre paginação, filtros por setor e endpoints de "load more" de um portfolio
+
+    A busca é em largura, limitada por profundidade e por um orçamento de
+    páginas; cada nível é buscado em paralelo pelo FetchClient compartilhado,
+    que já aplica os limites por host. Com revalidate=True toda página passa
+    por um GET condicional, mesmo com a cópia em cache dentro do TTL.
+    """
+
+    def __init__(self, client: FetchClient | None = None, max_depth: int = CRAWL_MAX_DEPTH,
+                 max_pages: int = CRAWL_MAX_PAGES, max_workers: int = CRAWL_MAX_WORKERS,
+                 timeout: float = 15, revalidate: bool = False):
+        self.client = client or get_client()
+        self.revalidate = revalidate
+        self.max_depth = max(0, max_depth)
+        self.max_pages = max(1, max_pages)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+
+    def discover(self, page: ParsedPage, start_url: str) -> list[str]:
+        """Links da página que levam a mais empresas do mesmo portfolio"""
+        start = urlparse(start_url)
+        base_dir = start.path.rstrip("/")
+        host = host_of(start_url)
+        found = []
+
+        for text, url in page.links:
+            parsed = urlparse(url)
+            if parsed.scheme not in ("http", "https") or host_of(url) != host:
+                continue
+            path = parsed.path.rstrip("/")
+            params = {key.lower() for key, _ in parse_qsl(parsed.query)}
+
+            if JSON_URL_RE.search(url):
+                found.append(url)
+            elif path == base_dir and params & (PAGINATION_PARAMS | FILTER_PARAMS):
+                found.append(url)
+            elif PAGE_PATH_RE.search(parsed.path) and path.startswith(base_dir):
+                found.append(url)
+            elif NEXT_TEXT_RE.match(text or "") and path.startswith(base_dir) and (path != base_dir or params):
+                found.append(url)
+
+        # Botões de "load more" com o endpoint num atributo data-*
+        for attr in LOAD_MORE_ATTRS:
+            for node in page.soup.find_all(attrs={attr: True}):
+                value = node.get(attr)
+                if isinstance(value, str) and value.strip() and not value.startswith(("#", "javascript:")):
+                    url = urljoin(page.url, value.strip())
+                    if host_of(url) == host:
+                        found.append(url)
+
+        # Sem fragmentos e sem repetir, na ordem em que aparecem
+        return list(dict.fromkeys(url.split("#")[0] for url in found))
+
+    def _fetch(self, url: str):
+        """(URL, resposta) ou (URL, None) se a página falhar"""
+        try:
+            response = self.client.get(url, timeout=self.timeout, revalidate=self.revalidate)
+            response.raise_for_status()
+            return url, response
+        except Exception as e:
+            print(f"⚠️ Falha ao buscar página do portfolio {url}: {e}")
+            return url, None
+
+    def _collect(self, result: CrawlResult, url: str, response) -> ParsedPage | None:
+        """Guarda a resposta no resultado; devolve a página HTML para seguir os links"""
+        content_type = response.headers.get("Content-Type", "").lower()
+        body = response.content.lstrip()
+        if "json" in content_type or body[:1] in (b"{", b"["):
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+            if payload is not None:
+                fragments = [payload[key] for key in HTML_KEYS
+                             if isinstance(payload, dict) and isinstance(payload.get(key), str)
+                             and "<" in payload[key]]
+                for i, fragment in enumerate(fragments):
+                    result.pages.append(get_page(f"{url}#fragment-{i}", fragment.encode("utf-8")))
+                if not fragments:
+                    result.json_payloads.append((url, payload))
+                return None
+
+        page = get_page(url, response.content)
+        result.pages.append(page)
+        return page
+
+    def crawl(self, url: str) -> CrawlResult:
+        """Busca a página inicial (erros sobem) e as páginas descobertas a partir dela"""
+        response = self.client.get(url, timeout=self.timeout, revalidate=self.revalidate)
+        response.raise_for_status()
+
+        result = CrawlResult(url=url, status_code=response.status_code, fetched=1)
+        seen = {url.split("#")[0]}
+        frontier = [page for page in [self._collect(result, url, response)] if page]
+
+        for _ in range(self.max_depth):
+            budget = self.max_pages - result.fetched
+            if budget <= 0 or not frontier:
+                break
+
+            candidates = []
+            for page in frontier:
+                for link in self.discover(page, url):
+                    if link not in seen and len(candidates) < budget:
+                        seen.add(link)
+                        candidates.append(link)
+            if not candidates:
+                break
+
+            frontier = []
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(candidates))) as executor:
+                # map preserva a ordem de descoberta, então o resultado é determinístico
+                for link, link_response in executor.map(self._fetch, candidates):
+                    result.fetched += 1
+                    if link_response is not None:
+                        page = self._collect(result, link, link_response)
+                        if page is not None:
+                            frontier.append(page)
+
+        return result
+
+
+def crawl_portfolio(url: str, **kwargs) -> CrawlResult:
+    return PortfolioCrawler(**kwargs).crawl(url)
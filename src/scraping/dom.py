@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from instrumentation import get_metrics
+
+try:
+    import lxml  # noqa: F401
+    # Parser em C, bem mais rápido que o html.parser em páginas grandes
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+# Quantas páginas parseadas ficam em memória
+DOM_CACHE_SIZE = 32
+
+
+class ParsedPage:
+    """Documento parseado uma única vez, com as visões usadas pelas ferramentas
+
+    Scripts e estilos são removidos no parse, então a árvore é tratada como
+    somente leitura pelas ferramentas que compartilham o cache.
+    """
+
+    def __init__(self, url: str, content: bytes, content_hash: str | None = None):
+        self.url = url
+        self.content_hash = content_hash or hashlib.sha256(content).hexdigest()
+        self.soup = BeautifulSoup(content, PARSER)
+
+        for script in self.soup(["script", "style"]):
+            script.decompose()
+
+        self.title = self.soup.title.get_text(strip=True) if self.soup.title else None
+
+        # Todos os links: (texto, URL absoluta)
+        self.links = [
+            (link.get_text(strip=True), urljoin(url, link.get('href')))
+            for link in self.soup.find_all('a', href=True)
+        ]
+
+        # Links dentro de nav/header/menu, na ordem em que aparecem
+        self.nav_links = []
+        for nav in self.soup.find_all(['nav', 'header', 'menu']):
+            for link in nav.find_all('a', href=True):
+                href = link.get('href')
+                text = link.get_text(strip=True)
+                if href and text:
+                    self.nav_links.append((text, urljoin(url, href)))
+
+        # Listas com a contagem de <li> (recursiva, como find_all('li'))
+        self.lists = [(ul, len(ul.find_all('li'))) for ul in self.soup.find_all(['ul', 'ol'])]
+
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+
+_pages: OrderedDict[tuple[str, str], ParsedPage] = OrderedDict()
+_pages_lock = threading.Lock()
+
+
+def get_page(url: str, content: bytes) -> ParsedPage:
+    """Devolve a página parseada do cache LRU (chave: URL + hash do conteúdo)"""
+    key = (url, hashlib.sha256(content).hexdigest())
+    with _pages_lock:
+        page = _pages.get(key)
+        if page is not None:
+            _pages.move_to_end(key)
+            return page
+
+    with get_metrics().span("dom.parse"):
+        page = ParsedPage(url, content, content_hash=key[1])
+
+    with _pages_lock:
+        _pages[key] = page
+        _pages.move_to_end(key)
+        while len(_pages) > DOM_CACHE_SIZE:
+            _pages.popitem(last=False)
+    return page
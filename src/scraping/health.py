@@ -0,0 +1,205 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+HEALTH_PATH = os.getenv(
+    "SCRAPER_HEALTH_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "nvidia-inception", "host_health.sqlite3"),
+)
+# Falhas seguidas que abrem o circuito de um host
+BREAKER_THRESHOLD = int(os.getenv("SCRAPER_BREAKER_THRESHOLD", "3"))
+# Espera inicial com o circuito aberto; dobra a cada nova falha, até o máximo
+BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", str(5 * 60)))
+BREAKER_MAX_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_MAX_COOLDOWN", str(24 * 60 * 60)))
+# Tempo máximo da requisição de teste (meio-aberto); sem resultado até lá, outra é admitida
+BREAKER_TRIAL_TIMEOUT = float(os.getenv("SCRAPER_BREAKER_TRIAL_TIMEOUT", "60"))
+# Quanto tempo uma URL que falhou fica no cache negativo
+NEGATIVE_TTL = float(os.getenv("SCRAPER_NEGATIVE_TTL", str(60 * 60)))
+
+# Respostas que indicam host bloqueando ou fora do ar (contam para o circuito)
+HOST_FAILURE_STATUS = {403, 408, 429, 500, 502, 503, 504}
+# Respostas que só invalidam a URL (o host está de pé)
+URL_FAILURE_STATUS = {404, 410}
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Circuito aberto: o host falhou repetidamente e está em espera"""
+
+
+class HostInTrial(HostUnavailable):
+    """Circuito meio-aberto com a requisição de teste em andamento (check com hold=False)"""
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostHealth:
+    """Saúde dos hosts raspados, persistida em SQLite entre execuções
+
+    Conta falhas seguidas por host (timeouts, erros de conexão, 403/429/5xx)
+    e, a partir de `threshold`, abre o circuito: novas requisições falham na
+    hora até o fim da espera, que dobra a cada falha. Passada a espera, o
+    circuito fica meio-aberto: só uma requisição de teste passa, e as demais
+    esperam o resultado dela (sucesso fecha o circuito, falha o reabre). URLs
+    que falharam ficam num cache negativo por `negative_ttl` segundos.
+    """
+
+    def __init__(self, path: str = HEALTH_PATH, threshold: int = BREAKER_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN, max_cooldown: float = BREAKER_MAX_COOLDOWN,
+                 negative_ttl: float = NEGATIVE_TTL, trial_timeout: float = BREAKER_TRIAL_TIMEOUT):
+        self.path = path
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.negative_ttl = negative_ttl
+        self.trial_timeout = trial_timeout
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Avisa quem espera no meio-aberto quando a requisição de teste termina
+        self._trial_done = threading.Condition(self._lock)
+        # Host -> prazo da requisição de teste em andamento (só em memória)
+        self._trials: dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS hosts (
+                host TEXT PRIMARY KEY,
+                failures INTEGER NOT NULL,
+                open_until REAL NOT NULL,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS negative (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER,
+                error TEXT,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        now = time.time()
+        self._conn.execute("DELETE FROM negative WHERE expires_at <= ?", (now,))
+        self._conn.commit()
+
+        # Estado em memória (consultado a cada requisição); o SQLite só recebe as mudanças
+        self._hosts = {
+            host: [failures, open_until, last_error]
+            for host, failures, open_until, last_error in self._conn.execute(
+                "SELECT host, failures, open_until, last_error FROM hosts")
+        }
+        self._negative = {
+            url: (status_code, error, expires_at)
+            for url, status_code, error, expires_at in self._conn.execute(
+                "SELECT url, status_code, error, expires_at FROM negative")
+        }
+
+    def check(self, url: str, hold: bool = True):
+        """Falha na hora se o circuito do host estiver aberto
+
+        No meio-aberto, a primeira chamada vira a requisição de teste e as
+        seguintes esperam o resultado dela; com hold=False levantam HostInTrial.
+        """
+        host = host_of(url)
+        with self._lock:
+            while True:
+                state = self._hosts.get(host)
+                now = time.time()
+                if not state or state[0] < self.threshold:
+                    return
+                if state[1] > now:
+                    raise HostUnavailable(
+                        f"{host} indisponível até {time.strftime('%H:%M:%S', time.localtime(state[1]))} "
+                        f"({state[0]} falhas seguidas; último erro: {state[2]})"
+                    )
+                trial = self._trials.get(host)
+                if trial is None or trial <= now:
+                    self._trials[host] = now + self.trial_timeout
+                    return
+                if not hold:
+                    raise HostInTrial(f"{host} em teste após {state[0]} falhas seguidas")
+                self._trial_done.wait(trial - now)
+
+    def negative(self, url: str) -> tuple[int | None, str | None] | None:
+        """(status, erro) de uma falha recente da URL, ou None"""
+        with self._lock:
+            entry = self._negative.get(url)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                del self._negative[url]
+                return None
+            return entry[0], entry[1]
+
+    def record(self, url: str, status_code: int | None = None, error: str | None = None):
+        """Registra o resultado de uma requisição (status HTTP ou erro de rede)"""
+        if error is None and status_code in URL_FAILURE_STATUS:
+            self._remember_failure(url, status_code, f"HTTP {status_code}")
+            self._record_host(url, success=True)
+        elif error is not None or status_code in HOST_FAILURE_STATUS:
+            error = error or f"HTTP {status_code}"
+            self._remember_failure(url, status_code, error)
+            self._record_host(url, success=False, error=error)
+        else:
+            self._record_host(url, success=True)
+            with self._lock:
+                if self._negative.pop(url, None) is not None:
+                    self._conn.execute("DELETE FROM negative WHERE url = ?", (url,))
+                    self._conn.commit()
+
+    def _remember_failure(self, url: str, status_code: int | None, error: str):
+        expires_at = time.time() + self.negative_ttl
+        with self._lock:
+            self._negative[url] = (status_code, error, expires_at)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO negative (url, status_code, error, expires_at) VALUES (?, ?, ?, ?)",
+                (url, status_code, error, expires_at),
+            )
+            self._conn.commit()
+
+    def _record_host(self, url: str, success: bool, error: str | None = None):
+        host = host_of(url)
+        now = time.time()
+        with self._lock:
+            if self._trials.pop(host, None) is not None:
+                self._trial_done.notify_all()
+            state = self._hosts.get(host)
+            if success:
+                if state is None or (state[0] == 0 and state[1] == 0):
+                    return
+                state = [0, 0.0, None]
+            else:
+                failures = (state[0] if state else 0) + 1
+                open_until = 0.0
+                if failures >= self.threshold:
+                    cooldown = min(self.cooldown * 2 ** (failures - self.threshold), self.max_cooldown)
+                    open_until = now + cooldown
+                    print(f"🔌 Circuito aberto para {host} por {cooldown:.0f}s ({failures} falhas seguidas)")
+                state = [failures, open_until, error]
+
+            self._hosts[host] = state
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hosts (host, failures, open_until, last_error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (host, state[0], state[1], state[2], now),
+            )
+            self._conn.commit()
+
+
+_health: HostHealth | None = None
+_health_lock = threading.Lock()
+
+
+def get_health() -> HostHealth:
+    """Retorna o HostHealth do processo, criado na primeira chamada"""
+    global _health
+    with _health_lock:
+        if _health is None:
+            _health = HostHealth()
+        return _health
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import get_metrics
+from scraping.health import HostHealth, HostUnavailable, get_health
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+CACHE_DIR = os.getenv(
+    "SCRAPER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "nvidia-inception", "http"),
+)
+CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", str(6 * 60 * 60)))
+# Entradas vencidas ainda servem para GET condicional e para o health_gate, mas
+# sem acesso há mais de CACHE_MAX_AGE são apagadas; acima de CACHE_MAX_BYTES saem as mais antigas
+CACHE_MAX_AGE = float(os.getenv("SCRAPER_CACHE_MAX_AGE", str(14 * 24 * 60 * 60)))
+CACHE_MAX_BYTES = int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# A limpeza roda ao abrir o cache e de novo a cada tantas gravações
+CACHE_PRUNE_EVERY = int(os.getenv("SCRAPER_CACHE_PRUNE_EVERY", "500"))
+# Intervalo mínimo (s) entre requisições ao mesmo host, para não sobrecarregar os sites dos VCs
+MIN_HOST_INTERVAL = float(os.getenv("SCRAPER_MIN_HOST_INTERVAL", "1.0"))
+
+
+@dataclass
+class FetchResponse:
+    """Resposta de uma busca, vinda da rede ou do cache em disco"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class ResponseCache:
+    """Cache em disco: <sha256>.json com metadados e <sha256>.body com o corpo
+
+    O diretório é podado por idade e tamanho total ao abrir e a cada
+    prune_every gravações (ver prune()).
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: float = CACHE_TTL,
+                 max_age: float = CACHE_MAX_AGE, max_bytes: int = CACHE_MAX_BYTES,
+                 prune_every: int = CACHE_PRUNE_EVERY):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._writes = 0
+        self._prune_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def prune(self) -> int:
+        """Apaga entradas sem uso há mais de max_age e, acima de max_bytes, as mais antigas
+
+        A idade é a do arquivo de metadados, regravado a cada put/touch.
+        Devolve quantas entradas foram removidas.
+        """
+        with self._prune_lock:
+            entries = {}
+            now = time.time()
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if not item.is_file():
+                        continue
+                    try:
+                        stat = item.stat()
+                    except OSError:
+                        continue
+                    if item.name.endswith(".tmp"):
+                        # Sobra de uma gravação interrompida
+                        if now - stat.st_mtime > 60 * 60:
+                            self._remove(item.path)
+                        continue
+                    key, _, ext = item.name.partition(".")
+                    entry = entries.setdefault(key, {"size": 0, "mtime": None})
+                    entry["size"] += stat.st_size
+                    if ext == "json":
+                        entry["mtime"] = stat.st_mtime
+
+            # Corpos sem metadados (gravação interrompida) contam como os mais antigos
+            ordered = sorted(entries.items(), key=lambda item: item[1]["mtime"] or 0.0)
+            total = sum(entry["size"] for _, entry in ordered)
+            removed = 0
+            for key, entry in ordered:
+                expired = entry["mtime"] is None or now - entry["mtime"] > self.max_age
+                if not expired and total <= self.max_bytes:
+                    break
+                base = os.path.join(self.directory, key)
+                self._remove(base + ".json")
+                self._remove(base + ".body")
+                total -= entry["size"]
+                removed += 1
+            if removed:
+                get_metrics().incr("http.cache_pruned", removed)
+            return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def get(self, url: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def is_fresh(self, meta: dict) -> bool:
+        return time.time() - meta.get("stored_at", 0) < self.ttl
+
+    def put(self, url: str, status_code: int, headers: dict, body: bytes):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "status_code": status_code,
+            "headers": headers,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+        self._writes += 1
+        if self.prune_every > 0 and self._writes % self.prune_every == 0:
+            self.prune()
+
+    def touch(self, url: str, meta: dict):
+        """Renova o TTL de uma entrada revalidada com 304"""
+        meta = dict(meta, stored_at=time.time())
+        self._write(self._paths(url)[0], json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def health_gate(health: HostHealth, url: str, cached: tuple[dict, bytes] | None,
+                hold: bool = True) -> FetchResponse | None:
+    """Resposta sem ir à rede para URLs com falha recente ou hosts com circuito aberto
+
+    Com uma cópia (mesmo vencida) em cache, serve a cópia; sem ela, repete a
+    falha: o mesmo status HTTP ou HostUnavailable. hold segue para o
+    HostHealth.check (esperar ou não a requisição de teste do meio-aberto).
+    """
+    negative = health.negative(url)
+    try:
+        if negative is not None:
+            status_code, error = negative
+            if status_code is None:
+                raise HostUnavailable(f"{url} falhou recentemente: {error}")
+            if not cached:
+                return FetchResponse(url, status_code, b"", {}, from_cache=True)
+        else:
+            health.check(url, hold=hold)
+            return None
+    except HostUnavailable:
+        if not cached:
+            raise
+    meta, body = cached
+    return FetchResponse(url, meta["status_code"], body, meta.get("headers", {}), from_cache=True)
+
+
+class FetchClient:
+    """Cliente HTTP compartilhado pelas ferramentas de scraping
+
+    Usa uma única requests.Session com pool de conexões, limita conexões
+    simultâneas por host e revalida o cache com ETag/Last-Modified. Hosts
+    que falham repetidamente são pulados pelo circuito do HostHealth.
+    """
+
+    def __init__(self, cache: ResponseCache | None = None, pool_maxsize: int = 20,
+                 per_host_limit: int = 4, timeout: float = 10,
+                 min_host_interval: float = MIN_HOST_INTERVAL,
+                 health: HostHealth | None = None):
+        self.cache = cache or ResponseCache()
+        self.health = health or get_health()
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.min_host_interval = min_host_interval
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self._next_request_at: dict[str, float] = {}
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._slots_lock:
+            return self._host_slots[host]
+
+    def _wait_turn(self, url: str):
+        """Espaça as requisições a um mesmo host em pelo menos min_host_interval"""
+        if self.min_host_interval <= 0:
+            return
+        host = urlparse(url).netloc.lower()
+        with self._slots_lock:
+            now = time.monotonic()
+            turn = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = turn + self.min_host_interval
+        if turn > now:
+            time.sleep(turn - now)
+
+    def get(self, url: str, timeout: float | None = None, revalidate: bool = False) -> FetchResponse:
+        """GET com cache; revalidate=True ignora o TTL e sempre faz o GET condicional"""
+        cached = self.cache.get(url)
+        if cached and not revalidate and self.cache.is_fresh(cached[0]):
+            meta, body = cached
+            get_metrics().incr("http.cache_hit")
+            return FetchResponse(url, meta["status_code"], body, meta.get("headers", {}), from_cache=True)
+
+        gated = health_gate(self.health, url, cached)
+        if gated is not None:
+            get_metrics().incr("http.health_skip")
+            return gated
+
+        headers = {}
+        if cached:
+            meta = cached[0]
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            with self._slot(url), get_metrics().span("http.fetch"):
+                self._wait_turn(url)
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+        except requests.RequestException as e:
+            self.health.record(url, error=f"{type(e).__name__}: {e}")
+            raise
+        self.health.record(url, response.status_code)
+
+        if response.status_code == 304 and cached:
+            meta, body = cached
+            self.cache.touch(url, meta)
+            return FetchResponse(url, meta["status_code"], body, meta.get("headers", {}), from_cache=True)
+
+        result = FetchResponse(url, response.status_code, response.content, dict(response.headers))
+        if response.status_code == 200:
+            self.cache.put(url, response.status_code, result.headers, result.content)
+        return result
+
+
+_client: FetchClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FetchClient:
+    """Retorna o FetchClient do processo, criado na primeira chamada"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FetchClient()
+        return _client
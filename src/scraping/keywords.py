@@ -0,0 +1,48 @@
+import re
+
+TECH_KEYWORDS = [
+    'ai', 'artificial intelligence', 'machine learning', 'ml', 'deep learning',
+    'computer vision', 'nlp', 'robotics', 'automation', 'saas', 'fintech',
+    'healthtech', 'edtech', 'blockchain', 'iot', 'cloud'
+]
+
+FUNDING_KEYWORDS = ['seed', 'series a', 'series b', 'series c', 'pre-seed', 'ipo']
+
+PORTFOLIO_KEYWORDS = [
+    'portfolio', 'portfólio', 'portafolio', 'companies', 'empresas',
+    'investments', 'inversiones', 'startups', 'portfolio companies',
+    'our companies', 'nossas empresas', 'nuestras empresas'
+]
+
+
+class KeywordMatcher:
+    """Encontra várias palavras-chave num texto com uma única regex compilada
+
+    Cada palavra vira um grupo nomeado de uma alternância (as mais longas
+    primeiro), limitada por fronteiras de palavra: 'ai' não casa com 'email'
+    e 'pre-seed' não conta também como 'seed'.
+    """
+
+    def __init__(self, keywords: list[str], allow_plural: bool = False):
+        self.keywords = list(keywords)
+        suffix = r"s?" if allow_plural else ""
+        alternatives = []
+        for i in sorted(range(len(self.keywords)), key=lambda i: -len(self.keywords[i])):
+            body = r"\s+".join(re.escape(part) for part in self.keywords[i].split())
+            alternatives.append(f"(?P<k{i}>{body}{suffix})")
+        self.regex = re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)", re.I)
+
+    def find_all(self, text: str) -> list[str]:
+        """Palavras encontradas, sem repetição, na ordem da lista original"""
+        if not text:
+            return []
+        found = {int(m.lastgroup[1:]) for m in self.regex.finditer(text)}
+        return [self.keywords[i] for i in sorted(found)]
+
+    def search(self, text: str) -> bool:
+        return bool(text) and self.regex.search(text) is not None
+
+
+TECH_MATCHER = KeywordMatcher(TECH_KEYWORDS)
+FUNDING_MATCHER = KeywordMatcher(FUNDING_KEYWORDS)
+PORTFOLIO_MATCHER = KeywordMatcher(PORTFOLIO_KEYWORDS, allow_plural=True)
@@ -0,0 +1,50 @@
+import threading
+
+from instrumentation import get_metrics
+
+
+class MultiSink:
+    """Repassa as gravações do pipeline para vários destinos (Sheets, banco, ...)"""
+
+    def __init__(self, sinks: dict):
+        if not sinks:
+            raise ValueError("Nenhum destino configurado para o pipeline")
+        self.sinks = sinks
+        # Os destinos não são thread-safe; execuções concorrentes gravam uma de cada vez
+        self._lock = threading.Lock()
+
+    def save_investors(self, investors, worksheet_name: str = "Investors") -> dict:
+        with self._lock:
+            return {name: self._timed(name, "save_investors", sink.save_investors,
+                                      investors, worksheet_name=worksheet_name)
+                    for name, sink in self.sinks.items()}
+
+    def save_startups(self, startups, vc_name: str, worksheet_name: str = "Startups") -> dict:
+        with self._lock:
+            return {name: self._timed(name, "save_startups", sink.save_startups,
+                                      startups, vc_name=vc_name, worksheet_name=worksheet_name)
+                    for name, sink in self.sinks.items()}
+
+    def flush(self):
+        with self._lock:
+            for name, sink in self.sinks.items():
+                self._timed(name, "flush", sink.flush)
+
+    def close(self):
+        """Grava o que estiver pendente e libera os destinos (ex.: timers de flush do Sheets)"""
+        with self._lock:
+            for name, sink in self.sinks.items():
+                self._timed(name, "close", getattr(sink, "close", sink.flush))
+
+    @staticmethod
+    def _timed(name: str, operation: str, method, *args, **kwargs):
+        with get_metrics().span(f"sink.{name}.{operation}"):
+            return method(*args, **kwargs)
+
+
+def format_summary(summary: dict) -> str:
+    """Resumo por destino, ex.: 'sheets: inserted=3, updated=0, skipped=1 | db: upserted=4'"""
+    return " | ".join(
+        f"{name}: " + ", ".join(f"{key}={value}" for key, value in counts.items())
+        for name, counts in summary.items()
+    )
@@ -0,0 +1,128 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+FAKE_INDICATORS = [
+    # Nomes de empresas falsas comuns
+    "startup alpha", "startup beta", "company alpha", "company beta",
+    "startup a", "startup b", "company a", "company b",
+    "example corp", "test company", "demo startup", "sample company",
+    "fictional corp", "placeholder inc", "template ltd",
+    "empresa alfa", "empresa beta", "startup exemplo", "companhia teste",
+
+    # Websites falsos comuns
+    "example.com", "test.com", "alpha.startup", "beta.startup",
+    "demo.com", "sample.com", "placeholder.com", "template.com",
+    "fictional.com", "fake.com", "exemplo.com", "teste.com"
+]
+
+GENERIC_PATTERNS = ["startup", "company", "corp", "inc", "ltd", "empresa"]
+
+# Busca por substring (mesma semântica de `fake in texto`), compilada uma vez
+FAKE_RE = re.compile("|".join(re.escape(fake) for fake in FAKE_INDICATORS))
+GENERIC_RE = re.compile("|".join(re.escape(pattern) for pattern in GENERIC_PATTERNS))
+
+REASON_FAKE = "dados falsos"
+REASON_GENERIC = "muito genérico"
+REASON_NO_INFO = "informação insuficiente"
+REASON_BAD_NAME = "nome inválido"
+REASON_DUPLICATE = "duplicada"
+
+
+@dataclass
+class Rejection:
+    startup: dict
+    reason: str
+    # Para duplicadas: o registro aceito anteriormente com a mesma chave
+    duplicate_of: dict | None = None
+
+
+@dataclass
+class ValidationResult:
+    accepted: list[dict] = field(default_factory=list)
+    rejected: list[Rejection] = field(default_factory=list)
+
+    def reasons(self) -> Counter:
+        return Counter(rejection.reason for rejection in self.rejected)
+
+
+def normalize_name(name: str) -> str:
+    """Minúsculas, sem acentos e só com letras/dígitos separados por espaço"""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def normalize_domain(website: str | None) -> str:
+    """Domínio do site sem esquema, 'www.' e caminho"""
+    if not website:
+        return ""
+    website = website.strip().lower()
+    if "://" not in website:
+        website = "//" + website
+    host = urlparse(website).netloc.split("@")[-1].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def startup_key(startup: dict) -> tuple[str, str]:
+    return normalize_name(startup.get("name") or ""), normalize_domain(startup.get("website"))
+
+
+def rejection_reason(startup: dict) -> str | None:
+    """Motivo da rejeição de uma startup, ou None se ela parece real"""
+    raw_name = startup.get("name") or ""
+    name = raw_name.lower()
+
+    # Um único search cobre nome, site e descrição (separados por quebra de linha)
+    haystack = "\n".join((name, (startup.get("website") or "").lower(),
+                          (startup.get("description") or "").lower()))
+    if FAKE_RE.search(haystack):
+        return REASON_FAKE
+
+    if len(name.split()) <= 2 and GENERIC_RE.search(name):
+        return REASON_GENERIC
+
+    if not (len(raw_name) > 2 and (startup.get("website") or startup.get("description"))):
+        return REASON_NO_INFO
+
+    if not 2 <= len(raw_name) <= 100:
+        return REASON_BAD_NAME
+
+    return None
+
+
+class StartupValidator:
+    """Descarta startups que parecem alucinações e repetições exatas (nome + domínio)
+
+    As repetições são as da mesma instância: o pipeline usa uma por lote, e a
+    junção da mesma startup vista por investidores diferentes fica com o
+    EntityResolver (pipeline/resolution.py).
+    """
+
+    def __init__(self):
+        self._seen: dict[tuple[str, str], dict] = {}
+
+    def validate(self, startups: list[dict]) -> ValidationResult:
+        result = ValidationResult()
+        for startup in startups:
+            reason = rejection_reason(startup)
+            if reason:
+                result.rejected.append(Rejection(startup, reason))
+                continue
+
+            key = startup_key(startup)
+            canonical = self._seen.get(key)
+            if canonical is not None:
+                result.rejected.append(Rejection(startup, REASON_DUPLICATE, duplicate_of=canonical))
+                continue
+
+            self._seen[key] = startup
+            result.accepted.append(startup)
+        return result
+
+
+def validate_startup_data(startups, validator=None):
+    """Valida se os dados das startups não são alucinações (o resumo fica com quem chama)"""
+    return (validator or StartupValidator()).validate(startups)
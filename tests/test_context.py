@@ -0,0 +1,65 @@
+import pytest
+
+from llms.context import count_tokens, fit_prompt
+
+
+def words(count: int, word: str = "startup") -> str:
+    return " ".join([word] * count)
+
+
+def test_prompt_within_budget_is_untouched():
+    messages = [{"role": "system", "content": "Você é um analista"}, {"role": "user", "content": words(50)}]
+    fitted, before, after = fit_prompt(messages, budget=1000)
+    assert fitted is messages
+    assert before == after
+
+
+def test_largest_messages_are_cut_to_fit_and_system_is_kept():
+    system = words(300, "regra")
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": "Extraia as startups do portfolio"},
+        {"role": "assistant", "content": "Observation: " + words(3000) + " FIM"},
+    ]
+    fitted, before, after = fit_prompt(messages, budget=1000)
+
+    assert before > 1000 >= after
+    assert after == sum(count_tokens(message["content"]) for message in fitted)
+    assert fitted[0]["content"] == system
+    assert fitted[1] == messages[1]
+    # Começo e fim da saída da ferramenta ficam, o meio sai
+    assert fitted[2]["content"].startswith("Observation:")
+    assert fitted[2]["content"].endswith("FIM")
+    assert "omitidos" in fitted[2]["content"]
+    # As mensagens originais não mudam
+    assert messages[2]["content"].count("startup") == 3000
+
+
+def test_string_prompt_is_cut():
+    fitted, before, after = fit_prompt(words(5000), budget=500)
+    assert before > 500
+    assert after < before
+
+
+def test_zero_budget_disables_trimming():
+    messages = [{"role": "user", "content": words(5000)}]
+    assert fit_prompt(messages, budget=0)[0] is messages
+
+
+def test_budgeted_llm_trims_before_calling(monkeypatch):
+    pytest.importorskip("crewai")
+    from crewai.llms.base_llm import BaseLLM
+
+    from llms.factory import BudgetedLLM
+
+    class EchoLLM(BaseLLM):
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+            self.received = messages
+            return "ok"
+
+    inner = EchoLLM(model="fake/echo")
+    llm = BudgetedLLM(inner, budget=500)
+    llm.stop = ["\nObservation:"]
+    assert llm.call([{"role": "user", "content": words(5000)}]) == "ok"
+    assert count_tokens(inner.received[0]["content"]) <= 500
+    assert inner.stop == ["\nObservation:"]
@@ -0,0 +1,115 @@
+import os
+from urllib.parse import urlsplit
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("requests")
+
+from scraping.crawler import PortfolioCrawler  # noqa: E402
+from scraping.http import FetchResponse  # noqa: E402
+
+SITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures", "site")
+BASE_URL = "http://fixtures.test/"
+
+
+class FixtureClient:
+    """Serve benchmarks/fixtures/site como o servidor do bench_pipeline (portfolio?page=2 -> portfolio__page=2.html)"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, timeout=None, revalidate=False):
+        self.requests.append((url, revalidate))
+        parts = urlsplit(url)
+        rel = parts.path.strip("/")
+        names = ([f"{rel}__{parts.query.replace('&', '__')}"] if parts.query else []) + [rel]
+        for name in names:
+            for candidate in (name, f"{name}.html", os.path.join(name, "index.html")):
+                path = os.path.join(SITE, candidate)
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        body = f.read()
+                    content_type = "application/json" if path.endswith(".json") else "text/html; charset=utf-8"
+                    return FetchResponse(url, 200, body, {"Content-Type": content_type})
+        return FetchResponse(url, 404, b"")
+
+
+def crawl(path: str, **kwargs):
+    client = FixtureClient()
+    return PortfolioCrawler(client=client, max_workers=1, **kwargs).crawl(BASE_URL + path), client
+
+
+@pytest.mark.parametrize("path, fetched, pages, payloads", [
+    # Paginação ?page=1 (repete a inicial), ?page=2, ?page=3
+    ("andes-ventures/portfolio", 4, 4, 0),
+    # Botão "carregar mais" com endpoint JSON (sem HTML embutido)
+    ("pampa-capital/empresas", 2, 1, 1),
+    # Filtros por setor
+    ("selva-partners/investments", 4, 4, 0),
+    # Texto corrido, sem links para mais páginas
+    ("mar-azul/portafolio", 1, 1, 0),
+])
+def test_crawl_fixture_pages(path, fetched, pages, payloads):
+    result, _ = crawl(path)
+    assert result.status_code == 200
+    assert result.fetched == fetched
+    assert len(result.pages) == pages
+    assert len(result.json_payloads) == payloads
+
+
+def test_crawl_missing_portfolio_raises():
+    with pytest.raises(Exception):
+        crawl("cerrado-vc/portfolio")
+
+
+def test_crawl_respects_page_budget():
+    result, _ = crawl("selva-partners/investments", max_pages=2)
+    assert result.fetched == 2
+    result, _ = crawl("andes-ventures/portfolio", max_depth=0)
+    assert result.fetched == 1
+
+
+def test_revalidate_reaches_every_page():
+    _, client = crawl("andes-ventures/portfolio", revalidate=True)
+    assert len(client.requests) == 4
+    assert all(revalidate for _, revalidate in client.requests)
+
+
+def test_content_hash_covers_every_crawled_page(tmp_path, monkeypatch):
+    before, _ = crawl("andes-ventures/portfolio")
+    again, _ = crawl("andes-ventures/portfolio")
+    assert before.content_hash == again.content_hash
+
+    # Só a última página muda: o hash do portfolio muda junto
+    original = FixtureClient.get
+
+    def changed(self, url, timeout=None, revalidate=False):
+        response = original(self, url, timeout, revalidate)
+        if url.endswith("page=3"):
+            response.content = response.content.replace(b"</main>", b"<div>Nova startup</div></main>")
+        return response
+
+    monkeypatch.setattr(FixtureClient, "get", changed)
+    after, _ = crawl("andes-ventures/portfolio")
+    assert after.content_hash != before.content_hash
+
+
+@pytest.mark.parametrize("path, companies", [
+    # 3 páginas com 24 cards cada (?page=1 repete a primeira)
+    ("andes-ventures/portfolio", 72),
+    # 15 na lista HTML + 20 no endpoint JSON
+    ("pampa-capital/empresas", 35),
+    # Página inicial com 5 destaques que também aparecem nos filtros
+    ("selva-partners/investments", 30),
+    # Só padrões de texto
+    ("mar-azul/portafolio", 8),
+])
+def test_extract_fixture_companies(path, companies, monkeypatch):
+    monkeypatch.setenv("PERPLEXITY_API_KEY", os.getenv("PERPLEXITY_API_KEY", "offline-test"))
+    pytest.importorskip("crewai")
+    from StartupCrew.crew import extract_portfolio
+
+    extraction = extract_portfolio(BASE_URL + path, crawler=PortfolioCrawler(client=FixtureClient(), max_workers=1))
+    assert len(extraction.companies) == companies
+    assert len({company["name"].lower() for company in extraction.companies}) == companies
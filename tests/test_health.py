@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from scraping.health import HostHealth, HostInTrial, HostUnavailable  # noqa: E402
+
+URL = "https://vc.test/portfolio"
+
+
+@pytest.fixture
+def health(tmp_path):
+    health = HostHealth(str(tmp_path / "health.sqlite3"), threshold=2, cooldown=0.05, trial_timeout=5)
+    health.record(URL, 503)
+    health.record(URL, 503)
+    return health
+
+
+def test_open_circuit_fails_fast(health):
+    with pytest.raises(HostUnavailable):
+        health.check(URL)
+
+
+def test_half_open_admits_a_single_trial(health):
+    time.sleep(0.06)
+    health.check(URL)
+    with pytest.raises(HostInTrial):
+        health.check(URL, hold=False)
+
+
+def run_waiters(health, count):
+    results = []
+
+    def wait():
+        try:
+            health.check(URL)
+            results.append("ok")
+        except HostUnavailable:
+            results.append("unavailable")
+
+    threads = [threading.Thread(target=wait) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_waiters_proceed_after_successful_trial(health):
+    time.sleep(0.06)
+    health.check(URL)
+    threads, results = run_waiters(health, 3)
+    time.sleep(0.05)
+    assert results == []
+
+    health.record(URL, 200)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == ["ok"] * 3
+
+
+def test_waiters_fail_when_trial_reopens_the_circuit(health):
+    time.sleep(0.06)
+    health.check(URL)
+    threads, results = run_waiters(health, 3)
+    time.sleep(0.05)
+
+    health.record(URL, 503)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == ["unavailable"] * 3
+
+
+def test_abandoned_trial_is_replaced_after_timeout(tmp_path):
+    health = HostHealth(str(tmp_path / "health.sqlite3"), threshold=1, cooldown=0.01, trial_timeout=0.05)
+    health.record(URL, 503)
+    time.sleep(0.02)
+    health.check(URL)
+    start = time.monotonic()
+    # Sem resultado do teste, o próximo vira o novo teste depois do prazo
+    health.check(URL)
+    assert 0.02 <= time.monotonic() - start < 1
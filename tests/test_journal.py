@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from pipeline.journal import STATUS_DONE, STATUS_FAILED, RunJournal
+
+
+def test_empty_extraction_is_not_reused(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id, _ = journal.start_run("AI")
+    journal.record_portfolio(run_id, "https://a.vc/portfolio", "A", STATUS_DONE, [], "hash-a")
+    journal.record_portfolio(run_id, "https://b.vc/portfolio", "B", STATUS_FAILED, [], "hash-b")
+
+    assert journal.last_extraction("https://a.vc/portfolio") is None
+    assert journal.last_extraction("https://b.vc/portfolio") is None
+    assert journal.completed_portfolios(run_id) == {}
+
+
+def test_extraction_with_startups_is_reused(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id, _ = journal.start_run("AI")
+    startups = [{"name": "Loft", "website": "https://loft.com.br"}]
+    journal.record_portfolio(run_id, "https://a.vc/portfolio", "A", STATUS_DONE, startups, "hash-a")
+
+    assert journal.last_extraction("https://a.vc/portfolio") == ("hash-a", startups)
+    assert journal.completed_portfolios(run_id) == {"https://a.vc/portfolio": startups}
+
+    # Uma nova extração vazia não substitui a anterior
+    journal.record_portfolio(run_id, "https://a.vc/portfolio", "A", STATUS_FAILED, [], "hash-b")
+    assert journal.last_extraction("https://a.vc/portfolio") == ("hash-a", startups)
+
+
+def test_interrupted_run_is_marked_failed_and_not_resumed(tmp_path, monkeypatch):
+    pytest.importorskip("crewai")
+    pytest.importorskip("gspread")
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "offline-test")
+    from pipeline.research import ResearchPipeline
+
+    class FailingCrew:
+        def kickoff(self, inputs):
+            raise RuntimeError("LLM fora do ar")
+
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    pipeline = ResearchPipeline.__new__(ResearchPipeline)
+    pipeline.journal = journal
+    pipeline.investor_crew = FailingCrew()
+    pipeline._investor_lock = threading.Lock()
+    pipeline.run("AI", resume=True)
+
+    status = journal._conn.execute("SELECT status FROM runs").fetchall()
+    assert status == [(STATUS_FAILED,)]
+    # A próxima execução com resume começa do zero em vez de retomar a que falhou
+    run_id, investors = journal.start_run("AI", resume=True)
+    assert (run_id, investors) == (2, None)
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from db.models import Startup  # noqa: E402
+from db.repository import StartupRepository  # noqa: E402
+from db.session import create_db_engine, init_db  # noqa: E402
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    init_db(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def test_upsert_keeps_existing_values_when_new_ones_are_missing(session):
+    repo = StartupRepository(session)
+    repo.bulk_upsert([{"name": "Loft", "website": "loft.com.br", "sector": "PropTech",
+                       "country": "BR", "founded_year": 2018}])
+    repo.bulk_upsert([{"name": "Loft", "website": "loft.com.br", "sector": None,
+                       "country": "Brasil", "founded_year": None}])
+
+    startup = session.query(Startup).one()
+    assert (startup.sector, startup.country, startup.founded_year) == ("PropTech", "Brasil", 2018)
+
+
+def test_sink_fills_the_ai_nvidia_flags_used_by_the_query(session):
+    from db.queries import ai_nvidia_startups
+    from db.sink import DatabaseSink
+
+    sink = DatabaseSink.__new__(DatabaseSink)
+    sink.session_factory = sessionmaker(bind=session.get_bind())
+    sink.save_startups([
+        {"name": "Visio", "website": "https://visio.ai", "sector": "AI",
+         "description": "Visão computacional em GPUs NVIDIA Jetson"},
+        {"name": "Loft", "website": "https://loft.com.br", "sector": "PropTech", "description": "Imóveis"},
+    ], vc_name="Andes")
+
+    assert [startup.name for startup in ai_nvidia_startups(session).items] == ["Visio"]
+    loft = session.query(Startup).filter_by(name="Loft").one()
+    assert (loft.ai_or_accelerated_computing, loft.nvidia_stack_alignment) == (False, False)
+
+
+def test_sink_keys_startups_on_the_normalized_domain(session):
+    from db.sink import DatabaseSink
+
+    sink = DatabaseSink.__new__(DatabaseSink)
+    sink.session_factory = sessionmaker(bind=session.get_bind())
+    sink.save_startups([{"name": "Loft", "website": "https://www.loft.com.br/", "sector": "PropTech"}], "Andes")
+    sink.save_startups([{"name": "Loft", "website": "http://loft.com.br", "country": "BR"}], "Andes")
+
+    startup = session.query(Startup).one()
+    assert (startup.website, startup.sector, startup.country) == ("loft.com.br", "PropTech", "BR")
@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from scraping.http import ResponseCache  # noqa: E402
+
+
+def age(cache: ResponseCache, url: str, seconds: float):
+    then = time.time() - seconds
+    for path in cache._paths(url):
+        os.utime(path, (then, then))
+
+
+def test_prune_on_open_drops_entries_past_max_age(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60, max_age=3600)
+    cache.put("https://a.vc/", 200, {}, b"a")
+    cache.put("https://b.vc/", 200, {}, b"b")
+    age(cache, "https://a.vc/", 7200)
+
+    reopened = ResponseCache(str(tmp_path), ttl=60, max_age=3600)
+    assert reopened.get("https://a.vc/") is None
+    assert reopened.get("https://b.vc/")[1] == b"b"
+
+
+def test_prune_keeps_total_size_under_max_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60, max_age=3600, max_bytes=10_000, prune_every=0)
+    for number in range(5):
+        cache.put(f"https://{number}.vc/", 200, {}, b"x" * 3000)
+        age(cache, f"https://{number}.vc/", 100 - number)
+
+    assert cache.prune() == 2
+    assert [cache.get(f"https://{number}.vc/") is not None for number in range(5)] == [False, False, True, True, True]
+
+
+def test_prune_removes_orphan_bodies(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    meta_path, body_path = cache._paths("https://a.vc/")
+    with open(body_path, "wb") as f:
+        f.write(b"a")
+    assert cache.prune() == 1
+    assert not os.path.exists(body_path)
@@ -0,0 +1,213 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai.llms.base_llm import BaseLLM  # noqa: E402
+from crewai.types.usage_metrics import UsageMetrics  # noqa: E402
+
+import llms.router as router_module  # noqa: E402
+from llms.router import LLMRouter, Provider, RoutedLLM  # noqa: E402
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+class FakeLLM(BaseLLM):
+    """Responde com o nome do provedor ou levanta o próximo erro da fila"""
+
+    def __init__(self, name: str, errors: list, tokens: int = 10):
+        super().__init__(model=f"fake/{name}")
+        self.name = name
+        self.errors = errors
+        self.tokens = tokens
+        self.calls = 0
+        self.served = 0
+        self.seen_stop = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        self.calls += 1
+        self.seen_stop.append(list(self.stop))
+        if self.errors:
+            raise self.errors.pop(0)
+        self.served += 1
+        return self.name
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        return UsageMetrics(total_tokens=self.served * self.tokens, prompt_tokens=self.served * self.tokens,
+                            successful_requests=self.served)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    """Provedores alpha, beta e gamma com chave; cada chamada a build_llm cria um FakeLLM"""
+    errors = {"alpha": [], "beta": [], "gamma": []}
+    built = []
+    for name in errors:
+        monkeypatch.setenv(f"{name.upper()}_API_KEY", "test")
+
+    def build_llm(provider):
+        llm = FakeLLM(provider.name, errors[provider.name])
+        built.append(llm)
+        return llm
+
+    monkeypatch.setattr(Provider, "build_llm", build_llm)
+    clock = FakeClock()
+    monkeypatch.setattr(router_module, "time", clock)
+    return errors, built, clock
+
+
+def test_unmeasured_providers_follow_role_order(fakes):
+    router = LLMRouter()
+    llm = RoutedLLM("json", ["alpha", "beta"], router=router)
+    assert llm.call("oi") == "alpha"
+    router.provider("alpha").latency = 2.0
+    # Um provedor nunca chamado não passa à frente do preferido já medido
+    assert llm.call("oi") == "alpha"
+    assert router.provider("beta").latency is None
+
+
+def test_failover_on_429_and_5xx(fakes):
+    errors, _, _ = fakes
+    errors["alpha"].append(APIError(429, {"Retry-After": "7"}))
+    errors["beta"].append(APIError(503))
+    router = LLMRouter()
+    llm = RoutedLLM("json", ["alpha", "beta", "gamma"], router=router)
+
+    assert llm.call("oi") == "gamma"
+    assert router.provider("alpha").cooldown_until == pytest.approx(1007.0)
+    assert router.provider("beta").cooldown_until == pytest.approx(1000.0 + router_module.ERROR_COOLDOWN)
+    # Com os dois em pausa, a próxima chamada vai direto para o gamma
+    assert llm.call("oi") == "gamma"
+
+
+def test_non_retryable_error_is_raised(fakes):
+    errors, _, _ = fakes
+    errors["alpha"].append(APIError(400))
+    llm = RoutedLLM("json", ["alpha", "beta"], router=LLMRouter())
+    with pytest.raises(APIError):
+        llm.call("oi")
+
+
+def test_all_providers_failing_raises_last_error(fakes):
+    errors, _, _ = fakes
+    errors["alpha"].append(APIError(500))
+    errors["beta"].append(APIError(502))
+    llm = RoutedLLM("json", ["alpha", "beta"], router=LLMRouter())
+    with pytest.raises(APIError) as raised:
+        llm.call("oi")
+    assert raised.value.status_code == 502
+
+
+def test_waits_for_budget_when_every_provider_is_exhausted(fakes, monkeypatch):
+    _, _, clock = fakes
+    monkeypatch.setenv("LLM_ALPHA_RPM", "1")
+    llm = RoutedLLM("json", ["alpha"], router=LLMRouter())
+
+    assert llm.call("oi") == "alpha"
+    clock.now += 10
+    assert llm.call("oi") == "alpha"
+    # A primeira reserva sai da janela de 60 s 50 s depois
+    assert clock.sleeps == [pytest.approx(50.0)]
+
+
+def test_gives_up_after_max_budget_wait(fakes, monkeypatch):
+    _, _, clock = fakes
+    monkeypatch.setenv("LLM_ALPHA_RPM", "1")
+    monkeypatch.setattr(router_module, "MAX_BUDGET_WAIT", 20.0)
+    llm = RoutedLLM("json", ["alpha"], router=LLMRouter())
+
+    llm.call("oi")
+    with pytest.raises(RuntimeError):
+        llm.call("oi")
+    assert sum(clock.sleeps) == pytest.approx(20.0)
+
+
+def test_stop_words_stay_with_each_role(fakes):
+    _, built, _ = fakes
+    router = LLMRouter()
+    research = RoutedLLM("research", ["alpha"], router=router)
+    json_llm = RoutedLLM("json", ["alpha"], router=router)
+    research.stop = ["\nObservation:"]
+    json_llm.stop = []
+
+    research.call("oi")
+    json_llm.call("oi")
+    research.call("oi")
+    assert len(built) == 2
+    assert built[0].seen_stop == [["\nObservation:"], ["\nObservation:"]]
+    assert built[1].seen_stop == [[]]
+
+
+def test_token_usage_sums_the_providers_that_served(fakes):
+    errors, _, _ = fakes
+    errors["alpha"].append(APIError(429))
+    llm = RoutedLLM("json", ["alpha", "beta"], router=LLMRouter())
+    llm.call("oi")
+    llm.call("oi")
+
+    usage = llm.get_token_usage_summary()
+    # alpha falhou com 429 e ficou em pausa; beta atendeu as duas
+    assert usage.successful_requests == 2
+    assert usage.total_tokens == 20
+
+
+def test_usage_is_recorded_once_per_call_across_kickoffs(fakes, monkeypatch):
+    from crewai import Agent, Crew, Task
+
+    import instrumentation
+
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    metrics = instrumentation.Metrics(enabled=True)
+    monkeypatch.setattr(instrumentation, "_metrics", metrics)
+    built = []
+
+    class AnsweringLLM(FakeLLM):
+        def call(self, messages, **kwargs):
+            super().call(messages, **kwargs)
+            return "Thought: pronto\nFinal Answer: ok"
+
+        def supports_function_calling(self):
+            return False
+
+    def build_llm(provider):
+        built.append(AnsweringLLM(provider.name, []))
+        return built[-1]
+
+    monkeypatch.setattr(Provider, "build_llm", build_llm)
+    llm = RoutedLLM("json", ["alpha"], router=LLMRouter())
+
+    def crew():
+        # Dois agentes com o mesmo LLM, como no InvestorCrew
+        agents = [Agent(role=f"a{i}", goal="g", backstory="b", llm=llm) for i in range(2)]
+        tasks = [Task(description=f"t{i}", expected_output="ok", agent=agent) for i, agent in enumerate(agents)]
+        return Crew(agents=agents, tasks=tasks)
+
+    crew().kickoff()
+    crew().kickoff()
+
+    calls = sum(fake.served for fake in built)
+    counters = metrics.snapshot()["counters"]
+    assert calls == 4
+    assert counters["llm.requests"] == calls
+    assert counters["llm.prompt_tokens"] == calls * 10
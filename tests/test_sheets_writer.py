@@ -0,0 +1,211 @@
+import re
+import time
+
+import pytest
+
+gspread = pytest.importorskip("gspread")
+pytest.importorskip("oauth2client")
+
+from SheetsCrew.crew import INVESTOR_HEADER, SheetsCrew  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.text = "error"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "Invalid range", "status": "INVALID_ARGUMENT"}}
+
+
+class FakeWorksheet:
+    def __init__(self, title: str):
+        self.title = title
+        self.rows: list[list] = []
+        self.append_calls = 0
+        self.fail_next_append: Exception | None = None
+        self.fail_next_update: Exception | None = None
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+    def row_values(self, number: int):
+        return list(self.rows[number - 1]) if len(self.rows) >= number else []
+
+    def append_row(self, row, value_input_option=None):
+        self.rows.append(list(row))
+
+    def append_rows(self, rows, value_input_option=None, table_range=None):
+        self.append_calls += 1
+        if self.fail_next_append is not None:
+            error, self.fail_next_append = self.fail_next_append, None
+            raise error
+        self.rows.extend(list(row) for row in rows)
+
+    def batch_update(self, data, value_input_option=None):
+        if self.fail_next_update is not None:
+            error, self.fail_next_update = self.fail_next_update, None
+            raise error
+        for item in data:
+            row_number = int(re.match(r"[A-Z]+(\d+)", item["range"]).group(1))
+            self.rows[row_number - 1] = list(item["values"][0])
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.sheets: dict[str, FakeWorksheet] = {}
+
+    def worksheet(self, title: str):
+        if title not in self.sheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title: str, rows: int, cols: int):
+        self.sheets[title] = FakeWorksheet(title)
+        return self.sheets[title]
+
+
+def investor(name: str, focus: str = "AI") -> dict:
+    return {"name": name, "type": "VC", "website": f"https://{name.lower()}.vc", "hq_country": "BR",
+            "focus": focus, "portfolio_url": ""}
+
+
+def make_crew(**kwargs) -> tuple[SheetsCrew, FakeSpreadsheet]:
+    spreadsheet = FakeSpreadsheet()
+    crew = SheetsCrew(spreadsheet_id="fake", spreadsheet=spreadsheet, **kwargs)
+    return crew, spreadsheet
+
+
+def names(worksheet: FakeWorksheet) -> list[str]:
+    return [row[0] for row in worksheet.rows[1:]]
+
+
+def test_api_error_between_flushes_keeps_pending_rows_indexed():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    crew.save_investors([investor("A")])
+    crew.flush()
+    sheet = spreadsheet.sheets["Investors"]
+
+    # Segundo lote: o append falha com um erro não retentável e a aba é relida
+    crew.save_investors([investor("B"), investor("C")])
+    sheet.fail_next_append = gspread.exceptions.APIError(FakeResponse(400))
+    crew.flush()
+    assert names(sheet) == ["A", "B", "C"]
+
+    # B continua no índice (vira atualização) e D vai para a linha certa
+    summary = crew.save_investors([investor("B", focus="Robotics"), investor("D")])
+    crew.flush()
+    assert summary == {"inserted": 1, "updated": 1, "skipped": 0}
+    assert sheet.rows[0] == INVESTOR_HEADER
+    assert names(sheet) == ["A", "B", "C", "D"]
+    assert sheet.rows[2][4] == "Robotics"
+
+
+def test_api_error_with_more_rows_buffered_after_reopen():
+    crew, spreadsheet = make_crew(flush_rows=2, flush_interval=3600)
+    crew.save_investors([investor("A")])
+    crew.flush()
+    sheet = spreadsheet.sheets["Investors"]
+
+    # O flush por tamanho acontece dentro do save, no meio do lote
+    sheet.fail_next_append = gspread.exceptions.APIError(FakeResponse(400))
+    crew.save_investors([investor("B"), investor("C"), investor("E")])
+    crew.save_investors([investor("E", focus="Fintech"), investor("C", focus="Agtech")])
+    crew.flush()
+    assert names(sheet) == ["A", "B", "C", "E"]
+    assert sheet.rows[3][4] == "Agtech"
+    assert sheet.rows[4][4] == "Fintech"
+
+
+def test_api_error_on_update_reopens_and_writes_to_the_moved_row():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    crew.save_investors([investor("A"), investor("B")])
+    crew.flush()
+    sheet = spreadsheet.sheets["Investors"]
+
+    # Alguém insere uma linha por fora: B desce e o número em cache fica errado
+    sheet.rows.insert(1, ["Z", "VC", "https://z.vc", "BR", "AI", ""])
+    crew.save_investors([investor("B", focus="Robotics"), investor("C")])
+    sheet.fail_next_update = gspread.exceptions.APIError(FakeResponse(400))
+    crew.flush()
+    assert names(sheet) == ["Z", "A", "B", "C"]
+    assert [row[4] for row in sheet.rows[1:]] == ["AI", "AI", "Robotics", "AI"]
+
+    # O buffer esvaziou: o próximo flush não repete o erro
+    summary = crew.save_investors([investor("A", focus="Fintech")])
+    crew.flush()
+    assert summary == {"inserted": 0, "updated": 1, "skipped": 0}
+    assert sheet.rows[2][4] == "Fintech"
+
+
+def test_timer_flushes_idle_buffer():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=0.05)
+    crew.save_investors([investor("A")])
+    sheet = spreadsheet.sheets["Investors"]
+    assert names(sheet) == []
+
+    deadline = time.monotonic() + 2
+    while not names(sheet) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert names(sheet) == ["A"]
+
+
+def test_close_flushes_pending_rows():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    with crew:
+        crew.save_investors([investor("A"), investor("B")])
+    assert names(spreadsheet.sheets["Investors"]) == ["A", "B"]
+
+
+def test_save_after_invalidate_rereads_the_sheet():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    crew.save_investors([investor("A")])
+    crew.invalidate("Investors")
+    sheet = spreadsheet.sheets["Investors"]
+    # O pendente foi gravado antes de descartar o cache
+    assert names(sheet) == ["A"]
+
+    # Alguém edita a aba por fora; o próximo save relê e vê a linha nova
+    sheet.rows.append(["B", "VC", "https://b.vc", "BR", "AI", ""])
+    summary = crew.save_investors([investor("B"), investor("C")])
+    crew.flush()
+    assert summary == {"inserted": 1, "updated": 0, "skipped": 1}
+    assert names(sheet) == ["A", "B", "C"]
+
+
+def test_sheet_with_a_different_header_is_rejected():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    sheet = spreadsheet.add_worksheet("Investors", rows=1000, cols=26)
+    sheet.rows.append(["name", "website", "type", "hq_country", "focus", "portfolio_url"])
+
+    with pytest.raises(ValueError):
+        crew.save_investors([investor("A")])
+    assert sheet.rows[1:] == []
+
+
+def startup(name: str, website: str, sector: str = "AI") -> dict:
+    return {"name": name, "website": website, "description": "", "sector": sector, "stage": "Seed",
+            "investors": ["Andes Ventures"]}
+
+
+def test_startups_with_the_same_name_and_different_domains_get_their_own_rows():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    crew.save_startups([startup("Nexus", "https://nexus.com.br"), startup("Nexus", "https://nexus.mx")], "Andes")
+    # O mesmo site escrito de outro jeito continua sendo a mesma startup
+    summary = crew.save_startups([startup("nexus", "http://www.nexus.com.br/", sector="Fintech")], "Andes")
+    crew.flush()
+
+    rows = spreadsheet.sheets["Startups"].rows[1:]
+    assert summary == {"inserted": 0, "updated": 1, "skipped": 0}
+    assert [(row[1], row[3]) for row in rows] == [("http://www.nexus.com.br/", "Fintech"),
+                                                  ("https://nexus.mx", "AI")]
+
+
+def test_startup_saved_without_website_is_updated_when_the_website_appears():
+    crew, spreadsheet = make_crew(flush_rows=100, flush_interval=3600)
+    crew.save_startups([startup("Loft", "")], "Andes")
+    summary = crew.save_startups([startup("Loft", "https://loft.com.br")], "Andes")
+    crew.flush()
+
+    assert summary == {"inserted": 0, "updated": 1, "skipped": 0}
+    assert [row[1] for row in spreadsheet.sheets["Startups"].rows[1:]] == ["https://loft.com.br"]
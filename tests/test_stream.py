@@ -0,0 +1,141 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline.stream import Stage, StreamPipeline
+
+
+def test_finish_emits_held_items_before_done():
+    held, results = [], []
+    lock = threading.Lock()
+
+    def hold(item):
+        with lock:
+            held.append(item)
+        return ()
+
+    def finish():
+        yield from sorted(held)
+
+    StreamPipeline([
+        Stage("hold", hold, workers=3, finish=finish),
+        Stage("collect", lambda item: results.append(item)),
+    ]).run(range(10))
+    assert results == list(range(10))
+
+
+def test_finish_error_goes_to_on_error():
+    errors = []
+
+    def finish():
+        raise RuntimeError("boom")
+
+    StreamPipeline([Stage("only", lambda item: (), finish=finish)],
+                   on_error=lambda stage, item, error: errors.append((stage, item, str(error)))).run([1])
+    assert errors == [("only", None, "boom")]
+
+
+PORTFOLIOS = {
+    "https://a.vc/portfolio": [
+        {"name": "Loft", "website": "https://loft.com.br", "description": "Imóveis", "sector": ""},
+        {"name": "Nexus Robotics", "website": "https://nexus.ai", "description": "Robôs"},
+    ],
+    "https://b.vc/portfolio": [
+        {"name": "Loft Imóveis", "website": "https://www.loft.com.br/", "description": "Proptech",
+         "sector": "PropTech"},
+    ],
+    "https://c.vc/portfolio": [],
+    "https://d.vc/portfolio": [
+        {"name": "Nexus Robotics", "website": "https://nexus.ai", "description": "Automação",
+         "sector": "Robotics"},
+    ],
+}
+
+
+class FakeJournal:
+    def record_portfolio(self, *args, **kwargs):
+        pass
+
+
+class FakeSink:
+    def __init__(self):
+        self.saved = []
+
+    def save_startups(self, startups, vc_name, worksheet_name):
+        self.saved.append(vc_name)
+        return {"inserted": len(startups), "updated": 0, "skipped": 0}
+
+    def flush(self):
+        pass
+
+
+class FakePipeline:
+    """O mínimo do ResearchPipeline usado pelo PortfolioStream, com extrações de duração aleatória"""
+
+    def __init__(self, seed: int):
+        self.journal = FakeJournal()
+        self.sink = FakeSink()
+        self.max_workers = 4
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._random = random.Random(seed)
+        self._delays = {url: self._random.uniform(0, 0.05) for url in PORTFOLIOS}
+
+    def _check_unchanged(self, investor, url, skip_unchanged):
+        return None, None
+
+    def _extract_startups(self, investor, url):
+        time.sleep(self._delays[url])
+        if url == "https://d.vc/portfolio" and self._delays[url] > 0.04:
+            raise RuntimeError("extração falhou")
+        return [dict(startup) for startup in PORTFOLIOS[url]]
+
+
+def resolve_with(seed: int, delays: dict | None = None, reorder_window: int | None = None):
+    pytest.importorskip("crewai")
+    pytest.importorskip("gspread")
+    from pipeline.research import PortfolioStream
+
+    investors = [{"name": url.split("//")[1].split(".")[0].upper(), "portfolio_url": url,
+                  "website": url.rsplit("/", 1)[0]} for url in PORTFOLIOS]
+    investors.append({"name": "E", "portfolio_url": "null", "website": ""})
+    pipeline = FakePipeline(seed)
+    pipeline._delays.update(delays or {})
+    stream = PortfolioStream(pipeline, 1, investors, skip_unchanged=False, started_at=time.time())
+    if reorder_window is not None:
+        stream.reorder_window = reorder_window
+    StreamPipeline(stream.stages(), on_error=lambda *args: None).run(stream.jobs(investors, {}))
+    pipeline._executor.shutdown()
+    return stream.resolver.entities, pipeline
+
+
+def test_resolution_does_not_depend_on_completion_order(monkeypatch):
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "offline-test")
+    results = {}
+    for seed in range(6):
+        entities, pipeline = resolve_with(seed)
+        failed_d = pipeline._delays["https://d.vc/portfolio"] > 0.04
+        results.setdefault(failed_d, []).append(entities)
+
+    for runs in results.values():
+        assert all(entities == runs[0] for entities in runs)
+    for entities in [runs[0] for runs in results.values()]:
+        loft = next(entity for entity in entities if entity["name"].startswith("Loft"))
+        # O canônico é sempre o do primeiro investidor da lista, completado pelos seguintes
+        assert loft["name"] == "Loft"
+        assert loft["investors"] == ["A", "B"]
+        assert loft["sector"] == "PropTech"
+
+
+def test_slow_portfolio_does_not_hold_back_more_than_the_window(monkeypatch):
+    monkeypatch.setenv("PERPLEXITY_API_KEY", "offline-test")
+    delays = {"https://a.vc/portfolio": 0.3, "https://b.vc/portfolio": 0.0, "https://d.vc/portfolio": 0.0}
+    entities, pipeline = resolve_with(0, delays=delays, reorder_window=1)
+
+    # Com B e D prontos a janela enche: B segue sem esperar A, que é resolvido ao chegar
+    assert pipeline.sink.saved[0] == "B"
+    assert sorted(pipeline.sink.saved) == ["A", "B", "D"]
+    loft = next(entity for entity in entities if entity["name"].startswith("Loft"))
+    assert loft["investors"] == ["B", "A"]